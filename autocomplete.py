@@ -0,0 +1,70 @@
+from bisect import bisect_left
+
+# ---------------------------------------
+# 이름 자동완성용 접두어 색인 (한글 초성 검색 지원)
+# ---------------------------------------
+# "용기" 를 찾을 때 "용", "용기", "ㅇㄱ", 입력 중인 "용ㄱ" 모두 일치하도록,
+# 이름을 초성 문자열로 바꾼 키를 정렬해 두고 이분 탐색으로 후보 구간을 찾는다.
+
+CHOSEONG = "ㄱㄲㄴㄷㄸㄹㅁㅂㅃㅅㅆㅇㅈㅉㅊㅋㅌㅍㅎ"
+_CHOSEONG_SET = frozenset(CHOSEONG)
+_HANGUL_FIRST, _HANGUL_LAST = ord("가"), ord("힣")
+_SYLLABLES_PER_CHOSEONG = 21 * 28  # 중성 21개 × 종성 28개
+
+# 디스코드 자동완성은 최대 25개까지만 보여줌
+MAX_CHOICES = 25
+
+
+def to_choseong(char):
+    """한글 음절이면 초성으로, 아니면 그대로"""
+    code = ord(char)
+    if _HANGUL_FIRST <= code <= _HANGUL_LAST:
+        return CHOSEONG[(code - _HANGUL_FIRST) // _SYLLABLES_PER_CHOSEONG]
+    return char
+
+
+def normalize(text):
+    """공백 제거 + 대소문자 무시"""
+    return "".join(text.split()).casefold()
+
+
+def choseong_key(text):
+    return "".join(map(to_choseong, normalize(text)))
+
+
+def _char_matches(query_char, name_char):
+    if query_char == name_char:
+        return True
+    return query_char in _CHOSEONG_SET and to_choseong(name_char) == query_char
+
+
+class PrefixIndex:
+    def __init__(self, names):
+        self.names = tuple(names)
+        # (초성 키, 정규화한 이름, 원래 이름) — 초성 키 순으로 정렬
+        entries = sorted((choseong_key(name), normalize(name), name) for name in self.names)
+        self._keys = [key for key, _, _ in entries]
+        self._entries = entries
+
+    def search(self, query, limit=MAX_CHOICES):
+        """
+        query로 시작하는 이름을 찾음. 글자마다 완성된 음절 또는 초성으로 비교한다.
+        query가 비어 있으면 원래 순서대로 앞에서 limit개.
+        """
+        query = normalize(query)
+        if not query:
+            return list(self.names[:limit])
+
+        key = "".join(map(to_choseong, query))
+        start = bisect_left(self._keys, key)
+
+        results = []
+        for index in range(start, len(self._entries)):
+            choseong, normalized, name = self._entries[index]
+            if not choseong.startswith(key):
+                break
+            if all(_char_matches(q, c) for q, c in zip(query, normalized)):
+                results.append(name)
+                if len(results) >= limit:
+                    break
+        return results
@@ -0,0 +1,179 @@
+import argparse
+import sys
+from collections import Counter
+from typing import NamedTuple
+
+from stats import calculate_derived_stats
+
+# ---------------------------------------
+# 기숙사 × 성격 조합 밸런스 분석
+# ---------------------------------------
+# 최종 특성치 = 기본값 50 + 기숙사 보너스 + 성격(최대 4개) 보너스 합.
+# 성격 조합은 수만 개지만 보너스 합 벡터는 훨씬 적게 겹치므로, 합 벡터별로 (조합 수, 예시 조합)만
+# 모아 두고(부분집합 합 DP) 벡터마다 보조 스탯을 한 번만 계산한 뒤 조합 수를 가중치로 집계한다.
+#
+#   python balance.py            # DB의 houses/personalities로 분석
+#   python balance.py --exact    # 성격을 정확히 4개 고른 조합만
+
+BASE_VALUE = 50
+MAX_PERSONALITIES = 4
+
+# 성격이 주는 보너스 (update_user_personalities와 같은 컬럼)
+PERSONALITY_STATS = ("strength", "constitution", "intelligence", "willpower", "dexterity")
+# 기숙사가 주는 보너스 (database.HOUSE_BONUS_STATS와 같은 컬럼)
+HOUSE_STATS = ("strength", "constitution", "size", "intelligence", "willpower", "dexterity")
+
+REPORTED_STATS = ("hp", "movement", "build", "damage_bonus", "skill_point")
+
+
+class Build(NamedTuple):
+    house: str
+    personalities: tuple    # 같은 보너스 합을 가진 조합 중 하나
+    count: int              # 이 보너스 합을 만드는 조합 수
+    derived: dict
+
+
+class HouseReport(NamedTuple):
+    house: str
+    combinations: int
+    distinct: int                   # 서로 다른 보너스 합 벡터 수
+    distributions: dict             # 스탯 -> Counter(값 -> 조합 수)
+    outliers: list                  # [(설명, Build), ...]
+
+
+def personality_sums(personalities, max_count=MAX_PERSONALITIES, exact=False):
+    """
+    성격 1~max_count개 조합의 보너스 합 벡터 집계.
+    반환: {합 벡터(PERSONALITY_STATS 순서): [조합 수, 예시 조합 이름 튜플]}
+    """
+    # by_size[k] = {합 벡터: [조합 수, 예시]} — 성격을 하나씩 추가하며 k를 큰 쪽부터 갱신 (0/1 배낭과 같은 방식)
+    zero = (0,) * len(PERSONALITY_STATS)
+    by_size = [{zero: [1, ()]}] + [{} for _ in range(max_count)]
+    for row in personalities:
+        vector = tuple(getattr(row, name) for name in PERSONALITY_STATS)
+        for size in range(max_count, 0, -1):
+            target = by_size[size]
+            for total, (count, example) in by_size[size - 1].items():
+                key = tuple(a + b for a, b in zip(total, vector))
+                entry = target.get(key)
+                if entry is None:
+                    target[key] = [count, example + (row.name,)]
+                else:
+                    entry[0] += count
+
+    sizes = [max_count] if exact else range(1, max_count + 1)
+    merged = {}
+    for size in sizes:
+        for key, (count, example) in by_size[size].items():
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = [count, example]
+            else:
+                entry[0] += count
+    return merged
+
+
+def _final_stats(house, personality_vector):
+    base = {name: BASE_VALUE for name in ("strength", "constitution", "size", "intelligence", "willpower", "dexterity", "education")}
+    for name in HOUSE_STATS:
+        base[name] += getattr(house, name) or 0
+    for name, amount in zip(PERSONALITY_STATS, personality_vector):
+        base[name] += amount
+    return base
+
+
+def _derive(base):
+    return calculate_derived_stats(
+        base["strength"], base["constitution"], base["size"], base["dexterity"],
+        base["willpower"], base["intelligence"], base["education"]
+    )
+
+
+def simulate(houses, personalities, max_count=MAX_PERSONALITIES, exact=False, outlier_count=3):
+    """
+    모든 기숙사 × 성격 조합을 평가.
+    houses, personalities: records.House / records.Personality 목록
+    반환: HouseReport 목록
+    """
+    sums = personality_sums(personalities, max_count, exact)
+    derived_cache = {}  # 최종 특성치 벡터 -> 보조 스탯 (기숙사가 달라도 결과가 같으면 재사용)
+
+    reports = []
+    for house in houses:
+        distributions = {name: Counter() for name in REPORTED_STATS}
+        builds = []
+        combinations = 0
+        for vector, (count, example) in sums.items():
+            base = _final_stats(house, vector)
+            key = tuple(base.values())
+            derived = derived_cache.get(key)
+            if derived is None:
+                derived = derived_cache[key] = _derive(base)
+
+            combinations += count
+            for name in REPORTED_STATS:
+                distributions[name][derived[name]] += count
+            builds.append(Build(house.name, example, count, derived))
+
+        reports.append(HouseReport(house.name, combinations, len(sums), distributions, _outliers(builds, outlier_count)))
+    return reports
+
+
+def _outliers(builds, count):
+    """HP/기능 점수 양 끝 조합과 빈사·광기 상태로 시작하는 조합"""
+    outliers = []
+    for name, label in (("hp", "HP"), ("skill_point", "기능 점수")):
+        ordered = sorted(builds, key=lambda build: build.derived[name])
+        outliers += [(f"{label} 최저", build) for build in ordered[:count]]
+        outliers += [(f"{label} 최고", build) for build in ordered[:-count - 1:-1]]
+    abnormal = [build for build in builds if build.derived["status"] != "N"]
+    outliers += [(f"상태 {build.derived['status']}", build) for build in abnormal[:count]]
+    return outliers
+
+
+def summarize(counter):
+    """Counter(값 -> 조합 수)에서 (최저, 평균, 최고). 숫자가 아닌 값이면 평균은 None"""
+    if not counter or not all(isinstance(value, (int, float)) for value in counter):
+        return None, None, None
+    mean = sum(value * count for value, count in counter.items()) / sum(counter.values())
+    return min(counter), mean, max(counter)
+
+
+def format_distribution(counter, total, limit=8):
+    """조합 수가 많은 값부터 `값: 비율` 문자열"""
+    return ", ".join(f"{value}: {count / total:.1%}" for value, count in counter.most_common(limit))
+
+
+def format_report(report):
+    lines = [f"🏠 {report.house} — 조합 {report.combinations:,}개 (보너스 합 {report.distinct:,}종)"]
+    for name in REPORTED_STATS:
+        counter = report.distributions[name]
+        low, mean, high = summarize(counter)
+        summary = f" [최저 {low} / 평균 {mean:.1f} / 최고 {high}]" if mean is not None else ""
+        lines.append(f"  {name}{summary}: {format_distribution(counter, report.combinations)}")
+    for label, build in report.outliers:
+        lines.append(f"  ⚠️ {label}: {', '.join(build.personalities)} (같은 합 {build.count}개) → "
+                     f"HP {build.derived['hp']}, MOV {build.derived['movement']}, DB {build.derived['damage_bonus']}, "
+                     f"기능 점수 {build.derived['skill_point']}")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기숙사 × 성격 조합 밸런스 분석")
+    parser.add_argument("--max", type=int, default=MAX_PERSONALITIES, help="고를 수 있는 성격 수 (기본 4)")
+    parser.add_argument("--exact", action="store_true", help="성격을 정확히 --max개 고른 조합만 분석")
+    parser.add_argument("--outliers", type=int, default=3, help="양 끝에서 보여줄 조합 수")
+    args = parser.parse_args(argv)
+
+    from catalog import catalog  # CLI에서만 DB 접속
+    catalog.load()
+
+    reports = simulate(catalog.houses(), catalog.personalities(), args.max, args.exact, args.outliers)
+    for report in reports:
+        print(format_report(report))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,12 @@ import os
 # 명령어 그룹 불러오기
 from commands.profile import ProfileCommands
 from commands.gm_commands import GMCommands
+from commands.ranking import show_ranking
+from commands.rolls import roll_dice, check_skill
+from db_async import check_schema, refresh_reference_data, load_rankings
+from instrumentation import InstrumentedTree, instrument_discord_http, register_collectors
+import metrics
+from sync_manager import dev_guild, sync_commands as sync_command_tree
 
 # 환경 변수 로드
 load_dotenv()
@@ -13,22 +19,65 @@ TOKEN = os.getenv("DISCORD_BOT_TOKEN")
 
 # 봇 설정
 intents = discord.Intents.default()
-bot = commands.Bot(command_prefix="!", intents=intents)
+# 역할 단위 일괄 명령어(/gm 재화일괄지급 등)가 role.members를 쓰려면 필요
+# (개발자 포털에서 Server Members Intent를 켜야 함)
+intents.members = True
+# 명령어 처리 시간/오류/DB 사용량은 InstrumentedTree가 기록 (metrics.py)
+bot = commands.Bot(command_prefix="!", intents=intents, tree_cls=InstrumentedTree)
 
 # 명령어 그룹 등록
 bot.tree.add_command(ProfileCommands())
 bot.tree.add_command(GMCommands())
+bot.tree.add_command(show_ranking)
+bot.tree.add_command(roll_dice)
+bot.tree.add_command(check_skill)
 
 # 봇 실행
+async def run_startup_step(label, step):
+    """
+    시작 단계 하나 실행. 실패해도(디스코드 5xx/rate limit, DB 접속 불가 등) 로그만 남기고 봇은 계속 뜬다.
+    반환: 단계의 결과, 실패하면 None
+    """
+    try:
+        return await step()
+    except Exception as e:
+        print(f"❌ 시작 단계 실패 ({label}): {e}")
+        return None
+
+async def sync_on_startup():
+    # 명령어 정의가 바뀌었을 때만 동기화 (재접속 때마다 하지 않도록 on_ready가 아닌 여기서 한 번)
+    # 실패하면 해시를 저장하지 않으므로 다음 시작 때 다시 시도한다
+    synced, elapsed = await sync_command_tree(bot.tree, guild=dev_guild())
+    status = "동기화함" if synced else "변경 없음, 건너뜀"
+    print(f"🔄 슬래시 명령어 {status} ({elapsed * 1000:.0f}ms)")
+
+async def start_metrics():
+    # 메트릭: Discord API 시간 기록, 캐시/풀 통계 연결, 로컬 스크랩 엔드포인트 시작
+    instrument_discord_http()
+    register_collectors()
+    metrics.start_server()
+
+@bot.event
+async def setup_hook():
+    await run_startup_step("메트릭", start_metrics)
+    # 스키마 버전만 확인 (마이그레이션 적용은 `python -m migrations upgrade`로 따로)
+    await run_startup_step("스키마 확인", check_schema)
+    # 기숙사/성격 참조 데이터를 미리 읽어 둠 (첫 버튼 클릭이 DB를 기다리지 않도록)
+    await run_startup_step("참조 데이터", refresh_reference_data)
+    # 순위표는 users 테이블을 한 번만 읽어 만들고, 이후에는 재화/스탯 변경 때마다 메모리에서 갱신
+    await run_startup_step("순위표", load_rankings)
+    await run_startup_step("명령어 동기화", sync_on_startup)
+
 @bot.event
 async def on_ready():
-    await bot.tree.sync()
     print(f"✅ {bot.user} 로그인 완료!")
 
 @bot.tree.command(name="sync", description="슬래시 명령어를 동기화합니다.")
 async def sync_commands(interaction: discord.Interaction):
-    await bot.tree.sync()
-    await interaction.response.send_message("✅ 슬래시 명령어가 동기화되었습니다!", ephemeral=True)
+    # 직접 요청한 경우에는 해시와 상관없이 강제로 동기화 (3초를 넘길 수 있으므로 응답을 미뤄 둠)
+    await interaction.response.defer(ephemeral=True)
+    _, elapsed = await sync_command_tree(bot.tree, guild=dev_guild(), force=True)
+    await interaction.followup.send(f"✅ 슬래시 명령어가 동기화되었습니다! ({elapsed * 1000:.0f}ms)", ephemeral=True)
 
 
 bot.run(TOKEN)
\ No newline at end of file
@@ -0,0 +1,82 @@
+import threading
+import time
+from collections import OrderedDict
+
+# ---------------------------------------
+# 크기 제한 LRU 캐시 (TTL 지원)
+# ---------------------------------------
+# DB 스레드 풀의 여러 스레드에서 동시에 쓰므로 내부 잠금으로 보호한다.
+
+
+class LRUCache:
+    """
+    maxsize를 넘으면 가장 오래 쓰지 않은 항목부터 버리는 캐시.
+    ttl(초)이 지난 항목은 조회할 때 만료 처리한다. (ttl=0이면 만료 없음)
+    """
+
+    def __init__(self, maxsize=1024, ttl=300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, 저장 시각)
+        self._lock = threading.Lock()
+        # invalidate가 일어날 때마다 증가. 조회 도중 무효화된 값이 다시 들어가는 것을 막는다.
+        self._generation = 0
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "expirations": 0, "invalidations": 0}
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return default
+
+            value, stored_at = entry
+            if self.ttl and time.monotonic() - stored_at > self.ttl:
+                del self._data[key]
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return default
+
+            self._data.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def token(self):
+        """DB 조회 전에 받아 두고 put에 넘기면, 그 사이 무효화가 있었을 때 저장하지 않는다"""
+        with self._lock:
+            return self._generation
+
+    def put(self, key, value, token=None):
+        with self._lock:
+            if token is not None and token != self._generation:
+                return False
+
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self._stats["evictions"] += 1
+            return True
+
+    def invalidate(self, key):
+        with self._lock:
+            self._generation += 1
+            if self._data.pop(key, None) is not None:
+                self._stats["invalidations"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._generation += 1
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """hit/miss/eviction 카운터와 현재 크기, 적중률"""
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["size"] = len(self._data)
+        lookups = snapshot["hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = snapshot["hits"] / lookups if lookups else 0.0
+        return snapshot
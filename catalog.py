@@ -0,0 +1,143 @@
+import os
+import threading
+import time
+from contextlib import closing
+
+import mysql.connector
+
+import queries
+from autocomplete import PrefixIndex
+from db_pool import connection
+from records import House, Personality
+
+# ---------------------------------------
+# 기숙사/성격 참조 데이터 캐시
+# ---------------------------------------
+# houses, personalities 테이블은 작고 거의 바뀌지 않으므로 시작할 때 한 번 읽어서
+# 메모리에 들고 있다가 이름으로 바로 찾는다. GM 명령어(/gm 데이터갱신)나 TTL로 다시 읽는다.
+
+# 이 시간(초)이 지나면 다음 조회 때 다시 읽음 (0이면 자동 갱신 안 함)
+REFERENCE_TTL = float(os.getenv("REFERENCE_TTL", "600"))
+
+# 성격 선택 화면의 한 페이지 크기 (로드할 때 미리 나눠 둔다)
+PERSONALITY_PAGE_SIZE = 7
+
+
+class _Snapshot:
+    """한 번에 읽어 온 참조 데이터 묶음 (통째로 교체되므로 읽는 쪽은 잠금이 필요 없다)"""
+    __slots__ = ("houses", "personalities", "personality_order", "house_role_ids", "loaded_at", "_pages",
+                 "house_index", "personality_index")
+
+    def __init__(self, houses, personalities, loaded_at):
+        self.houses = {row.name: row for row in houses}
+        self.personalities = {row.name: row for row in personalities}
+        self.personality_order = list(personalities)  # id 순서
+        # role_id가 None인 경우도 있을 수 있으니 필터링
+        self.house_role_ids = frozenset(row.role_id for row in houses if row.role_id is not None)
+        self.loaded_at = loaded_at
+        # 자동완성용 접두어 색인
+        self.house_index = PrefixIndex(self.houses)
+        self.personality_index = PrefixIndex(row.name for row in personalities)
+        self._pages = {}  # page_size -> 페이지 튜플
+        self.pages(PERSONALITY_PAGE_SIZE)
+
+    def pages(self, page_size):
+        """성격 목록을 page_size개씩 나눈 페이지 튜플 (크기별로 한 번만 계산)"""
+        pages = self._pages.get(page_size)
+        if pages is None:
+            order = self.personality_order
+            pages = tuple(tuple(order[i:i + page_size]) for i in range(0, len(order), page_size))
+            self._pages[page_size] = pages
+        return pages
+
+
+_EMPTY = _Snapshot([], [], None)
+
+
+class ReferenceCatalog:
+    def __init__(self, ttl=REFERENCE_TTL):
+        self.ttl = ttl
+        self._snapshot = _EMPTY
+        self._load_lock = threading.Lock()
+
+    @property
+    def loaded(self):
+        return self._snapshot.loaded_at is not None
+
+    def load(self):
+        """houses, personalities 테이블 전체를 읽어서 캐시를 교체"""
+        with self._load_lock:
+            self._load_locked()
+
+    def _load_locked(self):
+        with connection() as conn, closing(conn.cursor()) as cursor:
+            cursor.execute(queries.SELECT_ALL_HOUSES)
+            houses = list(map(House._make, cursor.fetchall()))
+            cursor.execute(queries.SELECT_ALL_PERSONALITIES)
+            personalities = list(map(Personality._make, cursor.fetchall()))
+
+        self._snapshot = _Snapshot(houses, personalities, time.monotonic())
+        print(f"📚 참조 데이터 로드 완료: 기숙사 {len(houses)}개, 성격 {len(personalities)}개")
+
+    def _expired(self, snapshot):
+        return snapshot.loaded_at is None or bool(self.ttl and time.monotonic() - snapshot.loaded_at > self.ttl)
+
+    def _current(self):
+        """캐시가 비었거나 TTL이 지났으면 다시 읽고 현재 스냅샷 반환"""
+        snapshot = self._snapshot
+        if not self._expired(snapshot):
+            return snapshot
+
+        with self._load_lock:
+            # 기다리는 동안 다른 스레드가 이미 갱신했을 수 있음
+            if self._expired(self._snapshot):
+                try:
+                    self._load_locked()
+                except mysql.connector.Error as e:
+                    if snapshot.loaded_at is None:
+                        raise
+                    print(f"❌ 참조 데이터 갱신 실패 (이전 데이터를 계속 사용): {e}")
+                    return snapshot
+        return self._snapshot
+
+    def house(self, name):
+        return self._current().houses.get(name)
+
+    def personality(self, name):
+        return self._current().personalities.get(name)
+
+    def houses(self):
+        """전체 기숙사 목록"""
+        return list(self._current().houses.values())
+
+    def personalities(self):
+        """전체 성격 목록 (id 순서)"""
+        return self._current().personality_order
+
+    def personality_pages(self, page_size=PERSONALITY_PAGE_SIZE):
+        """미리 나눠 둔 성격 페이지 목록 (전체 개수는 테이블 실제 row 수 기준)"""
+        return self._current().pages(page_size)
+
+    def personality_count(self):
+        return len(self._current().personality_order)
+
+    def search_houses(self, query):
+        """
+        자동완성용 기숙사 이름 검색.
+        이벤트 루프에서 바로 호출하므로 TTL이 지났어도 DB를 다시 읽지 않고 현재 데이터로 답한다.
+        """
+        return self._snapshot.house_index.search(query)
+
+    def search_personalities(self, query):
+        """자동완성용 성격 이름 검색 (search_houses와 마찬가지로 DB 접근 없음)"""
+        return self._snapshot.personality_index.search(query)
+
+    def has_house(self, name):
+        """이름이 정확히 일치하는 기숙사가 있는지 (이벤트 루프에서 부르므로 DB를 다시 읽지 않는다)"""
+        return name in self._snapshot.houses
+
+    def house_role_ids(self):
+        return self._current().house_role_ids
+
+
+catalog = ReferenceCatalog()
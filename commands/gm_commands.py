@@ -1,14 +1,25 @@
+import io
+import re
 import discord
 from discord import app_commands
-from database import add_money, remove_money, delete_user  # 데이터베이스 함수 가져오기
+from balance import format_report, summarize
+from rendering import format_currency
+from db_async import add_money, remove_money, add_money_bulk, remove_money_bulk, delete_user, refresh_reference_data, simulate_balance  # 데이터베이스 함수 가져오기
 
 GM_ROLE_ID = 1343038882316423259
 
+# 일괄 명령어의 members 인자에서 멘션(<@123>, <@!123>)이나 숫자 ID를 찾는 패턴
+MEMBER_ID_PATTERN = re.compile(r"<@!?(\d+)>|\b(\d{15,20})\b")
+
+# 결과 embed에 한 줄씩 보여줄 최대 인원 (embed 설명은 4096자 제한)
+BULK_SUMMARY_LIMIT = 40
+
 class GMCommands(discord.app_commands.Group):
     """GM 전용 명령어 그룹"""
 
     @app_commands.command(name="재화지급", description="유저에게 재화를 지급합니다. (GM 전용)")
-    async def give_money(self, interaction: discord.Interaction, member: discord.Member, amount: int):
+    @app_commands.describe(reason="지급 사유 (재화 기록에 남습니다)")
+    async def give_money(self, interaction: discord.Interaction, member: discord.Member, amount: int, reason: app_commands.Range[str, 1, 255] = None):
         """GM이 유저에게 재화 지급"""
         if GM_ROLE_ID not in [role.id for role in interaction.user.roles]:
             await interaction.response.send_message("❌ 이 명령어는 GM만 사용할 수 있습니다.", ephemeral=True)
@@ -20,22 +31,18 @@ class GMCommands(discord.app_commands.Group):
             await interaction.response.send_message("❌ 지급할 금액은 1 이상이어야 합니다.", ephemeral=True)
             return
 
-        success = add_money(user_id, amount)
+        success = await add_money(user_id, amount, actor_id=str(interaction.user.id), reason=reason or "GM 지급")
         if success:
-            galleons = amount // 493
-            remainder = amount % 493
-            sickles = remainder // 29
-            knuts = remainder % 29
-
             await interaction.response.send_message(
-                f"💰 **{member.display_name}** 님에게 `{galleons} 갈레온 {sickles} 시클 {knuts} 크넛` 지급 완료!",
+                f"💰 **{member.display_name}** 님에게 `{format_currency(amount)}` 지급 완료!",
                 ephemeral=True
             )
         else:
             await interaction.response.send_message("❌ 재화 지급에 실패했습니다.", ephemeral=True)
 
     @app_commands.command(name="재화차감", description="유저의 재화를 차감합니다. (GM 전용)")
-    async def spend_money(self, interaction: discord.Interaction, member: discord.Member, amount: int):
+    @app_commands.describe(reason="차감 사유 (재화 기록에 남습니다)")
+    async def spend_money(self, interaction: discord.Interaction, member: discord.Member, amount: int, reason: app_commands.Range[str, 1, 255] = None):
         """GM이 유저 재화를 차감"""
 
         if GM_ROLE_ID not in [role.id for role in interaction.user.roles]:
@@ -48,20 +55,51 @@ class GMCommands(discord.app_commands.Group):
             await interaction.response.send_message("❌ 차감할 금액은 1 이상이어야 합니다.", ephemeral=True)
             return
 
-        success = remove_money(user_id, amount)
+        success = await remove_money(user_id, amount, actor_id=str(interaction.user.id), reason=reason or "GM 차감")
         if success:
-            galleons = amount // 493
-            remainder = amount % 493
-            sickles = remainder // 29
-            knuts = remainder % 29
-
             await interaction.response.send_message(
-                f"💸 `{galleons} 갈레온 {sickles} 시클 {knuts} 크넛` 차감 완료!",
+                f"💸 `{format_currency(amount)}` 차감 완료!",
                 ephemeral=True
             )
         else:
             await interaction.response.send_message("❌ 재화 차감에 실패했습니다. 잔액을 확인하세요.", ephemeral=True)
 
+    @app_commands.command(name="재화일괄지급", description="역할 또는 여러 유저에게 재화를 한 번에 지급합니다. (GM 전용)")
+    @app_commands.describe(amount="1명당 지급할 금액 (크넛)", role="이 역할을 가진 모든 멤버", members="멘션 또는 ID 목록 (띄어쓰기로 구분)", reason="지급 사유 (재화 기록에 남습니다)")
+    async def give_money_bulk(self, interaction: discord.Interaction, amount: int, role: discord.Role = None, members: str = None, reason: app_commands.Range[str, 1, 255] = None):
+        """GM이 여러 유저에게 재화를 한 번에 지급 (장학금 등)"""
+        await self.change_money_bulk(interaction, amount, role, members, add_money_bulk, "지급", reason)
+
+    @app_commands.command(name="재화일괄차감", description="역할 또는 여러 유저의 재화를 한 번에 차감합니다. (GM 전용)")
+    @app_commands.describe(amount="1명당 차감할 금액 (크넛)", role="이 역할을 가진 모든 멤버", members="멘션 또는 ID 목록 (띄어쓰기로 구분)", reason="차감 사유 (재화 기록에 남습니다)")
+    async def spend_money_bulk(self, interaction: discord.Interaction, amount: int, role: discord.Role = None, members: str = None, reason: app_commands.Range[str, 1, 255] = None):
+        """GM이 여러 유저의 재화를 한 번에 차감"""
+        await self.change_money_bulk(interaction, amount, role, members, remove_money_bulk, "차감", reason)
+
+    async def change_money_bulk(self, interaction, amount, role, members, bulk_func, label, reason=None):
+        """일괄 지급/차감 공통 처리: 대상 모으기 → 한 번의 DB 호출 → 멤버별 결과 embed"""
+        if GM_ROLE_ID not in [r.id for r in interaction.user.roles]:
+            await interaction.response.send_message("❌ 이 명령어는 GM만 사용할 수 있습니다.", ephemeral=True)
+            return
+
+        if amount <= 0:
+            await interaction.response.send_message(f"❌ {label}할 금액은 1 이상이어야 합니다.", ephemeral=True)
+            return
+
+        targets = collect_targets(interaction.guild, role, members)
+        if not targets:
+            await interaction.response.send_message("❌ 대상이 없습니다. 역할이나 멤버를 지정해주세요.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        results = await bulk_func(list(targets), amount, actor_id=str(interaction.user.id), reason=reason or f"GM 일괄 {label}")
+        if results is None:
+            await interaction.followup.send(f"❌ 재화 일괄 {label}에 실패했습니다.", ephemeral=True)
+            return
+
+        await interaction.followup.send(embed=bulk_summary_embed(targets, results, amount, label), ephemeral=True)
+
     @app_commands.command(name="캐릭터삭제", description="유저의 캐릭터를 DB에서 삭제합니다. (GM 전용)")
     async def delete_character(self, interaction: discord.Interaction, member: discord.Member):
         """GM이 특정 유저의 캐릭터 정보를 DB에서 완전히 제거"""
@@ -72,7 +110,7 @@ class GMCommands(discord.app_commands.Group):
 
         user_id = str(member.id)
         
-        success = delete_user(user_id)
+        success = await delete_user(user_id)
         if success:
             await interaction.response.send_message(
                 f"✅ **{member.display_name}** 님의 캐릭터 정보를 성공적으로 삭제했습니다!",
@@ -81,5 +119,102 @@ class GMCommands(discord.app_commands.Group):
         else:
             await interaction.response.send_message("❌ 캐릭터 삭제에 실패했거나, 이미 등록되지 않은 사용자입니다.",ephemeral=True)
 
+    @app_commands.command(name="데이터갱신", description="기숙사/성격 데이터를 DB에서 다시 불러옵니다. (GM 전용)")
+    async def reload_reference_data(self, interaction: discord.Interaction):
+        """GM이 houses, personalities 테이블을 수정한 뒤 캐시를 갱신"""
+
+        if GM_ROLE_ID not in [role.id for role in interaction.user.roles]:
+            await interaction.response.send_message("❌ 이 명령어는 GM만 사용할 수 있습니다.", ephemeral=True)
+            return
+
+        success = await refresh_reference_data()
+        if success:
+            await interaction.response.send_message("📚 기숙사/성격 데이터를 다시 불러왔습니다!", ephemeral=True)
+        else:
+            await interaction.response.send_message("❌ 데이터를 불러오지 못했습니다. 로그를 확인하세요.", ephemeral=True)
+
+    @app_commands.command(name="밸런스", description="기숙사 × 성격 조합별 스탯 분포를 분석합니다. (GM 전용)")
+    @app_commands.describe(exact="성격을 정확히 4개 고른 조합만 분석")
+    async def balance_report(self, interaction: discord.Interaction, exact: bool = False):
+        """모든 조합의 HP/MOV/체구/피해 보너스/기능 점수 분포와 극단적인 조합을 파일로 첨부"""
+
+        if GM_ROLE_ID not in [role.id for role in interaction.user.roles]:
+            await interaction.response.send_message("❌ 이 명령어는 GM만 사용할 수 있습니다.", ephemeral=True)
+            return
+
+        await interaction.response.defer(ephemeral=True)
+
+        reports = await simulate_balance(exact=exact)
+        if not reports:
+            await interaction.followup.send("❌ 밸런스 분석에 실패했습니다. 기숙사/성격 데이터를 확인하세요.", ephemeral=True)
+            return
+
+        embed = discord.Embed(title="⚖️ 기숙사 × 성격 밸런스", description=f"조합 {reports[0].combinations:,}개 × 기숙사 {len(reports)}개", color=0x3498db)
+        for report in reports:
+            embed.add_field(
+                name=report.house,
+                value=f"{summary_text('HP', report.distributions['hp'], '.1f')}\n"
+                      f"{summary_text('기능 점수', report.distributions['skill_point'], '.0f')}",
+                inline=True
+            )
+
+        text = "\n\n".join(format_report(report) for report in reports)
+        report_file = discord.File(io.BytesIO(text.encode("utf-8")), filename="balance.txt")
+        await interaction.followup.send(embed=embed, file=report_file, ephemeral=True)
+
+def summary_text(label, counter, mean_format):
+    """밸런스 embed 한 줄: `라벨 최저~최고 (평균 x)`. 분포가 비어 있으면 (성격 데이터가 없는 등) 값 없이 표시"""
+    low, mean, high = summarize(counter)
+    if mean is None:
+        return f"{label} -"
+    return f"{label} {low}~{high} (평균 {mean:{mean_format}})"
+
+def collect_targets(guild, role, members):
+    """
+    역할 멤버와 members 문자열의 멘션/ID를 합쳐 {user_id: 표시 이름}으로 (봇 제외).
+    역할 멤버 목록은 members 인텐트로 캐시된 멤버 기준이다.
+    """
+    targets = {}
+    if role is not None:
+        for member in role.members:
+            if not member.bot:
+                targets[str(member.id)] = member.display_name
+
+    for mention_id, raw_id in MEMBER_ID_PATTERN.findall(members or ""):
+        member_id = int(mention_id or raw_id)
+        member = guild.get_member(member_id)
+        if member is not None and member.bot:
+            continue
+        targets.setdefault(str(member_id), member.display_name if member else f"<@{member_id}>")
+    return targets
+
+def bulk_summary_embed(targets, results, amount, label):
+    """일괄 지급/차감 결과를 멤버별 잔액 변화로 정리한 embed"""
+    missing = [name for user_id, name in targets.items() if user_id not in results]
+    applied = sum(1 for _, after in results.values() if after is not None)
+    rejected = len(results) - applied
+
+    summary = f"1명당 `{format_currency(amount)}` · 처리 {applied}명 · 미등록 {len(missing)}명"
+    if rejected:
+        summary += f" · 잔액 부족 {rejected}명"
+    embed = discord.Embed(title=f"💰 재화 일괄 {label} 결과", description=summary, color=0xf1c40f)
+
+    lines = [
+        f"**{targets[user_id]}** : {format_currency(before)} → {format_currency(after)}"
+        if after is not None else
+        f"**{targets[user_id]}** : ❌ 잔액 부족 ({format_currency(before)})"
+        for user_id, (before, after) in results.items()
+    ]
+    if len(lines) > BULK_SUMMARY_LIMIT:
+        hidden = len(lines) - BULK_SUMMARY_LIMIT
+        lines = lines[:BULK_SUMMARY_LIMIT] + [f"... 외 {hidden}명"]
+    if lines:
+        embed.description += "\n\n" + "\n".join(lines)
+
+    if missing:
+        shown = ", ".join(missing[:20]) + (f" 외 {len(missing) - 20}명" if len(missing) > 20 else "")
+        embed.add_field(name="⚠️ 등록되지 않은 유저 (건너뜀)", value=shown[:1024], inline=False)
+    return embed
+
 # 명령어 그룹 객체 생성
 gm_group = GMCommands(name="gm", description="GM 전용 명령어 그룹")
\ No newline at end of file
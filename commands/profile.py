@@ -1,7 +1,14 @@
+import asyncio
 import discord
 from discord import app_commands
-from database import register_user, get_user, get_house_data, get_personality_list, get_all_house_roles
-from database import update_user_name, update_user_size, update_user_appearance, update_user_house, update_user_personalities
+from catalog import catalog
+from instrumentation import timed_callback
+from rendering import profile_embed
+from database import WriteResult
+from registration import registration_queue
+from skills import parse_allocation
+from db_async import get_user, get_user_skills, allocate_skill_points, get_house_data, get_personality_data, get_personality_pages, get_all_house_roles
+from db_async import update_user_name, update_user_size, update_user_appearance, update_user_house, revert_user_house, update_user_personalities
 
 class ProfileCommands(discord.app_commands.Group):
     """프로필 관련 명령어 그룹"""
@@ -16,114 +23,84 @@ class ProfileCommands(discord.app_commands.Group):
         user_id = str(interaction.user.id)
         user_name = interaction.user.display_name
 
-        existing_user = get_user(user_id)
-        if existing_user:
-            await interaction.response.send_message("이미 등록된 유저입니다!", ephemeral=True)
+        # 가입이 몰리면 큐에서 기다릴 수 있으므로 응답을 미뤄 둠
+        await interaction.response.defer(ephemeral=True)
+
+        # 미리 조회하지 않고 등록을 시도해서 결과로 구분 (동시에 들어온 등록과 묶어서 한 번에 저장)
+        result = await registration_queue.submit(user_id, user_name)
+        if result is WriteResult.ALREADY_REGISTERED:
+            await interaction.followup.send("이미 등록된 유저입니다!", ephemeral=True)
+        elif result is WriteResult.REGISTERED:
+            await interaction.followup.send(f"🎉 등록 완료! 환영합니다, **{user_name}**!", ephemeral=True)
         else:
-            register_user(user_id, user_name)
-            await interaction.response.send_message(f"🎉 등록 완료! 환영합니다, **{user_name}**!", ephemeral=True)
+            await interaction.followup.send("❌ 등록에 실패했습니다. 잠시 후 다시 시도해주세요.", ephemeral=True)
 
     @app_commands.command(name="조회", description="내 프로필 정보를 확인합니다.")
     async def view_profile(self, interaction: discord.Interaction):
         """유저 프로필(탐사자 정보)을 확인하는 명령어"""
         user_id = str(interaction.user.id)
-        user_data = get_user(user_id)
+        user_data = await get_user(user_id)
 
         if not user_data:
             await interaction.response.send_message("❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요.", ephemeral=True)
             return
 
-        (user_name, house, personality, strength, constitution, size, intelligence, willpower, dexterity, appearance, education, money, luck, movement, damage_bonus, build, hp, mp, sanity, status) = user_data[1:]
-
-        # 재화 환산
-        galleons = money // 493
-        remainder = money % 493
-        sickles = remainder // 29
-        knuts = remainder % 29
-
-        embed = discord.Embed(
-            title=":scroll: 내 프로필",
-            description="아래는 당신의 탐사자(캐릭터) 정보입니다.",
-            color=0x3498db
-        )
-
-        # ────────── [1] 기본 정보 (코드 블록) ──────────
-        basic_info_lines = []
-        basic_info_lines.append(f"이름   : {user_name}")
-        basic_info_lines.append(f"소속   : {house or '미정'}")
-        basic_info_lines.append(f"성격   : {personality or '미정'}")
-
-        basic_info_block = "```" + "\n".join(basic_info_lines) + "```"
-
-        embed.add_field(name=":bust_in_silhouette: 기본 정보", value=basic_info_block, inline=False)
-
-        # ────────── [2] 특성치 (코드 블록 2칼럼) ──────────
-        stats_left = [
-            ("STR(근력)", strength),
-            ("DEX(민첩)", dexterity),
-            ("APP(외모)", appearance),
-            ("POW(정신)", willpower),
-        ]
-        stats_right = [
-            ("CON(건강)", constitution),
-            ("SIZ(크기)", size),
-            ("INT(지능)", intelligence),
-            ("EDU(교육)", education),
-        ]
-
-        stats_lines = []
-        for (label1, val1), (label2, val2) in zip(stats_left, stats_right):
-            line = f"{label1:<9}: {val1:<6}  {label2:<9}: {val2}"
-            stats_lines.append(line)
-
-        stats_block = "```" + "\n".join(stats_lines) + "```"
-        embed.add_field(name=":star: 특성치", value=stats_block, inline=False)
-
-        # ────────── [3] 보조 특성치 (코드 블록, 공백 축소) ──────────
-        combat_left = [
-            ("HP(체력)", hp),
-            ("MP(마력)", mp),
-            ("SAN(이성)", sanity),
-            ("STA(상태)", status),
-        ]
-        combat_right = [
-            ("LUK(행운)", luck),
-            ("MOV(이동)", movement),
-            ("DB(피해)", damage_bonus),
-            ("BUILD(체구)", build),
-        ]
-        combat_lines = []
-        for (label1, val1), (label2, val2) in zip(combat_left, combat_right):
-            line = f"{label1:<9}: {val1:<6} {label2:<9}: {val2}"
-            combat_lines.append(line)
-
-        combat_block = "```" + "\n".join(combat_lines) + "```"
-        embed.add_field(name=":jigsaw: 보조 특성치", value=combat_block, inline=False)
-
-        # ────────── [4] 보유 재화 ──────────
-        money_str = f"{galleons} 갈레온 {sickles} 시클 {knuts} 크넛"
-        embed.add_field(name=":moneybag: 보유 재화", value=f"```\n{money_str}\n```", inline=False)
-
+        # 같은 row로 이미 그린 embed가 있으면 그대로 재사용 (rendering.profile_embed)
+        embed = discord.Embed.from_dict(profile_embed(user_data))
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
     @app_commands.command(name="기숙사선택", description="기숙사를 선택합니다.")
-    async def select_house(self, interaction: discord.Interaction):
-        """기숙사 선택 버튼을 보여주는 명령어"""
+    @app_commands.rename(house="기숙사")
+    @app_commands.describe(house="기숙사 이름 (비워 두면 선택 버튼을 보여줍니다)")
+    async def select_house(self, interaction: discord.Interaction, house: str = None):
+        """기숙사 선택 버튼을 보여주는 명령어 (기숙사 이름을 입력하면 바로 배정)"""
         user_id = str(interaction.user.id)
-        user_data = get_user(user_id)
+        user_data = await get_user(user_id)
 
         if not user_data:
             await interaction.response.send_message("❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요.", ephemeral=True)
             return
 
+        if user_data.house:
+            await interaction.response.send_message(
+                f"❌ 이미 {user_data.house} 기숙사에 배정되었습니다. 다시 변경할 수 없습니다!", ephemeral=True
+            )
+            return
+
+        if house:
+            # DB 조회/쓰기와 역할 수정(REST)까지 하므로 응답을 미뤄 둠
+            await interaction.response.defer(ephemeral=True)
+            error = await apply_house(interaction, house, user_data)
+            if error:
+                await interaction.followup.send(error, ephemeral=True)
+            else:
+                await interaction.followup.send(
+                    f"🏠 **{interaction.user.display_name} 님이 {house} 기숙사에 배정되었습니다!** 역할이 자동으로 부여되었습니다.",
+                    ephemeral=True
+                )
+            return
+
         view = HouseSelectionView(user_id)
         await interaction.response.send_message("🏠 **기숙사를 선택하세요!**", view=view, ephemeral=True)
 
+    @select_house.autocomplete("house")
+    async def house_autocomplete(self, interaction: discord.Interaction, current: str):
+        """기숙사 이름 자동완성 (메모리 색인에서 바로 응답)"""
+        return [app_commands.Choice(name=name, value=name) for name in catalog.search_houses(current)]
+
     @app_commands.command(name="성격선택", description="성격을 선택합니다.")
-    async def select_personality(self, interaction: discord.Interaction):
-        """사용자가 성격을 선택할 수 있도록 페이지네이션을 제공하는 명령어"""
+    @app_commands.rename(personality1="성격1", personality2="성격2", personality3="성격3", personality4="성격4")
+    @app_commands.describe(
+        personality1="성격 이름 (비워 두면 페이지에서 고를 수 있습니다)",
+        personality2="두 번째 성격",
+        personality3="세 번째 성격",
+        personality4="네 번째 성격",
+    )
+    async def select_personality(self, interaction: discord.Interaction, personality1: str = None,
+                                 personality2: str = None, personality3: str = None, personality4: str = None):
+        """사용자가 성격을 선택할 수 있도록 페이지네이션을 제공하는 명령어 (이름을 입력하면 한 번에 적용)"""
         user_id = str(interaction.user.id)
-        user_data = get_user(user_id)
+        user_data = await get_user(user_id)
 
         if not user_data:
             await interaction.response.send_message(
@@ -131,16 +108,33 @@ class ProfileCommands(discord.app_commands.Group):
             )
             return
 
-        personality = user_data[3]  # (id, name, house, personality, ...)
-
-        if personality and personality != "":
+        if user_data.personality:
             await interaction.response.send_message(
                 "❌ 이미 성격을 선택하셨습니다. 다시 변경할 수 없습니다!", ephemeral=True
             )
             return
 
-        # 🔹 첫 번째 페이지의 데이터만 불러오도록 변경
-        view = PersonalityPagesView(user_id, page=0)
+        # 🔹 자동완성으로 이름을 입력했다면 페이지 없이 바로 적용
+        chosen = [p for p in (personality1, personality2, personality3, personality4) if p]
+        if chosen:
+            chosen = list(dict.fromkeys(chosen))  # 중복 제거 (입력 순서 유지)
+            for name in chosen:
+                if not await get_personality_data(name):
+                    await interaction.response.send_message(f"❌ `{name}` 은(는) 없는 성격입니다.", ephemeral=True)
+                    return
+
+            success = await update_user_personalities(user_id, chosen)
+            if success:
+                await interaction.response.send_message(f"✅ 성격 `{', '.join(chosen)}` 이(가) 적용되었습니다!", ephemeral=True)
+            else:
+                await interaction.response.send_message("❌ 성격 업데이트에 실패했습니다.", ephemeral=True)
+            return
+
+        # 🔹 미리 나눠 둔 페이지 목록을 한 번에 받아 둠 (페이지 이동은 DB를 거치지 않음)
+        view = await PersonalityPagesView.create(user_id, page=0)
+        if not view.pages:
+            await interaction.response.send_message("❌ 선택할 수 있는 성격이 없습니다. 관리자에게 문의하세요.", ephemeral=True)
+            return
 
         # 첫 페이지의 내용을 포함하여 응답 전송
         await interaction.response.send_message(
@@ -150,6 +144,62 @@ class ProfileCommands(discord.app_commands.Group):
         )
    
 
+    @select_personality.autocomplete("personality1")
+    @select_personality.autocomplete("personality2")
+    @select_personality.autocomplete("personality3")
+    @select_personality.autocomplete("personality4")
+    async def personality_autocomplete(self, interaction: discord.Interaction, current: str):
+        """성격 이름 자동완성 (초성 검색 지원, 메모리 색인에서 바로 응답)"""
+        return [app_commands.Choice(name=name, value=name) for name in catalog.search_personalities(current)]
+   
+
+    @app_commands.command(name="기능", description="내 기능치와 남은 기능 점수를 확인합니다.")
+    async def view_skills(self, interaction: discord.Interaction):
+        """기능치 목록 (캐시된 기능치와 프로필로 바로 응답)"""
+        user_id = str(interaction.user.id)
+        user_data, sheet = await asyncio.gather(get_user(user_id), get_user_skills(user_id))
+
+        if not user_data or not sheet:
+            await interaction.response.send_message("❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요.", ephemeral=True)
+            return
+
+        items = sheet.items()
+        half = (len(items) + 1) // 2
+        lines = [
+            f"{left[0]:<8}: {left[1]:<3}  " + (f"{right[0]:<8}: {right[1]}" if right else "")
+            for left, right in zip(items[:half], items[half:] + [None])
+        ]
+        embed = discord.Embed(title=":books: 기능치", description="```" + "\n".join(lines) + "```", color=0x3498db)
+        embed.set_footer(text=f"남은 기능 점수: {user_data.skill_point - sheet.spent()} / {user_data.skill_point}")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @app_commands.command(name="기능배분", description="기능 점수를 여러 기능에 한 번에 배분합니다.")
+    @app_commands.rename(allocation="배분")
+    @app_commands.describe(allocation="기능 이름과 점수를 쉼표로 구분 (예: 관찰력 20, 심리학 15, 자동차 운전 10)")
+    async def allocate_skills(self, interaction: discord.Interaction, allocation: str):
+        """배분 전체를 검사한 뒤 한 트랜잭션으로 저장 (하나라도 문제가 있으면 아무것도 바꾸지 않음)"""
+        user_id = str(interaction.user.id)
+
+        try:
+            parsed = parse_allocation(allocation)
+        except ValueError as e:
+            await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+            return
+
+        result, detail = await allocate_skill_points(user_id, parsed)
+        if result is WriteResult.REJECTED:
+            await interaction.response.send_message(f"❌ {detail}", ephemeral=True)
+            return
+        if result is not WriteResult.UPDATED:
+            await send_write_result(interaction, result, "", "❌ 기능 점수 배분에 실패했습니다.")
+            return
+
+        user_data = await get_user(user_id)
+        changed = ", ".join(f"{name} {detail.value(name)} (+{points})" for name, points in parsed.items())
+        remaining = f" · 남은 기능 점수 {user_data.skill_point - detail.spent()}점" if user_data else ""
+        await interaction.response.send_message(f"✅ 기능 점수 배분 완료: {changed}{remaining}", ephemeral=True)
+
+
 class ProfileEditCommands(app_commands.Group):
     """프로필 변경 관련 명령어 그룹"""
 
@@ -157,57 +207,44 @@ class ProfileEditCommands(app_commands.Group):
     async def change_profile(self, interaction: discord.Interaction, new_name: str):
         """캐릭터 이름 변경"""
         user_id = str(interaction.user.id)
-        user_data = get_user(user_id)
-
-        if not user_data:
-            await interaction.response.send_message("❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요.", ephemeral=True)
-            return
 
-        success = update_user_name(user_id, new_name)
-        if success:
-            await interaction.response.send_message(f"✅ 이름이 `{new_name}`(으)로 변경되었습니다!", ephemeral=True)
-        else:
-            await interaction.response.send_message("❌ 이름 변경에 실패했습니다.", ephemeral=True)
+        result = await update_user_name(user_id, new_name)
+        await send_write_result(interaction, result, f"✅ 이름이 `{new_name}`(으)로 변경되었습니다!", "❌ 이름 변경에 실패했습니다.")
 
     @app_commands.command(name="크기", description="캐릭터 크기(SIZ) 스탯을 변경합니다.")
     async def change_size(self, interaction: discord.Interaction, new_size: int):
         """캐릭터 크기 변경"""
         user_id = str(interaction.user.id)
-        user_data = get_user(user_id)
-
-        if not user_data:
-            await interaction.response.send_message("❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요.", ephemeral=True)
-            return
 
         if not (1 <= new_size <= 100):
             await interaction.response.send_message("❌ 크기(SIZ)는 1에서 100 사이의 값만 가능합니다.", ephemeral=True)
             return
 
-        success = update_user_size(user_id, new_size)
-        if success:
-            await interaction.response.send_message(f"✅ 크기(SIZ)가 `{new_size}`(으)로 변경되었습니다!", ephemeral=True)
-        else:
-            await interaction.response.send_message("❌ 크기(SIZ) 변경에 실패했습니다.", ephemeral=True)
+        result = await update_user_size(user_id, new_size)
+        await send_write_result(interaction, result, f"✅ 크기(SIZ)가 `{new_size}`(으)로 변경되었습니다!", "❌ 크기(SIZ) 변경에 실패했습니다.")
 
     @app_commands.command(name="외모", description="캐릭터 외모(APP) 스탯을 변경합니다.")
     async def change_appearance(self, interaction: discord.Interaction, new_appearance: int):
         """캐릭터 외모 변경"""
         user_id = str(interaction.user.id)
-        user_data = get_user(user_id)
-
-        if not user_data:
-            await interaction.response.send_message("❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요.", ephemeral=True)
-            return
 
         if not (1 <= new_appearance <= 100):
             await interaction.response.send_message("❌ 외모(APP)는 1에서 100 사이의 값만 가능합니다.", ephemeral=True)
             return
 
-        success = update_user_appearance(user_id, new_appearance)
-        if success:
-            await interaction.response.send_message(f"🎭 외모(APP)가 `{new_appearance}`(으)로 변경되었습니다!", ephemeral=True)
-        else:
-            await interaction.response.send_message("❌ 외모(APP) 변경에 실패했습니다.", ephemeral=True)
+        result = await update_user_appearance(user_id, new_appearance)
+        await send_write_result(interaction, result, f"🎭 외모(APP)가 `{new_appearance}`(으)로 변경되었습니다!", "❌ 외모(APP) 변경에 실패했습니다.")
+
+
+async def send_write_result(interaction: discord.Interaction, result, success_message, failure_message):
+    """조건부 쓰기 결과(WriteResult)에 맞는 응답 전송"""
+    if result is WriteResult.UPDATED:
+        message = success_message
+    elif result is WriteResult.NOT_REGISTERED:
+        message = "❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요."
+    else:
+        message = failure_message
+    await interaction.response.send_message(message, ephemeral=True)
 
 
 class HouseSelectionView(discord.ui.View):
@@ -216,93 +253,153 @@ class HouseSelectionView(discord.ui.View):
         self.user_id = user_id
 
     @discord.ui.button(label="그리핀도르 🦁", style=discord.ButtonStyle.red)
+    @timed_callback
     async def gryffindor_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.assign_house(interaction, "그리핀도르")
 
     @discord.ui.button(label="슬리데린 🐍", style=discord.ButtonStyle.green)
+    @timed_callback
     async def slytherin_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.assign_house(interaction, "슬리데린")
 
     @discord.ui.button(label="래번클로 🦅", style=discord.ButtonStyle.blurple)
+    @timed_callback
     async def ravenclaw_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.assign_house(interaction, "래번클로")
 
     @discord.ui.button(label="후플푸프 🦡", style=discord.ButtonStyle.gray)
+    @timed_callback
     async def hufflepuff_button(self, interaction: discord.Interaction, button: discord.ui.Button):
         await self.assign_house(interaction, "후플푸프")
 
     async def assign_house(self, interaction: discord.Interaction, house: str):
         """기숙사를 선택하면 DB 업데이트 후 역할 부여"""
-        house_data = get_house_data(house)
-        if not house_data:
-            await interaction.response.send_message("❌ 해당 기숙사를 DB에서 찾을 수 없습니다.", ephemeral=True)
-            return
-
-        role_id = house_data["role_id"]
-        if not role_id:
-            await interaction.response.send_message("❌ 이 기숙사에 연결된 역할 ID가 없습니다.", ephemeral=True)
+        error = await apply_house(interaction, house)
+        if error:
+            await interaction.response.send_message(error, ephemeral=True)
             return
 
-        guild = interaction.guild
         user = interaction.user
-        role = guild.get_role(role_id)
-        if not role:
-            await interaction.response.send_message("❌ 해당 역할이 서버에 존재하지 않습니다. 관리자에게 문의해주세요.", ephemeral=True)
-            return
-
-        # 기존 기숙사 역할 제거
         try:
-            all_house_role_ids = get_all_house_roles()
-            for r in user.roles:
-                if r.id in all_house_role_ids:
-                    await user.remove_roles(r)
-        except discord.Forbidden:
-            await interaction.response.send_message("❌ 봇에게 역할을 제거할 권한이 없습니다. 관리자에게 문의하세요.", ephemeral=True)
-            return
+            # 버튼을 비활성화하여 중복 선택 방지
+            for child in self.children:
+                child.disabled = True
 
-        # 새 역할 부여
+            await interaction.response.edit_message(
+                content=f"🏠 **{user.display_name} 님이 {house} 기숙사에 배정되었습니다!** 역할이 자동으로 부여되었습니다.",
+                view=self  # 버튼 비활성화 적용된 View 업데이트
+            )
+        except discord.NotFound:
+            await interaction.followup.send(
+                f"🏠 **{user.display_name} 님이 {house} 기숙사에 배정되었습니다!** 역할이 자동으로 부여되었습니다.",
+                ephemeral=True
+            )
+
+async def apply_house(interaction: discord.Interaction, house: str, user_data=None):
+    """
+    기숙사 역할 부여와 DB 업데이트 (버튼과 `/프로필 기숙사선택 house:` 공용).
+    역할은 바꿀 최종 목록을 계산해 한 번의 멤버 수정으로 적용하고, DB 쓰기와 동시에 진행한다.
+    한쪽이 실패하면 성공한 다른 쪽을 원래대로 되돌린다.
+    user_data: 호출한 쪽에서 이미 조회한 유저 정보 (없으면 여기서 조회)
+    반환: 실패하면 유저에게 보여줄 오류 메시지, 성공하면 None
+    """
+    house_data = await get_house_data(house)
+    if not house_data:
+        return "❌ 해당 기숙사를 DB에서 찾을 수 없습니다."
+
+    role_id = house_data.role_id
+    if not role_id:
+        return "❌ 이 기숙사에 연결된 역할 ID가 없습니다."
+
+    guild = interaction.guild
+    user = interaction.user
+    role = guild.get_role(role_id)
+    if not role:
+        return "❌ 해당 역할이 서버에 존재하지 않습니다. 관리자에게 문의해주세요."
+
+    user_id = str(user.id)
+    if user_data is None:
+        user_data = await get_user(user_id)
+    if not user_data:
+        return "❌ 등록된 정보가 없습니다! `/프로필 등록`을 먼저 해주세요."
+    # update_user_house는 이전 기숙사 보너스를 빼지 않으므로 다시 배정하면 능력치가 겹쳐 쌓인다
+    if user_data.house:
+        return f"❌ 이미 {user_data.house} 기숙사에 배정되었습니다. 다시 변경할 수 없습니다!"
+    previous_house = user_data.house
+
+    # 기존 기숙사 역할을 뺀 나머지 + 새 기숙사 역할 (@everyone은 목록에 넣지 않음)
+    all_house_role_ids = await get_all_house_roles()
+    old_roles = [r for r in user.roles if not r.is_default()]
+    new_roles = [r for r in old_roles if r.id not in all_house_role_ids] + [role]
+    roles_changed = set(new_roles) != set(old_roles)
+
+    async def edit_roles():
+        if roles_changed:
+            await user.edit(roles=new_roles, reason=f"기숙사 배정: {house}")
+
+    # 역할 수정(REST 1회)과 DB 업데이트를 동시에
+    role_result, db_result = await asyncio.gather(
+        edit_roles(),
+        update_user_house(user_id, house),
+        return_exceptions=True
+    )
+    role_ok = not isinstance(role_result, BaseException)
+    db_ok = db_result is True
+
+    if role_ok and db_ok:
+        return None
+
+    # 한쪽만 성공했다면 되돌리기. 되돌리기까지 실패하면 DB와 역할이 어긋난 채로 남으므로 기록하고 알린다
+    inconsistent = False
+    if db_ok:
         try:
-            await user.add_roles(role)
-        except discord.Forbidden:
-            await interaction.response.send_message("❌ 봇에게 역할을 추가할 권한이 없습니다. 관리자에게 문의하세요.", ephemeral=True)
-            return
+            reverted = await revert_user_house(user_id, house, previous_house)
+        except Exception as e:
+            print(f"❌ 기숙사 되돌리기 중 오류: {user_id} - {e}")
+            reverted = False
+        if not reverted:
+            print(f"❌ 기숙사 불일치: {user_id} - DB는 {house}, 역할은 이전 상태 ({previous_house or '미정'}). GM 확인 필요")
+            inconsistent = True
+    if role_ok and roles_changed:
+        try:
+            await user.edit(roles=old_roles, reason="기숙사 배정 실패로 역할 복구")
+        except discord.HTTPException as e:
+            print(f"❌ 기숙사 불일치: {user_id} - 역할은 {house}, DB는 이전 상태 ({previous_house or '미정'}). GM 확인 필요 ({e})")
+            inconsistent = True
 
-        # DB 업데이트
-        success = update_user_house(str(user.id), house)
-        if success:
-            try:
-                # 버튼을 비활성화하여 중복 선택 방지
-                for child in self.children:
-                    child.disabled = True
-
-                await interaction.response.edit_message(
-                    content=f"🏠 **{user.display_name} 님이 {house} 기숙사에 배정되었습니다!** 역할이 자동으로 부여되었습니다.",
-                    view=self  # 버튼 비활성화 적용된 View 업데이트
-                )
-            except discord.NotFound:
-                await interaction.followup.send(
-                    f"🏠 **{user.display_name} 님이 {house} 기숙사에 배정되었습니다!** 역할이 자동으로 부여되었습니다.",
-                    ephemeral=True
-                )
-        else:
-            await interaction.response.send_message("❌ 기숙사 업데이트에 실패했습니다. 관리자에게 문의하세요.", ephemeral=True)
+    if inconsistent:
+        return "⚠️ 기숙사 배정에 실패했고, 되돌리는 중에도 오류가 나서 프로필과 역할이 서로 다를 수 있습니다. GM에게 문의해주세요."
+    if isinstance(role_result, discord.Forbidden):
+        return "❌ 봇에게 역할을 변경할 권한이 없습니다. 관리자에게 문의하세요."
+    if not role_ok:
+        return "❌ 역할 변경 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+    return "❌ 기숙사 업데이트에 실패했습니다. 관리자에게 문의하세요."
+
+PERSONALITY_PAGE_SIZE = 7
 
 class PersonalityPagesView(discord.ui.View):
-    def __init__(self, user_id, page=0):
+    def __init__(self, user_id, pages, page=0):
         super().__init__(timeout=60)
         self.user_id = user_id
+        self.pages = pages  # 🔹 미리 나눠 둔 페이지 튜플 (페이지 수 = 실제 성격 개수 기준)
         self.page = page
         self.selected_personalities = set()  # 🔹 선택한 성격을 저장하는 집합
-        self.load_page_data()  # 현재 페이지 데이터 불러오기
+        if self.pages:
+            self.load_page_data()  # 현재 페이지 데이터 불러오기
+
+    @classmethod
+    async def create(cls, user_id, page=0):
+        """페이지 목록을 받아 View를 만듦 (참조 데이터 조회는 비동기로 처리)"""
+        pages = await get_personality_pages(page_size=PERSONALITY_PAGE_SIZE)
+        return cls(user_id, pages, page=page)
 
     def load_page_data(self):
-        """현재 페이지 데이터를 DB에서 불러옴 (최적화된 방식)"""
-        self.personality_list = get_personality_list(page=self.page, page_size=7)
+        """현재 페이지 데이터를 미리 나눠 둔 페이지에서 꺼냄 (DB 조회 없음)"""
+        self.personality_list = self.pages[self.page]
         self.update_options()
 
     def update_options(self):
         """현재 페이지에 맞게 SelectMenu 옵션을 갱신"""
-        self.personality_list = get_personality_list(page=self.page, page_size=7)
 
         # 기존 SelectMenu 제거 후 새로 추가
         if hasattr(self, "select_menu"):
@@ -314,10 +411,9 @@ class PersonalityPagesView(discord.ui.View):
         # 페이지 버튼 상태 업데이트
         self.prev_page.disabled = (self.page == 0)
         
-        # 🔹 마지막 페이지에서도 버튼이 보이도록 수정
-        total_personalities = 28  # 실제 DB에서 가져오는 개수 (수동 지정 가능)
-        last_page = (total_personalities - 1) // 7  # 마지막 페이지 번호 계산
-        self.next_page.disabled = (self.page >= last_page)  # 🔹 마지막 페이지까지만 활성화
+        # 🔹 마지막 페이지까지만 다음 버튼 활성화
+        last_page = len(self.pages) - 1
+        self.next_page.disabled = (self.page >= last_page)
 
         # 선택 완료 버튼 추가 (선택한 성격이 있을 때만 활성화)
         if hasattr(self, "confirm_button"):
@@ -327,6 +423,7 @@ class PersonalityPagesView(discord.ui.View):
         self.add_item(self.confirm_button)
 
 
+    @timed_callback
     async def confirm_selection(self, interaction: discord.Interaction):
         """선택한 성격을 최종적으로 저장"""
         if not self.selected_personalities:
@@ -334,7 +431,7 @@ class PersonalityPagesView(discord.ui.View):
             return
 
         # DB 반영
-        success = update_user_personalities(self.user_id, list(self.selected_personalities))
+        success = await update_user_personalities(self.user_id, list(self.selected_personalities))
         if success:
             await interaction.response.send_message(
                 f"✅ 성격 `{', '.join(self.selected_personalities)}` 이(가) 적용되었습니다!",
@@ -353,6 +450,7 @@ class PersonalityPagesView(discord.ui.View):
             child.disabled = True
 
     @discord.ui.button(label="이전", style=discord.ButtonStyle.gray, disabled=True)
+    @timed_callback
     async def prev_page(self, interaction: discord.Interaction, button: discord.ui.Button):
         """이전 페이지 버튼"""
         self.page -= 1
@@ -363,6 +461,7 @@ class PersonalityPagesView(discord.ui.View):
         )
 
     @discord.ui.button(label="다음", style=discord.ButtonStyle.gray)
+    @timed_callback
     async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
         """다음 페이지 버튼"""
         self.page += 1
@@ -374,10 +473,12 @@ class PersonalityPagesView(discord.ui.View):
 
 class PersonalitySelect(discord.ui.Select):
     def __init__(self, parent_view: PersonalityPagesView):
-        options = [discord.SelectOption(label=p["name"], value=p["name"]) for p in parent_view.personality_list]
-        super().__init__(placeholder="원하는 성격을 선택하세요!", min_values=1, max_values=4, options=options)
+        options = [discord.SelectOption(label=p.name, value=p.name) for p in parent_view.personality_list]
+        # 마지막 페이지는 옵션이 4개보다 적을 수 있음
+        super().__init__(placeholder="원하는 성격을 선택하세요!", min_values=1, max_values=min(4, len(options)), options=options)
         self.parent_view = parent_view  # 🔹 `view` 대신 `parent_view`를 사용
 
+    @timed_callback
     async def callback(self, interaction: discord.Interaction):
         """사용자가 성격을 선택하면 `PersonalityPagesView`에 저장 또는 삭제"""
         selected_values = set(self.values)  # 사용자가 선택한 값 (set 사용)
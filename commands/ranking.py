@@ -0,0 +1,48 @@
+import discord
+from discord import app_commands
+from catalog import catalog
+from ranking import ranking
+from rendering import format_currency
+
+# 한 번에 보여줄 순위 수
+RANKING_SIZE = 10
+
+METRIC_LABELS = {"money": "재화", "luck": "행운", "sanity": "이성"}
+
+
+def format_metric(metric, value):
+    return format_currency(value) if metric == "money" else str(value)
+
+
+@app_commands.command(name="순위", description="재화/행운/이성 순위를 확인합니다.")
+@app_commands.rename(metric="기준", house="기숙사")
+@app_commands.describe(metric="순위 기준", house="기숙사별 순위 (비워 두면 전체 순위)")
+@app_commands.choices(metric=[app_commands.Choice(name=label, value=key) for key, label in METRIC_LABELS.items()])
+async def show_ranking(interaction: discord.Interaction, metric: app_commands.Choice[str], house: str = None):
+    """메모리 순위표에서 바로 조회 (DB를 거치지 않음)"""
+    if house and not catalog.has_house(house):
+        await interaction.response.send_message(f"❌ `{house}` 기숙사를 찾을 수 없습니다.", ephemeral=True)
+        return
+
+    title = f"🏆 {house + ' ' if house else ''}{metric.name} 순위"
+    top = ranking.top(metric.value, house, RANKING_SIZE)
+    if not top:
+        await interaction.response.send_message(f"{title}\n아직 순위에 오른 유저가 없습니다.", ephemeral=True)
+        return
+
+    lines = [f"**{rank}.** {name} — `{format_metric(metric.value, value)}`" for rank, _, name, value in top]
+    embed = discord.Embed(title=title, description="\n".join(lines), color=discord.Color.gold())
+
+    my_rank, total, my_value = ranking.rank(metric.value, interaction.user.id, house)
+    if my_rank is not None:
+        embed.set_footer(text=f"내 순위: {my_rank}위 / {total}명 ({format_metric(metric.value, my_value)})")
+    else:
+        embed.set_footer(text=f"전체 {total}명")
+
+    await interaction.response.send_message(embed=embed)
+
+
+@show_ranking.autocomplete("house")
+async def house_autocomplete(interaction: discord.Interaction, current: str):
+    """기숙사 이름 자동완성 (메모리 색인에서 바로 응답)"""
+    return [app_commands.Choice(name=name, value=name) for name in catalog.search_houses(current)]
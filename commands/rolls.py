@@ -0,0 +1,81 @@
+import discord
+from discord import app_commands
+import dice
+from autocomplete import PrefixIndex
+from skills import SKILL_NAMES
+from db_async import get_user, get_user_skill
+
+# 디스코드 메시지 최대 길이. 눈 목록까지 넣으면 넘칠 때는 합계만 보냄
+MESSAGE_LIMIT = 2000
+
+# 기능 이름 자동완성 (모든 탐사자의 기능 목록은 같으므로 기본 기능치 표에서 한 번 만듦)
+SKILL_SEARCH_INDEX = PrefixIndex(SKILL_NAMES)
+
+
+def format_roll(expression, result):
+    """🎲 `식` → **합계** (눈...)"""
+    faces = " / ".join(
+        f"{'-' if group.sign < 0 else ''}{', '.join(map(str, rolls))}"
+        for group, rolls in zip(expression.groups, result.rolls)
+    )
+    return f"**{result.total}**" + (f" ({faces})" if faces else "")
+
+
+@app_commands.command(name="굴림", description="주사위를 굴립니다. (예: 3d6×5, 1d100, 1d3+db)")
+@app_commands.rename(text="식", times="횟수")
+@app_commands.describe(text="주사위 식 (NdM±K, ×5, db = 내 피해 보너스)", times="같은 식을 몇 번 굴릴지")
+async def roll_dice(interaction: discord.Interaction, text: app_commands.Range[str, 1, 100],
+                    times: app_commands.Range[int, 1, 10] = 1):
+    """주사위 식 굴림 (피해 보너스를 쓸 때만 프로필을 읽음)"""
+    # 식 안의 "db"(또는 "피해보너스")는 굴리는 사람의 피해 보너스로 바꿔서 굴림 ("1d3+db")
+    if dice.DAMAGE_BONUS_PATTERN.search(text):
+        user_data = await get_user(str(interaction.user.id))
+        if not user_data:
+            await interaction.response.send_message("❌ `db`를 쓰려면 먼저 `/프로필 등록`을 해주세요.", ephemeral=True)
+            return
+        text = dice.substitute_damage_bonus(text, user_data.damage_bonus)
+
+    try:
+        expression = dice.compile_expression(text)
+        results = expression.roll(times)
+    except dice.DiceError as e:
+        await interaction.response.send_message(f"❌ {e}", ephemeral=True)
+        return
+
+    def compose(lines):
+        return f"🎲 `{text}` → " + ("\n".join(lines) if times == 1 else "\n" + "\n".join(lines))
+
+    message = compose([format_roll(expression, result) for result in results])
+    if len(message) > MESSAGE_LIMIT:
+        # 100d6 × 10 같은 굴림은 눈 목록이 2000자를 넘으므로 합계만
+        message = compose([f"**{result.total}**" for result in results]) + "\n(주사위 눈 목록은 길어서 생략)"
+    await interaction.response.send_message(message)
+
+
+@app_commands.command(name="판정", description="기능 판정을 굴립니다.")
+@app_commands.rename(skill="기능", bonus="보너스", penalty="패널티")
+@app_commands.describe(skill="판정할 기능 이름", bonus="보너스 주사위 수", penalty="패널티 주사위 수")
+async def check_skill(interaction: discord.Interaction, skill: str,
+                      bonus: app_commands.Range[int, 0, 2] = 0, penalty: app_commands.Range[int, 0, 2] = 0):
+    """캐시된 기능치로 d100 판정"""
+    target = await get_user_skill(str(interaction.user.id), skill)
+    if target is None:
+        await interaction.response.send_message(f"❌ `{skill}` 기능치를 찾을 수 없습니다. (등록 여부와 기능 이름을 확인하세요)", ephemeral=True)
+        return
+
+    result = dice.skill_check(target, bonus, penalty)
+    detail = ""
+    if len(result.tens) > 1:
+        detail = f" (십의 자리 {', '.join(f'{ten:02d}' for ten in result.tens)} / 일의 자리 {result.units})"
+
+    emoji = "✅" if result.success else "❌"
+    await interaction.response.send_message(
+        f"🎲 **{interaction.user.display_name}** — {skill} ({target}/{target // 2}/{target // 5})\n"
+        f"{emoji} `{result.roll}`{detail} → **{result.level}**"
+    )
+
+
+@check_skill.autocomplete("skill")
+async def skill_autocomplete(interaction: discord.Interaction, current: str):
+    """기능 이름 자동완성 (초성 검색 지원)"""
+    return [app_commands.Choice(name=name, value=name) for name in SKILL_SEARCH_INDEX.search(current)]
@@ -0,0 +1 @@
+# pytest가 저장소 최상위 모듈(dice, stats ...)을 바로 import할 수 있도록 이 디렉터리를 sys.path에 넣게 하는 파일
@@ -1,187 +1,285 @@
+import enum
 import os
-import urllib.parse
 import mysql.connector
-import random
-from dotenv import load_dotenv
-
-# 환경 변수 로드
-load_dotenv()
-DATABASE_URL = os.getenv("DATABASE_URL")
-
-# DATABASE_URL을 안전하게 분석하는 함수
-def get_db_config():
-    if not DATABASE_URL:
-        raise ValueError("❌ ERROR: DATABASE_URL 환경 변수가 설정되지 않았습니다.")
-
-    url = urllib.parse.urlparse(DATABASE_URL)
-
-    return {
-        "host": url.hostname,
-        "user": url.username,
-        "password": url.password,
-        "database": url.path.lstrip("/"),
-        "port": url.port or 3306  # 포트가 없으면 기본값(3306) 사용
-    }
+from mysql.connector import errorcode
+from contextlib import closing
+
+# 연결은 db_pool의 공유 풀에서 빌려 쓴다 (DATABASE_URL 분석도 db_pool에서 한 번만)
+from db_pool import connection
+from statements import StatementCursor, statement_stats
+from cache import LRUCache
+from catalog import catalog
+from ledger import ledger
+from ranking import ranking
+import dice
+import balance
+from skills import SkillSheet, default_skills, validate_allocation
+import queries
+from records import UserProfile
+from stats import BASE_STATS, calculate_derived_stats, derive_from, apply_stat_changes
 
 # ---------------------------------------
-# 1. 초기 테이블 생성 파트
+# 1. 스키마
 # ---------------------------------------
-try:
-    db_config = get_db_config()
-    conn = mysql.connector.connect(**db_config)
-    cursor = conn.cursor()
+# 테이블 생성/변경은 migrations 패키지에서 관리한다. (`python -m migrations upgrade`)
+# 이 모듈은 import할 때 DB에 접속하지 않는다.
 
-    try:
-        cursor.execute("ALTER TABLE users ADD COLUMN skill_point INT DEFAULT 0")
-        print("✅ 완료!")
-    except mysql.connector.Error as e:
-        print(f"❌ 실패: {e}")
 
-    conn.commit()
+# ---------------------------------------
+# 2. 데이터베이스 함수 파트
+# ---------------------------------------
+class WriteResult(enum.Enum):
+    """
+    조건부 쓰기 결과. 미리 get_user로 존재 여부를 확인하지 않고, 쓰기 문장 하나의 rowcount로 구분한다.
+    (연결에 FOUND_ROWS 플래그가 켜져 있어 같은 값으로 UPDATE해도 rowcount는 1)
+    """
+    UPDATED = "updated"
+    REGISTERED = "registered"
+    NOT_REGISTERED = "not_registered"
+    ALREADY_REGISTERED = "already_registered"
+    REJECTED = "rejected"  # 검증에서 거부됨 (아무것도 쓰지 않음)
+    ERROR = "error"
+
+# get_user 결과 캐시 (user_id -> row). 유저 row를 바꾸는 함수는 commit 직후 무효화한다.
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "1024"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "300"))
+profile_cache = LRUCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+# 유저별 기능치 캐시 (user_id -> skills.SkillSheet). 판정할 때 DB를 매번 읽지 않도록
+skill_cache = LRUCache(maxsize=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL)
+
+def _write_stats(cursor, user_id, assign=None, bonus=None):
+    """
+    기본 특성치 변경과 보조 스탯 재계산을 한 번의 UPDATE로 처리.
+    SELECT ... FOR UPDATE로 row를 잠근 뒤 쓰므로, 호출한 쪽의 트랜잭션 안에서
+    기본 스탯과 보조 스탯이 서로 어긋나는 순간이 생기지 않는다.
+    반환: 저장한 컬럼 값 dict, 유저가 없으면 None (commit은 호출한 쪽에서)
+    """
+    cursor.execute(queries.SELECT_BASE_STATS_FOR_UPDATE, (user_id,))
+    row = cursor.fetchone()
+    if not row:
+        return None
 
-except Exception as e:
-    print(f"❌ MySQL 오류 발생: {e}")
+    base = apply_stat_changes(dict(zip(BASE_STATS, row)), assign, bonus)
+    derived = derive_from(base)
 
-finally:
-    cursor.close()
-    conn.close()
-    print("🔌 MySQL 연결 종료")
+    # 바뀐 컬럼(assign/bonus)과 보조 스탯 전체를 함께 저장
+    values = {name: base[name] for name in (assign or {})}
+    values.update({name: base[name] for name in (bonus or {})})
+    values.update(derived)
 
+    cursor.execute(queries.update_user_columns(tuple(values)), (*values.values(), user_id))
+    return values
 
-# ---------------------------------------
-# 2. 데이터베이스 함수 파트
-# ---------------------------------------
 def get_user(user_id):
-    """유저 정보 조회"""
+    """유저 정보 조회 → UserProfile (캐시에 있으면 DB를 거치지 않음)"""
+    cached = profile_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    token = profile_cache.token()
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT user_id, name, house, personality, strength, constitution, size, intelligence, 
-                   willpower, dexterity, appearance, education, money, luck, movement, damage_bonus, 
-                   build, hp, mp, sanity, status 
-            FROM users WHERE user_id = %s
-        """, (user_id,))
-        result = cursor.fetchone()
-        return result  # 유저가 없다면 None 반환
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(queries.SELECT_USER, (user_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None  # 등록되지 않은 유저
+            profile = UserProfile._make(row)
+            profile_cache.put(user_id, profile, token)
+            return profile
     except mysql.connector.Error as e:
         print(f"❌ 유저 조회 실패: {e}")
         return None
-    finally:
-        cursor.close()
-        conn.close()
+
+def get_default_skills(education, dexterity):
+    """신규 탐사자의 기본 기능치 (기능 이름 → 기본 점수, 표는 skills.py)"""
+    return default_skills(education, dexterity)
+
+def _new_user(user_id, user_name):
+    """
+    신규 유저의 users row 값과 기본 기능치 row들을 계산.
+    반환: (INSERT_USER 파라미터 튜플, [(user_id, 기능 이름, 기본 점수), ...], 순위표에 넣을 값 dict)
+    """
+    # 행운 주사위 굴리기
+    luck_value = roll_luck()
+
+    # 기본값 계산
+    base_strength = base_constitution = base_size = base_intelligence = base_dexterity = base_willpower = base_appearance = base_education = 50
+
+    # 보조 스탯을 미리 계산해서 유저 row를 한 번에 완성된 상태로 넣는다
+    derived = calculate_derived_stats(
+        base_strength, base_constitution, base_size, base_dexterity,
+        base_willpower, base_intelligence, base_education
+    )
+
+    user_row = (user_id, user_name, base_strength, base_constitution, base_size, base_intelligence, base_dexterity, base_willpower, base_appearance, base_education, luck_value,
+                derived["hp"], derived["mp"], derived["sanity"], derived["movement"], derived["damage_bonus"], derived["build"], derived["status"], derived["skill_point"])
+    skill_rows = [(user_id, skill_name, basic_point) for skill_name, basic_point in get_default_skills(base_education, base_dexterity).items()]
+    return user_row, skill_rows, {"name": user_name, "luck": luck_value, "sanity": derived["sanity"]}
+
+def _insert_rows(cursor, builder, rows):
+    """
+    multi-row INSERT를 정해진 row 수 묶음(queries.row_chunks)으로 나눠 실행.
+    반환: 모든 묶음의 rowcount 합
+    """
+    affected = 0
+    for chunk in queries.row_chunks(rows):
+        cursor.execute(builder(len(chunk)), tuple(value for row in chunk for value in row))
+        affected += cursor.rowcount
+    return affected
+
+def _insert_skill_rows(cursor, skill_rows):
+    _insert_rows(cursor, queries.insert_skills, skill_rows)
+
+def _is_duplicate_key(error):
+    """이미 있는 유저를 넣으려다 난 오류인지 (users INSERT에서만 사용)"""
+    return error.errno == errorcode.ER_DUP_ENTRY
 
 def register_user(user_id, user_name):
-    """유저 등록"""
+    """
+    유저 등록
+    유저 row(보조 스탯 포함)와 기본 기능치 전체를 하나의 트랜잭션으로 저장한다.
+    이미 등록된 유저면 users INSERT가 중복 키 오류를 내므로 미리 조회하지 않고 구분할 수 있다.
+    (그 밖의 오류는 그대로 ERROR)
+    반환: WriteResult.REGISTERED / ALREADY_REGISTERED / ERROR
+    """
+    user_row, skill_rows, ranking_values = _new_user(user_id, user_name)
+
     try:
-        db_config = get_db_config()  # DB 설정 불러오기
-        conn = mysql.connector.connect(**db_config)  # 새로운 DB 연결
-        cursor = conn.cursor()
-
-        # 행운 주사위 굴리기
-        luck_value = roll_luck()
-
-        # 기본값 계산
-        base_strength = base_constitution = base_size = base_dexterity = base_willpower = base_appearance = base_education = 50
-
-        cursor.execute(
-            "INSERT INTO users (user_id, name, house, personality,strength, constitution, size, dexterity, willpower, appearance, education, luck, hp, mp, sanity, status)"
-            "VALUES (%s, %s, NULL, NULL, %s, %s, %s, %s, %s, %s, %s, %s, 0, 0, 0, 'N')",
-            (user_id, user_name, base_strength, base_constitution, base_size, base_dexterity, base_willpower, base_appearance, base_education, luck_value)
-        )
-
-        if cursor.rowcount > 0:
-            print(f"✅ 유저 등록 완료: {user_id} - {user_name}")
-
-            default_skills = {
-                "감정": 5, "고고학": 1, "관찰력": 25, "근접전(격투)": 25, "기계수리": 10,
-                "도약": 20, "듣기": 20, "말재주": 5, "매혹": 15, "법률": 5,
-                "변장": 5, "사격(권총)": 20, "사격(라/산)": 25, "설득": 10, "손놀림":10,
-                "수영": 20, "승마": 5, "심리학": 10, "언어(모국어)": base_education, "역사": 5,
-                "열쇠공": 1, "오르기": 20, "오컬트": 5, "위협": 15, "은밀행동": 20,
-                "응급처치": 30, "의료": 1, "인류학": 1, "자동차 운전": 20, "자료조사": 20,
-                "자연": 10, "전기수리": 10, "정신분석": 1, "중장비 조작": 1, "추적": 10,
-                "크툴루 신화": 0, "투척": 20, "항법": 10, "회계": 5, "회피": base_dexterity // 2
-            }
-
-            for skill_name, basic_point in default_skills.items():
-                cursor.execute(
-                    "INSERT INTO investigator (user_id, name, basic_point, add_point) VALUES (%s, %s, %s, 0)",
-                    (user_id, skill_name, basic_point)
-                )
-
-            print(f"✅ {user_name}의 기본 기능치 추가 완료!")
-        conn.commit()
-
-        updated = (cursor.rowcount > 0)
-        if updated:
-            print(f"✅ 유저 등록 완료: {user_id} - {user_name}")
-            update_user_state(user_id)
-        return updated
-    
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            # autocommit이 꺼져 있으므로 commit까지가 하나의 트랜잭션 (실패하면 풀 반납 시 롤백)
+            try:
+                cursor.execute(queries.INSERT_USER, user_row)
+            except mysql.connector.IntegrityError as e:
+                if not _is_duplicate_key(e):
+                    raise
+                return WriteResult.ALREADY_REGISTERED  # 열린 트랜잭션은 풀 반납 시 롤백
+
+            # 기본 기능치는 multi-row INSERT 한 번으로
+            _insert_skill_rows(cursor, skill_rows)
+
+            # 재화 초기값은 테이블 기본값을 따르므로 순위표용으로 읽어 둔다
+            cursor.execute(queries.SELECT_MONEY, (user_id,))
+            (money,) = cursor.fetchone()
+
+            conn.commit()
+            profile_cache.invalidate(user_id)
+            skill_cache.invalidate(user_id)
     except mysql.connector.Error as e:
         print(f"❌ 유저 등록 실패: {e}")
-        return False
+        return WriteResult.ERROR
 
-    finally:
-        cursor.close()
-        conn.close()
+    ranking.update(user_id, {**ranking_values, "money": money})
+    print(f"✅ 유저 등록 완료: {user_id} - {user_name} (기본 기능치 {len(skill_rows)}개)")
+    return WriteResult.REGISTERED
 
-def update_user_name(user_id, new_name):
-    """유저 이름 변경"""
-    try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
+def register_users(requests):
+    """
+    여러 유저를 한 트랜잭션(commit 1번)으로 등록. 가입이 몰릴 때 registration.RegistrationQueue가 묶어서 호출한다.
+    requests: [(user_id, user_name), ...]
+    반환: requests와 같은 순서의 WriteResult 리스트 (같은 묶음 안의 중복 요청은 뒤쪽이 ALREADY_REGISTERED)
+    """
+    results = [None] * len(requests)
+    first_index = {}
+    for index, (user_id, _) in enumerate(requests):
+        if user_id in first_index:
+            results[index] = WriteResult.ALREADY_REGISTERED
+        else:
+            first_index[user_id] = index
+    if not first_index:
+        return results
 
-        cursor.execute("UPDATE users SET name = %s WHERE user_id = %s", (new_name, user_id))
-        conn.commit()
+    user_ids = list(first_index)
+    new_users = {user_id: _new_user(user_id, requests[index][1]) for user_id, index in first_index.items()}
+    raced = False
+
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            # 이미 등록된 유저 확인 (잠금 읽기라서 없는 키 구간도 잠겨 그 사이 단건 등록이 끼어들기 어렵다)
+            existing = set(_select_money_for_update(cursor, user_ids))
+            fresh = [user_id for user_id in user_ids if user_id not in existing]
+
+            money = {}
+            if fresh:
+                try:
+                    _insert_rows(cursor, queries.insert_users, [new_users[user_id][0] for user_id in fresh])
+                except mysql.connector.IntegrityError as e:
+                    if not _is_duplicate_key(e):
+                        raise
+                    # 확인과 INSERT 사이에 다른 등록이 끼어듦 → 묶음을 버리고 아래에서 한 명씩 처리
+                    conn.rollback()
+                    raced = True
+                else:
+                    _insert_skill_rows(cursor, [row for user_id in fresh for row in new_users[user_id][1]])
+                    money = _select_money_for_update(cursor, fresh)
+            if not raced:
+                conn.commit()
     except mysql.connector.Error as e:
-        print(f"❌ 이름 변경 실패: {e}")
-    finally:
-        cursor.close()
-        conn.close()
+        print(f"❌ 유저 일괄 등록 실패 ({len(user_ids)}명): {e}")
+        return [result or WriteResult.ERROR for result in results]
 
-def update_user_size(user_id, new_size):
-    """유저가 크기(size) 값을 변경"""
+    if raced:
+        return [result or register_user(*request) for result, request in zip(results, requests)]
+
+    for user_id in fresh:
+        profile_cache.invalidate(user_id)
+        skill_cache.invalidate(user_id)
+        ranking.update(user_id, {**new_users[user_id][2], "money": money[user_id]})
+    for user_id, index in first_index.items():
+        results[index] = WriteResult.ALREADY_REGISTERED if user_id in existing else WriteResult.REGISTERED
+
+    print(f"✅ 유저 일괄 등록 완료: {len(fresh)}명 (이미 등록 {len(existing)}명)")
+    return results
+
+def _update_user_row(sql, params, user_id, label):
+    """users row 하나를 바꾸는 UPDATE 한 번. 반환: UPDATED / NOT_REGISTERED / ERROR"""
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(sql, params)
+            matched = cursor.rowcount
+            conn.commit()
+            profile_cache.invalidate(user_id)
+    except mysql.connector.Error as e:
+        print(f"❌ {label} 변경 실패: {e}")
+        return WriteResult.ERROR
 
-        cursor.execute("UPDATE users SET size = %s WHERE user_id = %s", (new_size, user_id))
-        conn.commit()
+    return WriteResult.UPDATED if matched > 0 else WriteResult.NOT_REGISTERED
 
-        updated = (cursor.rowcount > 0)
-        if updated:
-            update_user_state(user_id)
-        return updated
+def update_user_name(user_id, new_name):
+    """유저 이름 변경. 반환: WriteResult"""
+    result = _update_user_row(queries.UPDATE_USER_NAME, (new_name, user_id), user_id, "이름")
+    if result is WriteResult.UPDATED:
+        ranking.update(user_id, {"name": new_name})
+    return result
 
+def update_user_size(user_id, new_size):
+    """
+    유저가 크기(size) 값을 변경 (보조 스탯도 같은 UPDATE로 갱신).
+    보조 스탯을 계산하려면 현재 특성치가 필요하므로 같은 트랜잭션에서 잠그고 읽는다.
+    반환: WriteResult
+    """
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            values = _write_stats(cursor, user_id, assign={"size": new_size})
+            if values is None:
+                return WriteResult.NOT_REGISTERED
+            conn.commit()
+            profile_cache.invalidate(user_id)
     except mysql.connector.Error as e:
         print(f"❌ 크기(size) 변경 실패: {e}")
-        return False
-    finally:
-        cursor.close()
-        conn.close()
+        return WriteResult.ERROR
+
+    ranking.update(user_id, values)
+    return WriteResult.UPDATED
 
 def update_user_appearance(user_id, new_appearance):
-    """유저가 외모(appearance) 값을 변경"""
-    try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
+    """유저가 외모(appearance) 값을 변경. 반환: WriteResult"""
+    return _update_user_row(queries.UPDATE_USER_APPEARANCE, (new_appearance, user_id), user_id, "외모(appearance)")
 
-        cursor.execute("UPDATE users SET appearance = %s WHERE user_id = %s", (new_appearance, user_id))
-        conn.commit()
-        return cursor.rowcount > 0
-    except mysql.connector.Error as e:
-        print(f"❌ 외모(appearance) 변경 실패: {e}")
-        return False
-    finally:
-        cursor.close()
-        conn.close()
+HOUSE_BONUS_STATS = ("strength", "constitution", "size", "intelligence", "willpower", "dexterity")
+
+def _house_bonus(house_data, sign=1):
+    """기숙사 row에서 특성치 보너스 dict를 만듦 (sign=-1이면 보너스를 되돌리는 값)"""
+    return {name: sign * getattr(house_data, name) for name in HOUSE_BONUS_STATS}
 
 def update_user_house(user_id, house_name):
     """유저 기숙사 적용"""
@@ -189,51 +287,40 @@ def update_user_house(user_id, house_name):
     if not house_data:
         return False
 
-    strength_boost      = house_data["strength"]
-    constitution_boost  = house_data["constitution"]
-    size_boost          = house_data["size"]
-    intelligence_boost  = house_data["intelligence"]
-    willpower_boost     = house_data["willpower"]
-    dexterity_boost     = house_data["dexterity"]
-
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            UPDATE users
-            SET house = %s,
-                strength      = COALESCE(strength, 0) + %s,
-                constitution  = COALESCE(constitution, 0) + %s,
-                size          = COALESCE(size, 0) + %s,
-                intelligence  = COALESCE(intelligence, 0) + %s,
-                willpower     = COALESCE(willpower, 0) + %s,
-                dexterity     = COALESCE(dexterity, 0) + %s
-            WHERE user_id = %s
-        """, (
-            house_name,
-            strength_boost,
-            constitution_boost,
-            size_boost,
-            intelligence_boost,
-            willpower_boost,
-            dexterity_boost,
-            user_id
-        ))
-        conn.commit()
-
-        updated = (cursor.rowcount > 0)
-        if updated:
-            update_user_state(user_id)
-        return updated
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            values = _write_stats(cursor, user_id, assign={"house": house_name}, bonus=_house_bonus(house_data))
+            conn.commit()
+            profile_cache.invalidate(user_id)
+            if values is not None:
+                ranking.update(user_id, values)
+            return values is not None
     
     except mysql.connector.Error as e:
         print(f"❌ 기숙사 업데이트 실패: {e}")
         return False
-    finally:
-        cursor.close()
-        conn.close()
+
+def revert_user_house(user_id, house_name, previous_house):
+    """
+    update_user_house를 되돌림 (기숙사를 이전 값으로, 받았던 보너스는 차감).
+    역할 부여가 실패했을 때 DB 쪽을 원래대로 돌리는 보상 작업.
+    """
+    house_data = get_house_data(house_name)
+    if not house_data:
+        return False
+
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            values = _write_stats(cursor, user_id, assign={"house": previous_house}, bonus=_house_bonus(house_data, sign=-1))
+            conn.commit()
+            profile_cache.invalidate(user_id)
+            if values is not None:
+                ranking.update(user_id, values)
+            return values is not None
+
+    except mysql.connector.Error as e:
+        print(f"❌ 기숙사 되돌리기 실패: {e}")
+        return False
 
 def update_user_personalities(user_id: str, personality_list: list[str]) -> bool:
     """
@@ -243,293 +330,331 @@ def update_user_personalities(user_id: str, personality_list: list[str]) -> bool
         return False
 
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)
-
-        in_clause = ",".join(["%s"] * len(personality_list))
-        query = f"SELECT * FROM personalities WHERE name IN ({in_clause})"
-        cursor.execute(query, tuple(personality_list))
-        rows = cursor.fetchall()  # [{}, {}, ...]
-
+        # 성격별 보너스는 참조 데이터 캐시에서 (없는 이름은 무시)
+        rows = [row for row in map(catalog.personality, personality_list) if row]
         if not rows:
             return False
 
         total_str = total_con = total_int = total_pow = total_dex = 0
         for row in rows:
-            total_str += row["strength"]
-            total_con += row["constitution"]
-            total_int += row["intelligence"]
-            total_pow += row["willpower"]
-            total_dex += row["dexterity"]
+            total_str += row.strength
+            total_con += row.constitution
+            total_int += row.intelligence
+            total_pow += row.willpower
+            total_dex += row.dexterity
 
         personality_str = ",".join(personality_list)
 
-        update_query = """
-            UPDATE users
-            SET personality = %s,
-                strength     = COALESCE(strength, 0) + %s,
-                constitution = COALESCE(constitution, 0) + %s,
-                intelligence = COALESCE(intelligence, 0) + %s,
-                willpower    = COALESCE(willpower, 0) + %s,
-                dexterity    = COALESCE(dexterity, 0) + %s
-            WHERE user_id = %s
-        """
-
-        cursor.execute(update_query, (
-            personality_str,
-            total_str,
-            total_con,
-            total_int,
-            total_pow,
-            total_dex,
-            user_id
-        ))
-        conn.commit()
-
-        updated = (cursor.rowcount > 0)
-        if updated:
-            update_user_state(user_id)
-
-        return updated
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            values = _write_stats(
+                cursor, user_id,
+                assign={"personality": personality_str},
+                bonus={
+                    "strength": total_str,
+                    "constitution": total_con,
+                    "intelligence": total_int,
+                    "willpower": total_pow,
+                    "dexterity": total_dex,
+                }
+            )
+            conn.commit()
+            profile_cache.invalidate(user_id)
+            if values is not None:
+                ranking.update(user_id, values)
+            return values is not None
 
     except mysql.connector.Error as e:
         print(f"❌ update_user_personalities 실패: {e}")
         return False
-    finally:
-        cursor.close()
-        conn.close()
 
 def get_personality_list(page=0, page_size=7):
+    """성격 목록의 한 페이지 (참조 데이터 캐시에서 조회)"""
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)
-
-        offset = page * page_size  # 페이지에 맞는 OFFSET 계산
-        cursor.execute(
-            "SELECT name, strength, constitution, intelligence, willpower, dexterity "
-            "FROM personalities ORDER BY id LIMIT %s OFFSET %s",
-            (page_size, offset)
-        )
-        rows = cursor.fetchall()
-        return rows
+        pages = catalog.personality_pages(page_size)
+        return list(pages[page]) if 0 <= page < len(pages) else []
     except mysql.connector.Error as e:
         print(f"❌ get_personality_list 실패: {e}")
         return []
-    finally:
-        cursor.close()
-        conn.close()
 
-def add_money(user_id, amount):
-    """유저에게 재화 추가 (크넛 단위)"""
+def get_personality_pages(page_size=7):
+    """
+    성격 목록 전체를 page_size개씩 나눈 페이지 튜플 (참조 데이터 캐시에서 조회).
+    페이지 수는 personalities 테이블의 실제 row 수로 정해진다.
+    """
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
+        return catalog.personality_pages(page_size)
+    except mysql.connector.Error as e:
+        print(f"❌ get_personality_pages 실패: {e}")
+        return ()
 
-        cursor.execute("UPDATE users SET money = money + %s WHERE user_id = %s", (amount, user_id))
-        conn.commit()
-        return cursor.rowcount > 0  # 업데이트 성공 여부 반환
+def add_money(user_id, amount, actor_id=None, reason=None):
+    """유저에게 재화 추가 (크넛 단위). 변동은 재화 기록(money_ledger)에 남는다"""
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(queries.ADD_MONEY, (amount, user_id))
+            if cursor.rowcount == 0:
+                return False  # 등록되지 않은 유저
+
+            cursor.execute(queries.SELECT_MONEY, (user_id,))
+            (new_balance,) = cursor.fetchone()
+            conn.commit()
+            profile_cache.invalidate(user_id)
     except mysql.connector.Error as e:
         print(f"❌ 재화 추가 실패: {e}")
         return False
-    finally:
-        cursor.close()
-        conn.close()
 
-def remove_money(user_id, amount):
-    """유저 재화 감소 (최소 0 유지)"""
-    try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
+    ledger.record(user_id, amount, new_balance, actor_id, reason)
+    ranking.update(user_id, {"money": new_balance})
+    return True
 
-        cursor.execute("UPDATE users SET money = GREATEST(money - %s, 0) WHERE user_id = %s", (amount, user_id))
-        conn.commit()
-        return cursor.rowcount > 0  # 업데이트 성공 여부 반환
+def remove_money(user_id, amount, actor_id=None, reason=None):
+    """
+    유저 재화 감소. 잔액이 부족하면 차감하지 않고 False를 반환한다.
+    (잔액 확인과 차감이 UPDATE 한 번에 이루어지므로 동시에 차감해도 음수가 되지 않음)
+    """
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(queries.REMOVE_MONEY, (amount, user_id, amount))
+            if cursor.rowcount == 0:
+                return False  # 잔액 부족 또는 등록되지 않은 유저
+
+            cursor.execute(queries.SELECT_MONEY, (user_id,))
+            (new_balance,) = cursor.fetchone()
+            conn.commit()
+            profile_cache.invalidate(user_id)
     except mysql.connector.Error as e:
         print(f"❌ 재화 감소 실패: {e}")
         return False
-    finally:
-        cursor.close()
-        conn.close()
 
-def delete_user(user_id):
-    """DB에서 해당 유저(id)의 데이터를 삭제"""
+    ledger.record(user_id, -amount, new_balance, actor_id, reason)
+    ranking.update(user_id, {"money": new_balance})
+    return True
+
+def _select_money_for_update(cursor, user_ids):
+    """여러 유저의 잔액을 잠그고 읽음 {user_id: 잔액} (IN 목록은 정해진 길이 묶음으로 나눠서)"""
+    balances = {}
+    for chunk in queries.in_chunks(user_ids):
+        cursor.execute(queries.select_money_for_update(len(chunk)), chunk)
+        balances.update(cursor.fetchall())
+    return balances
+
+def _change_money_bulk(user_ids, amount, update_sql, delta, label, actor_id=None, reason=None):
+    """
+    여러 유저의 재화를 한 트랜잭션 안에서 한 번의 UPDATE로 변경.
+    잔액을 잠그고 읽은 뒤 UPDATE하므로 변경 후 잔액은 변경 전 잔액 + delta로 계산한다.
+    차감(delta < 0)은 잔액이 부족한 유저를 건너뛴다.
+    반환: {user_id: (변경 전 잔액, 변경 후 잔액 또는 잔액 부족이면 None)}
+          등록되지 않은 유저는 빠짐. 실패하면 None
+    """
+    user_ids = list(dict.fromkeys(user_ids))  # 중복 제거 (순서 유지)
+    if not user_ids:
+        return {}
+
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            before = _select_money_for_update(cursor, user_ids)
+            eligible = [user_id for user_id, money in before.items() if money + delta >= 0]
+            if not eligible:
+                conn.rollback()
+                return {user_id: (before[user_id], None) for user_id in user_ids if user_id in before}
+
+            for chunk in queries.in_chunks(eligible):
+                params = (amount, *chunk) if delta >= 0 else (amount, *chunk, amount)
+                cursor.execute(update_sql(len(chunk)), params)
+            conn.commit()
+
+        for user_id in eligible:
+            profile_cache.invalidate(user_id)
+            ledger.record(user_id, delta, before[user_id] + delta, actor_id, reason)
+            ranking.update(user_id, {"money": before[user_id] + delta})
+    except mysql.connector.Error as e:
+        print(f"❌ 재화 일괄 {label} 실패: {e}")
+        return None
 
-        cursor.execute("DELETE FROM users WHERE user_id = %s", (user_id,))
-        conn.commit()
+    eligible = set(eligible)
+    return {
+        user_id: (before[user_id], before[user_id] + delta if user_id in eligible else None)
+        for user_id in user_ids if user_id in before
+    }
 
-        return cursor.rowcount > 0  # 삭제된 row가 있으면 True 반환
+def add_money_bulk(user_ids, amount, actor_id=None, reason=None):
+    """여러 유저에게 같은 금액을 한 번에 지급 (크넛 단위)"""
+    return _change_money_bulk(user_ids, amount, queries.add_money_bulk, amount, "지급", actor_id, reason)
+
+def remove_money_bulk(user_ids, amount, actor_id=None, reason=None):
+    """여러 유저의 재화를 한 번에 차감 (잔액이 부족한 유저는 차감하지 않음)"""
+    return _change_money_bulk(user_ids, amount, queries.remove_money_bulk, -amount, "차감", actor_id, reason)
+
+def delete_user(user_id):
+    """DB에서 해당 유저(id)의 데이터를 삭제"""
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(queries.DELETE_USER, (user_id,))
+            conn.commit()
+            profile_cache.invalidate(user_id)
+            skill_cache.invalidate(user_id)
+            ranking.remove(user_id)
+
+            return cursor.rowcount > 0  # 삭제된 row가 있으면 True 반환
     except mysql.connector.Error as e:
         print(f"❌ 유저 삭제 실패: {e}")
         return False
-    finally:
-        cursor.close()
-        conn.close()
+
+LUCK_DICE = "3d6×5"
 
 def roll_luck():
     """3d6 * 5 행운값 굴리기"""
-    return sum(random.randint(1, 6) for _ in range(3)) * 5
+    return dice.compile_expression(LUCK_DICE).roll_total()
+
+def get_user_skills(user_id):
+    """
+    유저의 기능치 전체 → skills.SkillSheet (캐시에 있으면 DB를 거치지 않음).
+    등록되지 않은 유저면 None
+    """
+    cached = skill_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    token = skill_cache.token()
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(queries.SELECT_USER_SKILLS, (user_id,))
+            rows = cursor.fetchall()
+    except mysql.connector.Error as e:
+        print(f"❌ 기능치 조회 실패: {e}")
+        return None
+
+    if not rows:
+        return None
+    sheet = SkillSheet.from_rows(rows)
+    skill_cache.put(user_id, sheet, token)
+    return sheet
+
+def get_user_skill(user_id, skill_name):
+    """기능 하나의 현재 값. 유저나 기능이 없으면 None"""
+    sheet = get_user_skills(user_id)
+    return sheet.value(skill_name) if sheet else None
+
+def allocate_skill_points(user_id, allocation):
+    """
+    기능 점수 배분. allocation({기능 이름: 추가할 점수}) 전체를 남은 기능 점수와 비교해 검사한 뒤
+    모든 add_point 변경을 multi-row INSERT ... ON DUPLICATE KEY UPDATE 한 번으로 쓴다.
+    users row와 기능치를 잠그고 읽으므로 동시에 배분해도 예산을 넘지 않는다.
+    반환: (WriteResult, 성공하면 새 SkillSheet / REJECTED면 거부 사유 / 그 외 None)
+    """
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(queries.SELECT_SKILL_POINT_FOR_UPDATE, (user_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return WriteResult.NOT_REGISTERED, None
+            budget = row[0] or 0
+
+            cursor.execute(queries.SELECT_USER_SKILLS_FOR_UPDATE, (user_id,))
+            sheet = SkillSheet.from_rows(cursor.fetchall())
+
+            reason = validate_allocation(sheet, budget, allocation)
+            if reason:
+                return WriteResult.REJECTED, reason  # 열린 트랜잭션은 풀 반납 시 롤백
+
+            _insert_rows(cursor, queries.add_skill_points, [(user_id, name, points) for name, points in allocation.items()])
+            conn.commit()
+    except mysql.connector.Error as e:
+        print(f"❌ 기능 점수 배분 실패: {e}")
+        return WriteResult.ERROR, None
+
+    updated = sheet.allocate(allocation)
+    skill_cache.invalidate(user_id)
+    skill_cache.put(user_id, updated)
+    return WriteResult.UPDATED, updated
 
 def update_user_state(user_id):
     """
     유저 상태 업데이트
+    현재 기본 특성치로 보조 스탯만 다시 계산해서 저장 (스크립트/수동 보정용).
     """
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            values = _write_stats(cursor, user_id)
+            conn.commit()
+            profile_cache.invalidate(user_id)
+            if values is not None:
+                ranking.update(user_id, values)
+            return values is not None
+    except mysql.connector.Error as e:
+        print(f"❌ 보조 스탯 계산 실패: {e}")
+        return False
 
-        cursor.execute("SELECT strength, constitution, size, dexterity, willpower, intelligence, education, hp, mp, sanity FROM users WHERE user_id = %s", (user_id,))
-        row = cursor.fetchone()
-        if not row:
-            return False
+def flush_ledger():
+    """버퍼에 남은 재화 기록을 바로 저장 (종료 직전 등)"""
+    return ledger.flush()
 
-        strength = row["strength"]
-        constitution = row["constitution"]
-        size = row["size"]
-        dexterity = row["dexterity"]
-        willpower = row["willpower"]
-        intelligence = row["intelligence"]
-        education = row["education"]
-
-        hp = (constitution + size) // 10
-        mp = willpower // 5
-        san = min(willpower, 99)
-
-        if strength < size and dexterity < size:
-            mov = 7
-        elif strength > size or dexterity > size:
-            mov = 9
-        else:
-            mov = 8
-        
-        total_str_siz = strength + size
-        if total_str_siz <= 64:
-            damage_bonus = "-2d6"
-            build = -2
-        elif total_str_siz <= 84:
-            damage_bonus = "-1d6"
-            build = -1
-        elif total_str_siz <= 124:
-            damage_bonus = "0"
-            build = 0
-        elif total_str_siz <= 164:
-            damage_bonus = "+1d4"
-            build = 1
-        elif total_str_siz <= 204:
-            damage_bonus = "+1d6"
-            build = 2
-        else:
-            damage_bonus = "+2d6"
-            build = 3
-
-        # 5) 상태(status) 계산
-        # HP<1 => 빈사, SAN<=0 => 영구적 광기, 아니면 정상
-        # (여기서는 새로 계산된 hp, san을 기준으로 판단)
-        if hp < 1:
-            status = "D"
-        elif san <= 0:
-            status = "M"
-        else:
-            status = "N"
-
-        job_skill_point = education * 4  # 직업 기능 점수 = EDU * 4
-        interest_skill_point = intelligence * 2  # 관심 기능 점수 = INT * 2
-        skill_point = job_skill_point + interest_skill_point
-
-        cursor.execute("""
-            UPDATE users
-            SET hp = %s,
-                mp = %s,
-                sanity = %s,
-                movement = %s,
-                damage_bonus = %s,
-                build = %s,
-                status = %s,
-                skill_point = %s
-            WHERE user_id = %s
-        """, (hp, mp, san, mov, damage_bonus, build, status, skill_point, user_id))
-        conn.commit()
+def get_statement_stats():
+    """쿼리별 실행 방식(prepare / reuse / text)과 평균 시간 통계 (statements.statement_stats)"""
+    return statement_stats()
+
+def get_cache_stats():
+    """프로필/기능치 캐시 hit/miss/eviction 통계"""
+    return {"profile": profile_cache.stats(), "skills": skill_cache.stats()}
 
+def refresh_reference_data():
+    """기숙사/성격 참조 데이터를 DB에서 다시 읽어 캐시를 교체"""
+    try:
+        catalog.load()
         return True
     except mysql.connector.Error as e:
-        print(f"❌ 보조 스탯 계산 실패: {e}")
+        print(f"❌ 참조 데이터 로드 실패: {e}")
         return False
-    finally:
-        cursor.close()
-        conn.close()
+
+def load_rankings():
+    """users 테이블을 한 번 읽어 재화/행운/이성 순위표를 새로 만듦 (이후에는 쓰기 함수가 갱신)"""
+    try:
+        with connection() as conn, closing(StatementCursor(conn)) as cursor:
+            cursor.execute(queries.SELECT_RANKING_SEED)
+            rows = cursor.fetchall()
+    except mysql.connector.Error as e:
+        print(f"❌ 순위표 로드 실패: {e}")
+        return False
+
+    ranking.seed(rows)
+    return True
+
+def simulate_balance(max_count=4, exact=False):
+    """참조 데이터 캐시의 기숙사/성격으로 조합 밸런스 분석 (balance.simulate). 실패하면 None"""
+    try:
+        return balance.simulate(catalog.houses(), catalog.personalities(), max_count, exact)
+    except mysql.connector.Error as e:
+        print(f"❌ 밸런스 분석 실패: {e}")
+        return None
 
 def get_house_data(house_name: str):
     """
-    DB의 houses 테이블에서 name이 house_name인 row를 가져옴.
-    반환: { 'name': str, 'role_id': int, 'strength': int, ... } 형태의 dict
+    houses 테이블에서 name이 house_name인 row를 가져옴 (참조 데이터 캐시에서 조회).
+    반환: records.House (name, role_id, strength, ...)
     """
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)
-
-        query = "SELECT * FROM houses WHERE name = %s"
-        cursor.execute(query, (house_name,))
-        row = cursor.fetchone()  # dict 형태로 반환됨
-        return row  # 없다면 None
+        return catalog.house(house_name)  # 없다면 None
     except mysql.connector.Error as e:
         print(f"❌ get_house_data 실패: {e}")
         return None
-    finally:
-        cursor.close()
-        conn.close()
 
 def get_personality_data(personality_name: str):
     """
-    DB의 personalities 테이블에서 name이 personality_name인 row를 가져옴.
-    반환: { 'name': str, 'strength': int, ... } 형태의 dict
+    personalities 테이블에서 name이 personality_name인 row를 가져옴 (참조 데이터 캐시에서 조회).
+    반환: records.Personality (name, strength, ...)
     """
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor(dictionary=True)
-
-        query = "SELECT * FROM personalities WHERE name = %s"
-        cursor.execute(query, (personality_name,))
-        row = cursor.fetchone()
-        return row
+        return catalog.personality(personality_name)
     except mysql.connector.Error as e:
         print(f"❌ get_personality_data 실패: {e}")
         return None
-    finally:
-        cursor.close()
-        conn.close()
 
 def get_all_house_roles():
     """
-    houses 테이블의 모든 row에서 role_id를 추출해
-    정수들의 리스트(혹은 세트)로 반환.
+    houses 테이블의 모든 role_id를 frozenset으로 반환 (참조 데이터 캐시에서 조회).
     """
     try:
-        db_config = get_db_config()
-        conn = mysql.connector.connect(**db_config)
-        cursor = conn.cursor()
-
-        cursor.execute("SELECT role_id FROM houses")
-        rows = cursor.fetchall()  # 예: [(1342...), (1342...), (None)...]
-
-        # role_id가 None인 경우도 있을 수 있으니 필터링
-        role_ids = [row[0] for row in rows if row[0] is not None]
-        return role_ids
-
+        return catalog.house_role_ids()
     except mysql.connector.Error as e:
         print(f"❌ get_all_house_roles 실패: {e}")
-        return []
-    finally:
-        cursor.close()
-        conn.close()
-
-
+        return frozenset()
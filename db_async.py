@@ -0,0 +1,94 @@
+import asyncio
+import contextvars
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import database
+import metrics
+import migrations
+import tracing
+
+# ---------------------------------------
+# 비동기 데이터베이스 접근 계층
+# ---------------------------------------
+# database.py의 함수들은 mysql.connector를 사용하는 동기(blocking) 함수이므로
+# 명령어 핸들러에서 직접 호출하면 이벤트 루프 전체가 멈춘다.
+# 여기서는 같은 이름의 함수를 전용 스레드 풀에서 실행하는 awaitable 버전으로 제공한다.
+# (스크립트 등 동기 코드에서는 기존처럼 database.py 함수를 그대로 사용하면 된다.)
+
+# 동시에 실행될 수 있는 DB 작업 수의 상한
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "4"))
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="db")
+
+
+async def run(func, *args, **kwargs):
+    """
+    동기 함수를 DB 전용 스레드 풀에서 실행하고 결과를 기다림.
+    호출한 쪽의 context(contextvars)를 그대로 넘기므로, 스레드 안의 쿼리도 지금 처리 중인 상호작용의 메트릭과
+    트레이스(이 호출의 span 아래)에 이어진다.
+    """
+    loop = asyncio.get_running_loop()
+    name = getattr(func, "__name__", "unknown")
+    with tracing.span("db", name) as span:
+        context = contextvars.copy_context()
+        submitted = time.perf_counter()
+
+        def call():
+            waited = time.perf_counter() - submitted
+            metrics.DB_QUEUE_SECONDS.observe(waited, name)
+            if span is not None:
+                span.set(queue_ms=round(waited * 1000, 3))
+            return context.run(func, *args, **kwargs)
+
+        try:
+            return await loop.run_in_executor(_executor, call)
+        finally:
+            metrics.DB_CALL_SECONDS.observe(time.perf_counter() - submitted, name)
+
+
+def _awaitable(func):
+    """동기 DB 함수를 같은 이름의 코루틴 함수로 감싸기"""
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await run(func, *args, **kwargs)
+    return wrapper
+
+
+def shutdown():
+    """스레드 풀 종료 (진행 중인 작업은 끝까지 기다림)"""
+    _executor.shutdown(wait=True)
+
+
+get_user = _awaitable(database.get_user)
+register_user = _awaitable(database.register_user)
+register_users = _awaitable(database.register_users)
+update_user_name = _awaitable(database.update_user_name)
+update_user_size = _awaitable(database.update_user_size)
+update_user_appearance = _awaitable(database.update_user_appearance)
+update_user_house = _awaitable(database.update_user_house)
+revert_user_house = _awaitable(database.revert_user_house)
+update_user_personalities = _awaitable(database.update_user_personalities)
+get_personality_list = _awaitable(database.get_personality_list)
+get_personality_pages = _awaitable(database.get_personality_pages)
+add_money = _awaitable(database.add_money)
+remove_money = _awaitable(database.remove_money)
+add_money_bulk = _awaitable(database.add_money_bulk)
+remove_money_bulk = _awaitable(database.remove_money_bulk)
+flush_ledger = _awaitable(database.flush_ledger)
+delete_user = _awaitable(database.delete_user)
+update_user_state = _awaitable(database.update_user_state)
+get_house_data = _awaitable(database.get_house_data)
+get_personality_data = _awaitable(database.get_personality_data)
+get_all_house_roles = _awaitable(database.get_all_house_roles)
+refresh_reference_data = _awaitable(database.refresh_reference_data)
+load_rankings = _awaitable(database.load_rankings)
+simulate_balance = _awaitable(database.simulate_balance)
+get_cache_stats = _awaitable(database.get_cache_stats)
+get_statement_stats = _awaitable(database.get_statement_stats)
+get_user_skill = _awaitable(database.get_user_skill)
+get_user_skills = _awaitable(database.get_user_skills)
+allocate_skill_points = _awaitable(database.allocate_skill_points)
+check_schema = _awaitable(migrations.check_schema)
@@ -0,0 +1,189 @@
+import functools
+import random
+import re
+from typing import NamedTuple
+
+# ---------------------------------------
+# 주사위 식 해석 / 굴림 (CoC 표기)
+# ---------------------------------------
+# "3d6×5", "2d6+6", "1d100", "+1d4", "-2d6" 같은 식을 한 번 해석해 두고(compile_expression은 캐시됨)
+# 같은 면을 가진 주사위는 random.choices 한 번으로 몰아서 굴린다.
+# 판정(skill_check)은 d100 한 번 + 보너스/패널티 주사위로 성공 단계를 정한다.
+
+MAX_DICE = 100      # 식 하나에서 굴릴 수 있는 주사위 수
+MAX_SIDES = 1000
+MAX_BATCH = 1000    # roll(times=...) 한 번에 굴릴 수 있는 횟수
+
+_TERM_PATTERN = re.compile(r"([+-]?)(?:(\d*)d(\d+)|(\d+))")
+_MULTIPLIER_PATTERN = re.compile(r"^(.*?)(?:[×x*](\d+))?$")
+
+
+class DiceError(ValueError):
+    """해석할 수 없는 주사위 식"""
+
+
+class DiceGroup(NamedTuple):
+    count: int
+    sides: int
+    sign: int   # 1 또는 -1
+
+
+class DiceRoll(NamedTuple):
+    total: int
+    rolls: tuple    # DiceGroup 순서대로 각 그룹의 눈 튜플
+
+
+class DiceExpression(NamedTuple):
+    text: str
+    groups: tuple       # DiceGroup 튜플
+    constant: int
+    multiplier: int
+
+    def roll(self, times=1, rng=random):
+        """식을 times번 굴림. 그룹마다 눈을 choices 한 번으로 뽑는다. 반환: DiceRoll 리스트"""
+        if not 1 <= times <= MAX_BATCH:
+            raise DiceError(f"한 번에 {MAX_BATCH}회까지 굴릴 수 있습니다.")
+
+        faces_per_group = [
+            rng.choices(range(1, group.sides + 1), k=group.count * times) for group in self.groups
+        ]
+
+        results = []
+        for index in range(times):
+            rolls = []
+            total = self.constant
+            for group, faces in zip(self.groups, faces_per_group):
+                chunk = tuple(faces[index * group.count:(index + 1) * group.count])
+                rolls.append(chunk)
+                total += group.sign * sum(chunk)
+            results.append(DiceRoll(total * self.multiplier, tuple(rolls)))
+        return results
+
+    def roll_total(self, rng=random):
+        return self.roll(rng=rng)[0].total
+
+
+@functools.lru_cache(maxsize=256)
+def compile_expression(text):
+    """
+    주사위 식을 DiceExpression으로 해석 (같은 식은 캐시된 결과를 재사용).
+    지원: NdM, dM, 상수, 항 사이의 +/-, 맨 끝의 ×K (x, * 도 가능), 괄호로 감싼 식 "(2d6+6)×5"
+    """
+    normalized = "".join(text.split()).lower()
+    if not normalized:
+        raise DiceError("주사위 식이 비어 있습니다.")
+
+    body, multiplier = _MULTIPLIER_PATTERN.match(normalized).groups()
+    if body.startswith("(") and body.endswith(")"):
+        body = body[1:-1]
+    if not body:
+        raise DiceError(f"`{text}` 을(를) 해석할 수 없습니다.")
+
+    groups = []
+    constant = 0
+    position = 0
+    while position < len(body):
+        match = _TERM_PATTERN.match(body, position)
+        # 첫 항이 아니면 반드시 부호가 있어야 함 ("2d6d4" 같은 입력 거부)
+        if not match or (position > 0 and not match.group(1)):
+            raise DiceError(f"`{text}` 을(를) 해석할 수 없습니다.")
+        sign = -1 if match.group(1) == "-" else 1
+        count, sides, number = match.group(2), match.group(3), match.group(4)
+        if number is not None:
+            constant += sign * int(number)
+        else:
+            count, sides = int(count or 1), int(sides)
+            if count < 1 or not 2 <= sides <= MAX_SIDES:
+                raise DiceError(f"`{text}`: 주사위는 1개 이상, 면 수는 2~{MAX_SIDES} 사이여야 합니다.")
+            groups.append(DiceGroup(count, sides, sign))
+        position = match.end()
+
+    if sum(group.count for group in groups) > MAX_DICE:
+        raise DiceError(f"주사위는 한 번에 {MAX_DICE}개까지 굴릴 수 있습니다.")
+
+    return DiceExpression(text, tuple(groups), constant, int(multiplier or 1))
+
+
+def roll(text, times=1, rng=random):
+    """식 문자열을 바로 굴림"""
+    return compile_expression(text).roll(times, rng)
+
+
+# 식 안의 "db"(또는 "피해보너스")와 그 앞의 부호
+DAMAGE_BONUS_PATTERN = re.compile(r"\s*([+-]?)\s*(?:db|피해보너스)", re.IGNORECASE)
+
+
+def substitute_damage_bonus(text, damage_bonus):
+    """
+    식 안의 db를 피해 보너스("+1d4", "0", "-2d6")로 바꿈. 앞의 부호와 보너스 부호를 합치고
+    ("1d3+db" → "1d3-2d6", "1d3-db" → "1d3+2d6"), 보너스가 0이면 그 항을 뺀다. ("1d3+db" → "1d3")
+    """
+    bonus = "".join(damage_bonus.split())
+    negative = bonus.startswith("-")
+    bonus = bonus.lstrip("+-")
+
+    def replace(match):
+        if bonus in ("", "0"):
+            return ""
+        return "-" + bonus if (match.group(1) == "-") != negative else "+" + bonus
+
+    return DAMAGE_BONUS_PATTERN.sub(replace, text).strip() or "0"
+
+
+# ── d100 판정 ──
+CRITICAL = "대성공"
+EXTREME = "극단적 성공"
+HARD = "어려운 성공"
+REGULAR = "보통 성공"
+FAILURE = "실패"
+FUMBLE = "대실패"
+
+SUCCESS_LEVELS = (CRITICAL, EXTREME, HARD, REGULAR)
+
+
+class CheckResult(NamedTuple):
+    roll: int           # 최종 d100 값 (1~100)
+    target: int         # 기능치
+    level: str
+    tens: tuple         # 굴린 십의 자리 주사위들 (0~90)
+    units: int          # 일의 자리 주사위 (0~9)
+
+    @property
+    def success(self):
+        return self.level in SUCCESS_LEVELS
+
+
+def roll_percentile(bonus=0, penalty=0, rng=random):
+    """
+    d100 굴림. 보너스/패널티 주사위는 서로 상쇄하고, 남은 수만큼 십의 자리를 더 굴려
+    보너스면 가장 낮은 값, 패널티면 가장 높은 값을 쓴다. (00 + 0 = 100)
+    반환: (결과, 십의 자리 튜플, 일의 자리)
+    """
+    net = bonus - penalty
+    units = rng.randrange(10)
+    tens = tuple(rng.choices(range(0, 100, 10), k=1 + abs(net)))
+
+    candidates = [(ten + units) or 100 for ten in tens]
+    result = min(candidates) if net > 0 else max(candidates)
+    return result, tens, units
+
+
+def success_level(result, target):
+    """CoC 7판 성공 단계"""
+    if result == 1:
+        return CRITICAL
+    if result == 100 or (target < 50 and result >= 96):
+        return FUMBLE
+    if result <= target // 5:
+        return EXTREME
+    if result <= target // 2:
+        return HARD
+    if result <= target:
+        return REGULAR
+    return FAILURE
+
+
+def skill_check(target, bonus=0, penalty=0, rng=random):
+    """기능치 target에 대한 d100 판정"""
+    result, tens, units = roll_percentile(bonus, penalty, rng)
+    return CheckResult(result, target, success_level(result, target), tens, units)
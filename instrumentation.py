@@ -0,0 +1,130 @@
+import functools
+import time
+
+import discord
+from discord import app_commands
+from discord.http import HTTPClient
+from discord.webhook.async_ import AsyncWebhookAdapter
+
+import database
+import metrics
+import tracing
+from db_pool import pool_stats
+from registration import registration_queue
+from rendering import profile_render_cache
+from statements import MODES
+
+# ---------------------------------------
+# discord.py ↔ metrics / tracing 연결
+# ---------------------------------------
+#   InstrumentedTree  : 모든 슬래시 명령어/자동완성 처리를 상호작용 하나로 기록 (bot.py의 tree_cls)
+#   timed_callback    : 버튼/선택 메뉴 콜백 기록 (View 쪽에는 명령어 트리 같은 공통 진입점이 없어서 데코레이터로)
+#   instrument_discord_http : Discord API 요청 시간 기록 (봇 API + 상호작용 응답 webhook)
+#   상호작용마다 트레이스(tracing.py)도 하나씩 시작해서, DB 호출/쿼리/Discord 요청이 그 아래 span으로 붙는다.
+#   캐시/커넥션 풀/prepared statement/등록 큐 통계는 스크랩할 때 읽어서 내보낸다.
+
+
+class InstrumentedTree(app_commands.CommandTree):
+    async def _call(self, interaction):
+        # 슬래시 명령어와 자동완성 모두 여기를 지난다. 오류는 안에서 on_error로 처리되고 command_failed로 남는다.
+        kind = "autocomplete" if interaction.type is discord.InteractionType.autocomplete else "command"
+        with metrics.track_interaction(kind) as stats, tracing.trace(kind) as root:
+            try:
+                await super()._call(interaction)
+            finally:
+                command = interaction.command
+                stats.name = root.name = command.qualified_name if command is not None else "unknown"
+                stats.failed = stats.failed or interaction.command_failed
+                if interaction.command_failed and root.error is None:
+                    root.error = "command_failed"
+
+
+def timed_callback(func):
+    """
+    View 콜백을 상호작용 하나로 기록. `@discord.ui.button` 등의 아래(함수 쪽)에 붙인다.
+    이름은 `클래스.메서드`로 표시
+    """
+    name = func.__qualname__
+
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        with metrics.track_interaction("component", name), tracing.trace("component", name):
+            return await func(*args, **kwargs)
+    return wrapper
+
+
+def _timed_request(request):
+    @functools.wraps(request)
+    async def wrapper(self, route, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            with tracing.span("discord", f"{route.method} {route.path}"):
+                return await request(self, route, *args, **kwargs)
+        finally:
+            metrics.record_discord_request(route.method, route.path, time.perf_counter() - started)
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def instrument_discord_http():
+    """
+    Discord API 요청 시간 기록 시작 (한 번만 적용됨).
+    명령어 응답(send_message, followup 등)은 봇 HTTPClient가 아니라 webhook 어댑터로 나가므로 둘 다 감싼다.
+    """
+    for client_class in (HTTPClient, AsyncWebhookAdapter):
+        if not getattr(client_class.request, "__instrumented__", False):
+            client_class.request = _timed_request(client_class.request)
+
+
+# ── 스크랩 시점에 읽는 통계 ──
+def _cache_families():
+    caches = dict(database.get_cache_stats())
+    caches["profile_render"] = profile_render_cache.stats()
+    families = []
+    for key, kind, help in (
+        ("hits", "counter", "캐시 적중 수"),
+        ("misses", "counter", "캐시 미스 수"),
+        ("evictions", "counter", "용량 초과로 버린 항목 수"),
+        ("size", "gauge", "현재 캐시 항목 수"),
+        ("hit_ratio", "gauge", "캐시 적중률 (시작 이후 누적)"),
+    ):
+        name = f"bot_cache_{key}" + ("_total" if kind == "counter" else "")
+        families.append((name, kind, help, {(("cache", cache),): stats[key] for cache, stats in caches.items()}))
+    return families
+
+
+def _pool_families():
+    # 스크랩이 풀을 만들거나 DATABASE_URL을 읽지 않도록 이미 있는 풀의 통계만 (없으면 빈 목록)
+    stats = pool_stats()
+    gauges = {"open", "idle"}
+    return [
+        (f"bot_db_pool_{key}" + ("" if key in gauges else "_total"),
+         "gauge" if key in gauges else "counter",
+         f"커넥션 풀 {key}",
+         {(): value})
+        for key, value in stats.items()
+    ]
+
+
+def _statement_families():
+    stats = database.get_statement_stats()
+    return [
+        ("bot_db_statement_executions_total", "counter", "실행 방식(prepare / reuse / text)별 쿼리 실행 수",
+         {(("statement", name), ("mode", mode)): entry[mode] for name, entry in stats.items() for mode in MODES}),
+        ("bot_db_statement_seconds_total", "counter", "실행 방식별 쿼리 실행 시간 합",
+         {(("statement", name), ("mode", mode)): entry[f"{mode}_seconds"] for name, entry in stats.items() for mode in MODES}),
+    ]
+
+
+def _registration_families():
+    stats = registration_queue.stats()
+    return [
+        ("bot_registration_pending", "gauge", "저장을 기다리는 등록 요청 수", {(): stats["pending"]}),
+        ("bot_registration_batches_total", "counter", "저장한 등록 묶음 수", {(): stats["batches"]}),
+        ("bot_registration_largest_batch", "gauge", "가장 컸던 등록 묶음 크기", {(): stats["largest_batch"]}),
+    ]
+
+
+def register_collectors():
+    for collect in (_cache_families, _pool_families, _statement_families, _registration_families):
+        metrics.register_collector(collect)
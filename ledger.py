@@ -0,0 +1,160 @@
+import atexit
+import datetime
+import os
+import threading
+from contextlib import closing
+from typing import NamedTuple
+
+import mysql.connector
+
+import queries
+from db_pool import connection
+
+# ---------------------------------------
+# 재화 변동 기록 (money_ledger)
+# ---------------------------------------
+# 지급/차감이 커밋된 뒤 기록을 메모리 버퍼에 쌓아 두었다가, 일정 개수가 모이거나
+# 일정 시간이 지나면 multi-row INSERT 한 번 + commit 한 번으로 묶어서 저장한다.
+# (상점/보상처럼 변동이 몰릴 때 기록마다 commit 비용을 내지 않도록)
+#
+# 잔액 변경 자체는 users 테이블에 즉시 커밋되고, 기록은 최대 LEDGER_FLUSH_INTERVAL초 늦게 남는다.
+# 프로세스가 갑자기 죽으면 아직 쓰지 못한 기록은 사라질 수 있다. (정상 종료 시에는 모두 씀)
+
+LEDGER_BATCH_SIZE = int(os.getenv("LEDGER_BATCH_SIZE", "100"))
+LEDGER_FLUSH_INTERVAL = float(os.getenv("LEDGER_FLUSH_INTERVAL", "1.0"))
+# DB가 계속 안 될 때 메모리에 쌓아 둘 최대 기록 수 (넘으면 가장 오래된 기록부터 버림)
+LEDGER_MAX_PENDING = int(os.getenv("LEDGER_MAX_PENDING", "10000"))
+# money_ledger.reason 컬럼 길이 (VARCHAR(255))
+MAX_REASON_LENGTH = 255
+
+
+class LedgerEntry(NamedTuple):
+    user_id: str
+    delta: int             # 지급은 양수, 차감은 음수 (크넛)
+    balance_after: int     # 변동 직후 잔액
+    actor_id: str | None   # 변동을 일으킨 사람 (GM 등), 시스템이면 None
+    reason: str | None
+    created_at: datetime.datetime
+
+
+class LedgerWriter:
+    def __init__(self, batch_size=LEDGER_BATCH_SIZE, flush_interval=LEDGER_FLUSH_INTERVAL, max_pending=LEDGER_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = None
+        self._stats = {"recorded": 0, "written": 0, "flushes": 0, "failures": 0, "rejected": 0, "dropped": 0}
+
+    def record(self, user_id, delta, balance_after, actor_id=None, reason=None):
+        """기록 한 건을 버퍼에 추가 (DB에는 나중에 묶어서 씀)"""
+        if reason is not None:
+            reason = reason[:MAX_REASON_LENGTH]
+        entry = LedgerEntry(str(user_id), delta, balance_after, actor_id, reason, datetime.datetime.now())
+        with self._lock:
+            self._buffer.append(entry)
+            self._stats["recorded"] += 1
+            self._trim()
+            full = len(self._buffer) >= self.batch_size
+        self._ensure_started()
+        if full:
+            self._wakeup.set()
+
+    def _ensure_started(self):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="ledger-writer", daemon=True)
+                    self._thread.start()
+                    atexit.register(self.close)
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def _trim(self):
+        """버퍼가 max_pending을 넘으면 가장 오래된 기록부터 버림 (self._lock 안에서 호출)"""
+        overflow = len(self._buffer) - self.max_pending
+        if overflow > 0:
+            del self._buffer[:overflow]
+            self._stats["dropped"] += overflow
+            print(f"❌ 재화 기록 버퍼가 가득 차 오래된 기록 {overflow}건을 버렸습니다. (최대 {self.max_pending}건)")
+
+    @staticmethod
+    def _insert(cursor, entries):
+        # row 수를 정해진 크기 묶음으로 나눠서 (queries.row_chunks)
+        for chunk in queries.row_chunks(entries):
+            cursor.execute(queries.insert_ledger(len(chunk)), tuple(value for entry in chunk for value in entry))
+
+    def flush(self):
+        """
+        버퍼에 쌓인 기록을 한 트랜잭션으로 저장. 연결 문제 등으로 실패하면 버퍼 앞쪽에 되돌려 다음에 다시 시도.
+        값 자체가 잘못된 기록(DataError/IntegrityError)은 한 건씩 다시 넣어 보고, 그래도 안 되는 기록만 버린다.
+        (잘못된 한 건 때문에 뒤의 기록이 계속 막히지 않도록)
+        """
+        with self._flush_lock:
+            with self._lock:
+                entries, self._buffer = self._buffer, []
+            if not entries:
+                return 0
+
+            try:
+                with connection() as conn, closing(conn.cursor()) as cursor:
+                    try:
+                        self._insert(cursor, entries)
+                        conn.commit()
+                        written = len(entries)
+                    except (mysql.connector.DataError, mysql.connector.IntegrityError) as e:
+                        conn.rollback()
+                        print(f"❌ 재화 기록 묶음 저장 실패, 한 건씩 다시 시도합니다: {e}")
+                        written = self._insert_each(conn, cursor, entries)
+            except mysql.connector.Error as e:
+                print(f"❌ 재화 기록 저장 실패 ({len(entries)}건, 다음에 다시 시도): {e}")
+                with self._lock:
+                    self._buffer[:0] = entries
+                    self._stats["failures"] += 1
+                    self._trim()
+                return 0
+
+            with self._lock:
+                self._stats["written"] += written
+                self._stats["flushes"] += 1
+            return written
+
+    def _insert_each(self, conn, cursor, entries):
+        """기록을 한 건씩 저장. 값이 잘못돼 들어가지 않는 기록은 로그를 남기고 버림"""
+        written = 0
+        for entry in entries:
+            try:
+                self._insert(cursor, [entry])
+                conn.commit()
+                written += 1
+            except (mysql.connector.DataError, mysql.connector.IntegrityError) as e:
+                conn.rollback()
+                print(f"❌ 재화 기록을 저장할 수 없어 버립니다: {entry} ({e})")
+                with self._lock:
+                    self._stats["rejected"] += 1
+        return written
+
+    def close(self):
+        """쓰기 스레드를 멈추고 남은 기록을 모두 저장"""
+        self._stopped.set()
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self):
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["pending"] = len(self._buffer)
+        return snapshot
+
+
+ledger = LedgerWriter()
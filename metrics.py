@@ -0,0 +1,295 @@
+import contextvars
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# ---------------------------------------
+# 지연 시간 / 오류 / DB 사용량 메트릭
+# ---------------------------------------
+# 명령어·버튼 처리 시간, DB 함수와 쿼리 시간, Discord API 호출 시간을 모아
+# 봇 프로세스 안의 HTTP 엔드포인트에서 Prometheus 텍스트 형식으로 내보낸다.
+#
+#   curl http://127.0.0.1:9108/metrics
+#
+# 상호작용(명령어/버튼) 하나를 처리하는 동안의 DB 쿼리 수와 DB·Discord 시간은 contextvar로 모은다.
+# 그래서 느린 `/프로필 조회`가 어디서 시간을 썼는지 (Discord / MySQL / 봇 코드) 나눠 볼 수 있다.
+# DB 스레드 풀에서 도는 쿼리도 같은 상호작용에 합산되도록 db_async.run이 context를 복사해 넘긴다.
+#
+#   METRICS_PORT : 엔드포인트 포트 (기본 9108, 0이면 끔)
+#   METRICS_HOST : 바인딩 주소 (기본 127.0.0.1 — 외부에 열지 않음)
+
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+METRICS_HOST = os.getenv("METRICS_HOST", "127.0.0.1")
+
+# 초 단위 지연 시간 구간
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 상호작용 하나당 쿼리 수 구간
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names, values, extra=""):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """단조 증가 카운터 (라벨 값 조합별)"""
+    type = "counter"
+
+    def __init__(self, name, help, labels=()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *label_values, amount=1):
+        with self._lock:
+            self._values[label_values] = self._values.get(label_values, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        return [(self.name + _format_labels(self.labels, key), value) for key, value in items]
+
+
+class Histogram:
+    """누적 구간(bucket) 히스토그램 (라벨 값 조합별)"""
+    type = "histogram"
+
+    def __init__(self, name, help, labels=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self.buckets = tuple(buckets)
+        self._values = {}  # 라벨 값 -> [구간별 개수..., 합계, 개수]
+        self._lock = threading.Lock()
+
+    def observe(self, value, *label_values):
+        with self._lock:
+            entry = self._values.get(label_values)
+            if entry is None:
+                entry = self._values[label_values] = [0] * len(self.buckets) + [0.0, 0]
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    entry[index] += 1
+                    break
+            entry[-2] += value
+            entry[-1] += 1
+
+    def samples(self):
+        with self._lock:
+            items = [(key, list(entry)) for key, entry in self._values.items()]
+        lines = []
+        for key, entry in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry):
+                cumulative += count
+                lines.append((self.name + "_bucket" + _format_labels(self.labels, key, f'le="{bound}"'), cumulative))
+            lines.append((self.name + "_bucket" + _format_labels(self.labels, key, 'le="+Inf"'), entry[-1]))
+            lines.append((self.name + "_sum" + _format_labels(self.labels, key), entry[-2]))
+            lines.append((self.name + "_count" + _format_labels(self.labels, key), entry[-1]))
+        return lines
+
+
+_metrics = []
+_collectors = []
+
+
+def counter(name, help, labels=()):
+    metric = Counter(name, help, labels)
+    _metrics.append(metric)
+    return metric
+
+
+def histogram(name, help, labels=(), buckets=LATENCY_BUCKETS):
+    metric = Histogram(name, help, labels, buckets)
+    _metrics.append(metric)
+    return metric
+
+
+def register_collector(collect):
+    """
+    내보낼 때마다 호출할 함수 등록 (캐시/풀처럼 이미 자체 통계가 있는 곳용).
+    collect()는 (이름, 타입, 설명, {라벨 dict 튜플: 값}) 목록을 돌려준다.
+    """
+    _collectors.append(collect)
+
+
+# ── 상호작용(명령어/버튼) ──
+INTERACTION_SECONDS = histogram(
+    "bot_interaction_seconds", "명령어/버튼 처리 전체 시간", ("kind", "name", "outcome"))
+INTERACTION_DB_SECONDS = histogram(
+    "bot_interaction_db_seconds", "상호작용 하나가 DB 쿼리에 쓴 시간", ("kind", "name"))
+INTERACTION_DISCORD_SECONDS = histogram(
+    "bot_interaction_discord_seconds", "상호작용 하나가 Discord API 호출에 쓴 시간", ("kind", "name"))
+INTERACTION_DB_QUERIES = histogram(
+    "bot_interaction_db_queries", "상호작용 하나가 실행한 DB 쿼리 수", ("kind", "name"), QUERY_COUNT_BUCKETS)
+INTERACTION_ERRORS = counter(
+    "bot_interaction_errors_total", "처리 중 오류로 끝난 상호작용 수", ("kind", "name"))
+
+# ── DB ──
+DB_CALL_SECONDS = histogram(
+    "bot_db_call_seconds", "db_async를 거친 DB 함수 호출 시간 (스레드 풀 대기 포함)", ("function",))
+DB_QUEUE_SECONDS = histogram(
+    "bot_db_queue_seconds", "DB 스레드 풀에서 실행을 기다린 시간", ("function",))
+DB_QUERY_SECONDS = histogram(
+    "bot_db_query_seconds", "쿼리 하나의 실행 시간", ("statement",))
+DB_QUERY_ERRORS = counter(
+    "bot_db_query_errors_total", "오류로 끝난 쿼리 수", ("statement",))
+
+# ── Discord API ──
+DISCORD_HTTP_SECONDS = histogram(
+    "bot_discord_http_seconds", "Discord API 요청 시간", ("method", "route"))
+
+
+class InteractionStats:
+    """상호작용 하나를 처리하는 동안 모은 값 (DB 스레드에서도 더하므로 잠금 사용)"""
+    __slots__ = ("kind", "name", "failed", "started", "queries", "db_seconds", "discord_seconds", "_lock")
+
+    def __init__(self, kind, name):
+        self.kind = kind
+        self.name = name
+        self.failed = False
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.discord_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def add_query(self, elapsed):
+        with self._lock:
+            self.queries += 1
+            self.db_seconds += elapsed
+
+    def add_discord(self, elapsed):
+        with self._lock:
+            self.discord_seconds += elapsed
+
+
+_current = contextvars.ContextVar("interaction_stats", default=None)
+
+
+def current_interaction():
+    """지금 처리 중인 상호작용의 InteractionStats (없으면 None)"""
+    return _current.get()
+
+
+@contextmanager
+def track_interaction(kind, name="unknown"):
+    """
+    with 블록 안의 처리를 상호작용 하나로 기록.
+    블록 안에서 stats.name / stats.failed를 바꿀 수 있다. (명령어 이름은 처리 후에야 알 수 있는 경우가 있음)
+    """
+    stats = InteractionStats(kind, name)
+    reset = _current.set(stats)
+    try:
+        yield stats
+    except BaseException:
+        stats.failed = True
+        raise
+    finally:
+        _current.reset(reset)
+        elapsed = time.perf_counter() - stats.started
+        outcome = "error" if stats.failed else "ok"
+        INTERACTION_SECONDS.observe(elapsed, stats.kind, stats.name, outcome)
+        INTERACTION_DB_SECONDS.observe(stats.db_seconds, stats.kind, stats.name)
+        INTERACTION_DISCORD_SECONDS.observe(stats.discord_seconds, stats.kind, stats.name)
+        INTERACTION_DB_QUERIES.observe(stats.queries, stats.kind, stats.name)
+        if stats.failed:
+            INTERACTION_ERRORS.inc(stats.kind, stats.name)
+
+
+def record_query(statement, elapsed, failed=False):
+    """쿼리 하나 실행 기록 (statements.StatementCursor에서 호출)"""
+    DB_QUERY_SECONDS.observe(elapsed, statement)
+    if failed:
+        DB_QUERY_ERRORS.inc(statement)
+    stats = _current.get()
+    if stats is not None:
+        stats.add_query(elapsed)
+
+
+def record_discord_request(method, route, elapsed):
+    """Discord API 요청 하나 기록"""
+    DISCORD_HTTP_SECONDS.observe(elapsed, method, route)
+    stats = _current.get()
+    if stats is not None:
+        stats.add_discord(elapsed)
+
+
+# ---------------------------------------
+# Prometheus 텍스트 형식 내보내기
+# ---------------------------------------
+def render():
+    """모든 메트릭을 Prometheus 텍스트 형식(0.0.4) 문자열로"""
+    lines = []
+    for metric in _metrics:
+        lines.append(f"# HELP {metric.name} {metric.help}")
+        lines.append(f"# TYPE {metric.name} {metric.type}")
+        lines.extend(f"{sample} {_format_value(value)}" for sample, value in metric.samples())
+
+    for collect in _collectors:
+        try:
+            families = collect()
+        except Exception as e:
+            print(f"❌ 메트릭 수집 실패 ({getattr(collect, '__name__', collect)}): {e}")
+            continue
+        for name, kind, help, values in families:
+            lines.append(f"# HELP {name} {help}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in values.items():
+                if value is None:
+                    continue
+                label_text = _format_labels([key for key, _ in labels], [val for _, val in labels])
+                lines.append(f"{name}{label_text} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # 스크랩 요청마다 출력하지 않음
+
+
+_server = None
+
+
+def start_server(port=METRICS_PORT, host=METRICS_HOST):
+    """메트릭 엔드포인트를 백그라운드 스레드에서 시작 (이미 시작했거나 port가 0이면 아무것도 안 함)"""
+    global _server
+    if _server is not None or not port:
+        return _server
+    try:
+        _server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    except OSError as e:
+        print(f"❌ 메트릭 엔드포인트를 열 수 없습니다 ({host}:{port}): {e}")
+        return None
+    _server.daemon_threads = True
+    threading.Thread(target=_server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📈 메트릭 엔드포인트: http://{host}:{port}/metrics")
+    return _server
@@ -0,0 +1,7 @@
+from migrations import column_exists
+
+
+def upgrade(cursor):
+    """users.skill_point 컬럼 추가 (예전에는 database.py import 시점에 매번 시도하던 작업)"""
+    if not column_exists(cursor, "users", "skill_point"):
+        cursor.execute("ALTER TABLE users ADD COLUMN skill_point INT DEFAULT 0")
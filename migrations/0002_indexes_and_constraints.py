@@ -0,0 +1,57 @@
+from migrations import constraint_exists, index_on, unique_index_on
+
+
+def upgrade(cursor):
+    """
+    자주 쓰는 조회 조건에 인덱스/유니크 키를 추가하고,
+    investigator → users 외래 키(ON DELETE CASCADE)로 유저 삭제 시 기능치도 함께 지워지게 한다.
+    """
+    # users.user_id: 거의 모든 쿼리의 조건
+    if not unique_index_on(cursor, "users", ["user_id"]):
+        cursor.execute("ALTER TABLE users ADD UNIQUE KEY uq_users_user_id (user_id)")
+
+    # houses.name, personalities.name: 이름으로 찾는 참조 데이터
+    if not unique_index_on(cursor, "houses", ["name"]):
+        cursor.execute("ALTER TABLE houses ADD UNIQUE KEY uq_houses_name (name)")
+    if not unique_index_on(cursor, "personalities", ["name"]):
+        cursor.execute("ALTER TABLE personalities ADD UNIQUE KEY uq_personalities_name (name)")
+
+    # personalities ORDER BY id
+    if not index_on(cursor, "personalities", ["id"]):
+        cursor.execute("ALTER TABLE personalities ADD INDEX ix_personalities_id (id)")
+
+    # 유저가 지워진 뒤 남아 있던 기능치 정리 (외래 키를 걸기 전에 필요)
+    cursor.execute("""
+        DELETE i FROM investigator i
+        LEFT JOIN users u ON u.user_id = i.user_id
+        WHERE u.user_id IS NULL
+    """)
+
+    # (user_id, name) 중복 기능치는 점수가 가장 높은 한 줄만 남김
+    if not unique_index_on(cursor, "investigator", ["user_id", "name"]):
+        cursor.execute("""
+            CREATE TEMPORARY TABLE investigator_dedup AS
+            SELECT user_id, name, MAX(basic_point) AS basic_point, MAX(add_point) AS add_point
+            FROM investigator
+            GROUP BY user_id, name
+            HAVING COUNT(*) > 1
+        """)
+        cursor.execute("""
+            DELETE i FROM investigator i
+            JOIN investigator_dedup d ON d.user_id = i.user_id AND d.name = i.name
+        """)
+        cursor.execute("""
+            INSERT INTO investigator (user_id, name, basic_point, add_point)
+            SELECT user_id, name, basic_point, add_point FROM investigator_dedup
+        """)
+        cursor.execute("DROP TEMPORARY TABLE investigator_dedup")
+
+        # user_id로 시작하므로 investigator.user_id 조회 인덱스 역할도 한다
+        cursor.execute("ALTER TABLE investigator ADD UNIQUE KEY uq_investigator_user_skill (user_id, name)")
+
+    if not constraint_exists(cursor, "investigator", "fk_investigator_user"):
+        cursor.execute("""
+            ALTER TABLE investigator
+            ADD CONSTRAINT fk_investigator_user
+            FOREIGN KEY (user_id) REFERENCES users (user_id) ON DELETE CASCADE
+        """)
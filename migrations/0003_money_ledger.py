@@ -0,0 +1,14 @@
+def upgrade(cursor):
+    """재화 변동 기록 테이블 (추가만 하고 수정/삭제하지 않는다)"""
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS money_ledger (
+            id            BIGINT       NOT NULL AUTO_INCREMENT PRIMARY KEY,
+            user_id       VARCHAR(32)  NOT NULL,
+            delta         BIGINT       NOT NULL,
+            balance_after BIGINT       NOT NULL,
+            actor_id      VARCHAR(32)  NULL,
+            reason        VARCHAR(255) NULL,
+            created_at    DATETIME(6)  NOT NULL,
+            INDEX ix_money_ledger_user (user_id, id)
+        )
+    """)
@@ -0,0 +1,173 @@
+import importlib
+import pkgutil
+import re
+from contextlib import closing
+
+import mysql.connector
+from mysql.connector import errorcode
+
+from db_pool import connection
+
+# ---------------------------------------
+# 스키마 마이그레이션
+# ---------------------------------------
+# 이 패키지 안의 `NNNN_설명.py` 파일이 하나의 마이그레이션이다. 번호 순서대로 적용하고,
+# 적용한 번호는 schema_version 테이블에 남긴다. 각 파일은 upgrade(cursor) 함수를 가진다.
+#
+#   python -m migrations status    # 현재 버전과 적용 대기 중인 마이그레이션 확인
+#   python -m migrations upgrade   # 대기 중인 마이그레이션 모두 적용
+#   python -m migrations explain   # queries.py의 모든 쿼리 실행 계획 점검 (전체 스캔이 있으면 실패)
+#
+# 봇은 시작할 때 check_schema()로 버전만 확인하고, 마이그레이션을 직접 실행하지는 않는다.
+
+_MIGRATION_NAME = re.compile(r"^(\d{4})_\w+$")
+
+
+class Migration:
+    def __init__(self, version, name, module_name):
+        self.version = version
+        self.name = name
+        self.module_name = module_name
+
+    def load(self):
+        return importlib.import_module(f"{__name__}.{self.module_name}")
+
+    def __repr__(self):
+        return f"<Migration {self.version:04d} {self.name}>"
+
+
+def discover():
+    """패키지 안의 마이그레이션 파일을 번호 순으로 나열 (import는 하지 않음)"""
+    migrations = []
+    for module in pkgutil.iter_modules(__path__):
+        match = _MIGRATION_NAME.match(module.name)
+        if match:
+            version = int(match.group(1))
+            migrations.append(Migration(version, module.name[5:], module.name))
+    migrations.sort(key=lambda m: m.version)
+
+    versions = [m.version for m in migrations]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError(f"❌ 마이그레이션 번호가 중복되었습니다: {versions}")
+    return migrations
+
+
+def latest_version():
+    migrations = discover()
+    return migrations[-1].version if migrations else 0
+
+
+def current_version(cursor):
+    """schema_version 테이블의 최신 번호 (테이블이 없으면 0)"""
+    try:
+        cursor.execute("SELECT MAX(version) FROM schema_version")
+    except mysql.connector.Error as e:
+        if e.errno == errorcode.ER_NO_SUCH_TABLE:
+            return 0
+        raise
+    row = cursor.fetchone()
+    return row[0] or 0
+
+
+def column_exists(cursor, table, column):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.COLUMNS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND COLUMN_NAME = %s",
+        (table, column)
+    )
+    return cursor.fetchone() is not None
+
+
+def index_on(cursor, table, columns):
+    """columns로 시작하는 인덱스가 있으면 그 이름, 없으면 None"""
+    cursor.execute(
+        "SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s GROUP BY INDEX_NAME",
+        (table,)
+    )
+    wanted = list(columns)
+    for index_name, index_columns in cursor.fetchall():
+        if index_columns.split(",")[:len(wanted)] == wanted:
+            return index_name
+    return None
+
+
+def unique_index_on(cursor, table, columns):
+    """정확히 columns로 이루어진 UNIQUE(또는 PRIMARY) 인덱스가 있는지"""
+    cursor.execute(
+        "SELECT INDEX_NAME, GROUP_CONCAT(COLUMN_NAME ORDER BY SEQ_IN_INDEX) FROM information_schema.STATISTICS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND NON_UNIQUE = 0 GROUP BY INDEX_NAME",
+        (table,)
+    )
+    wanted = ",".join(columns)
+    return any(index_columns == wanted for _, index_columns in cursor.fetchall())
+
+
+def constraint_exists(cursor, table, constraint):
+    cursor.execute(
+        "SELECT 1 FROM information_schema.TABLE_CONSTRAINTS "
+        "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s AND CONSTRAINT_NAME = %s",
+        (table, constraint)
+    )
+    return cursor.fetchone() is not None
+
+
+def _ensure_version_table(cursor):
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version    INT          NOT NULL PRIMARY KEY,
+            name       VARCHAR(255) NOT NULL,
+            applied_at TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+
+
+def pending(cursor):
+    current = current_version(cursor)
+    return [m for m in discover() if m.version > current]
+
+
+def upgrade(target=None):
+    """
+    대기 중인 마이그레이션을 순서대로 적용.
+    MySQL의 DDL은 자동 커밋되므로 마이그레이션 하나가 끝날 때마다 버전을 기록한다.
+    반환: 적용한 마이그레이션 목록
+    """
+    applied = []
+    with connection() as conn, closing(conn.cursor()) as cursor:
+        _ensure_version_table(cursor)
+        conn.commit()
+
+        for migration in pending(cursor):
+            if target is not None and migration.version > target:
+                break
+
+            print(f"⏫ 마이그레이션 {migration.version:04d} {migration.name} 적용 중...")
+            migration.load().upgrade(cursor)
+            cursor.execute(
+                "INSERT INTO schema_version (version, name) VALUES (%s, %s)",
+                (migration.version, migration.name)
+            )
+            conn.commit()
+            applied.append(migration)
+
+    print(f"✅ 스키마 버전: {applied[-1].version if applied else '변경 없음'}")
+    return applied
+
+
+def check_schema():
+    """
+    시작 시 호출하는 가벼운 확인 (쿼리 한 번).
+    반환: (현재 버전, 최신 버전) — DB에 접속하지 못하면 현재 버전은 None
+    """
+    latest = latest_version()
+    try:
+        with connection() as conn, closing(conn.cursor()) as cursor:
+            current = current_version(cursor)
+    except mysql.connector.Error as e:
+        print(f"❌ 스키마 버전 확인 실패: {e}")
+        return None, latest
+
+    if current < latest:
+        print(f"⚠️ DB 스키마가 최신이 아닙니다 (현재 {current}, 최신 {latest}). `python -m migrations upgrade`를 실행하세요.")
+    return current, latest
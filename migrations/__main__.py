@@ -0,0 +1,84 @@
+import argparse
+import sys
+from contextlib import closing
+
+import queries
+from db_pool import connection
+from migrations import current_version, discover, pending, upgrade
+
+# 실행 계획에서 전체 스캔으로 보는 접근 방식 (ALL: 테이블 전체, index: 인덱스 전체)
+FULL_SCAN_TYPES = {"ALL", "index"}
+
+
+def explain_targets():
+    """EXPLAIN할 {쿼리 이름: SQL}. queries.py의 SELECT/UPDATE/DELETE 상수와 빌더 함수의 대표 형태"""
+    targets = {
+        name: sql for name, sql in vars(queries).items()
+        if name.isupper() and isinstance(sql, str)
+        and sql.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE")
+    }
+    # 동적으로 만드는 쿼리는 대표 형태로 점검 (빌더는 lru_cache라서 인자가 hashable이어야 함)
+    targets["update_user_columns"] = queries.update_user_columns(("hp", "mp"))
+    targets["select_money_for_update"] = queries.select_money_for_update(3)
+    targets["add_money_bulk"] = queries.add_money_bulk(3)
+    targets["remove_money_bulk"] = queries.remove_money_bulk(3)
+    return targets
+
+
+def explain_queries():
+    """
+    explain_targets()의 쿼리를 모두 EXPLAIN하고 전체 스캔을 찾음.
+    반환: 문제가 있는 (쿼리 이름, 테이블, 접근 방식) 목록
+    """
+    targets = explain_targets()
+    problems = []
+    with connection() as conn, closing(conn.cursor(dictionary=True)) as cursor:
+        for name, sql in sorted(targets.items()):
+            params = ("0",) * sql.count("%s")
+            cursor.execute("EXPLAIN " + sql, params)
+            for row in cursor.fetchall():
+                access = row.get("type")
+                if access in FULL_SCAN_TYPES and name not in queries.FULL_SCAN_ALLOWED:
+                    problems.append((name, row.get("table"), access))
+                print(f"  {name:<32} {str(row.get('table')):<14} type={access} key={row.get('key')}")
+        conn.rollback()
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m migrations", description="DB 스키마 마이그레이션")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("status", help="현재 버전과 대기 중인 마이그레이션 표시")
+    up = sub.add_parser("upgrade", help="대기 중인 마이그레이션 적용")
+    up.add_argument("--to", type=int, default=None, help="이 번호까지만 적용")
+    sub.add_parser("explain", help="모든 쿼리의 실행 계획을 점검 (전체 스캔이 있으면 실패)")
+    args = parser.parse_args(argv)
+
+    if args.command == "status":
+        with connection() as conn, closing(conn.cursor()) as cursor:
+            current = current_version(cursor)
+            waiting = {migration.version for migration in pending(cursor)}
+        print(f"현재 버전: {current}")
+        for migration in discover():
+            mark = "대기" if migration.version in waiting else "적용됨"
+            print(f"  {migration.version:04d} {migration.name} [{mark}]")
+        return 0
+
+    if args.command == "upgrade":
+        upgrade(target=args.to)
+        return 0
+
+    if args.command == "explain":
+        problems = explain_queries()
+        for name, table, access in problems:
+            print(f"❌ {name}: {table} 테이블을 전체 스캔합니다 (type={access})")
+        if problems:
+            return 1
+        print("✅ 전체 스캔하는 쿼리가 없습니다.")
+        return 0
+
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+import functools
+
+from records import House, Personality, UserProfile, columns
+from stats import BASE_STATS
+
+# ---------------------------------------
+# database.py / catalog.py에서 사용하는 SQL 모음
+# ---------------------------------------
+# 쿼리 문자열을 한곳에 모아 두면 `python -m migrations explain`으로
+# 전체 쿼리의 실행 계획(인덱스 사용 여부)을 한 번에 점검할 수 있다.
+
+# ── users ──
+# 컬럼 목록은 records.UserProfile 필드 순서 그대로
+SELECT_USER = f"SELECT {columns(UserProfile)} FROM users WHERE user_id = %s"
+
+SELECT_BASE_STATS_FOR_UPDATE = f"SELECT {', '.join(BASE_STATS)} FROM users WHERE user_id = %s FOR UPDATE"
+
+# 이미 등록된 유저면(uq_users_user_id 중복) IntegrityError(ER_DUP_ENTRY)가 나고 호출하는 쪽에서 구분한다.
+# INSERT IGNORE는 잘림/잘못된 값/FK 오류까지 경고로 바꿔 삼키고, ON DUPLICATE KEY UPDATE는 FOUND_ROWS 연결에서
+# 중복이어도 rowcount 1이라 신규 등록과 구분되지 않으므로 쓰지 않는다.
+_INSERT_USER_COLUMNS = (
+    "user_id, name, house, personality, strength, constitution, size, intelligence, dexterity, willpower, appearance, education, luck, "
+    "hp, mp, sanity, movement, damage_bonus, build, status, skill_point"
+)
+_INSERT_USER_ROW = "(%s, %s, NULL, NULL, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+INSERT_USER = f"INSERT INTO users ({_INSERT_USER_COLUMNS}) VALUES {_INSERT_USER_ROW}"
+
+@functools.lru_cache(maxsize=None)
+def insert_users(count):
+    """신규 유저 count명을 한 번에 넣는 multi-row INSERT (일괄 등록용)"""
+    return f"INSERT INTO users ({_INSERT_USER_COLUMNS}) VALUES {', '.join([_INSERT_USER_ROW] * count)}"
+
+UPDATE_USER_NAME = "UPDATE users SET name = %s WHERE user_id = %s"
+UPDATE_USER_APPEARANCE = "UPDATE users SET appearance = %s WHERE user_id = %s"
+SELECT_MONEY = "SELECT money FROM users WHERE user_id = %s"
+ADD_MONEY = "UPDATE users SET money = money + %s WHERE user_id = %s"
+# 잔액이 부족하면 아무 row도 바뀌지 않는 조건부 차감
+REMOVE_MONEY = "UPDATE users SET money = money - %s WHERE user_id = %s AND money >= %s"
+DELETE_USER = "DELETE FROM users WHERE user_id = %s"
+# 순위표 초기화용 (시작할 때 한 번 전체를 읽는 것이 목적)
+SELECT_RANKING_SEED = "SELECT user_id, name, house, money, luck, sanity FROM users"
+
+# IN (...) 목록 길이와 multi-row INSERT의 row 수는 아래 크기 중 하나로 맞춘다.
+# (길이마다 prepared statement가 따로 생기므로 종류를 제한)
+BATCH_ARITIES = (1, 2, 4, 8, 16, 32, 64, 128)
+MAX_BATCH_ARITY = BATCH_ARITIES[-1]
+
+def in_chunks(values):
+    """
+    values를 MAX_BATCH_ARITY개 이하 묶음으로 나누고, 각 묶음을 BATCH_ARITIES 중 맞는 크기까지 마지막 값을 반복해 채운 튜플로.
+    (IN 목록에 같은 값이 여러 번 있어도 결과는 같다)
+    """
+    values = list(values)
+    for start in range(0, len(values), MAX_BATCH_ARITY):
+        chunk = values[start:start + MAX_BATCH_ARITY]
+        arity = next(size for size in BATCH_ARITIES if size >= len(chunk))
+        yield tuple(chunk + chunk[-1:] * (arity - len(chunk)))
+
+def row_chunks(rows):
+    """
+    INSERT할 rows를 BATCH_ARITIES 크기 묶음들로 나눔 (37개 → 32 + 4 + 1).
+    INSERT는 같은 row를 채워 넣을 수 없으므로 in_chunks처럼 늘리지 않고 나눠서 실행한다.
+    """
+    rows = list(rows)
+    start = 0
+    while start < len(rows):
+        size = next(size for size in reversed(BATCH_ARITIES) if size <= len(rows) - start)
+        yield rows[start:start + size]
+        start += size
+
+def _in_clause(count):
+    return ", ".join(["%s"] * count)
+
+@functools.lru_cache(maxsize=None)
+def select_money_for_update(count):
+    """여러 유저의 잔액을 잠그고 읽기 (일괄 지급/차감용)"""
+    return f"SELECT user_id, money FROM users WHERE user_id IN ({_in_clause(count)}) FOR UPDATE"
+
+@functools.lru_cache(maxsize=None)
+def add_money_bulk(count):
+    return f"UPDATE users SET money = money + %s WHERE user_id IN ({_in_clause(count)})"
+
+@functools.lru_cache(maxsize=None)
+def remove_money_bulk(count):
+    return f"UPDATE users SET money = money - %s WHERE user_id IN ({_in_clause(count)}) AND money >= %s"
+
+# ── money_ledger ──
+@functools.lru_cache(maxsize=None)
+def insert_ledger(count):
+    """재화 변동 기록 count건을 한 번에 넣는 multi-row INSERT"""
+    rows_sql = ", ".join(["(%s, %s, %s, %s, %s, %s)"] * count)
+    return f"INSERT INTO money_ledger (user_id, delta, balance_after, actor_id, reason, created_at) VALUES {rows_sql}"
+
+# ── investigator ──
+SELECT_USER_SKILLS = "SELECT name, basic_point, add_point FROM investigator WHERE user_id = %s"
+SELECT_USER_SKILLS_FOR_UPDATE = SELECT_USER_SKILLS + " FOR UPDATE"
+SELECT_SKILL_POINT_FOR_UPDATE = "SELECT skill_point FROM users WHERE user_id = %s FOR UPDATE"
+
+@functools.lru_cache(maxsize=None)
+def add_skill_points(count):
+    """
+    기능 count개의 add_point를 한 번에 올리는 multi-row upsert (uq_investigator_user_skill 기준).
+    배분은 이미 있는 기능만 허용하므로 항상 UPDATE 쪽으로 처리된다.
+    넣으려던 값은 row 별칭(new)으로 읽는다. (VALUES(col) 형태는 MySQL 8.0.20부터 deprecated, 별칭은 8.0.19 이상)
+    """
+    rows_sql = ", ".join(["(%s, %s, 0, %s)"] * count)
+    return (
+        f"INSERT INTO investigator (user_id, name, basic_point, add_point) VALUES {rows_sql} AS new "
+        "ON DUPLICATE KEY UPDATE add_point = investigator.add_point + new.add_point"
+    )
+
+@functools.lru_cache(maxsize=None)
+def insert_skills(count):
+    """기능치 count개를 한 번에 넣는 multi-row INSERT"""
+    rows_sql = ", ".join(["(%s, %s, %s, 0)"] * count)
+    return f"INSERT INTO investigator (user_id, name, basic_point, add_point) VALUES {rows_sql}"
+
+@functools.lru_cache(maxsize=None)
+def update_user_columns(columns):
+    """지정한 users 컬럼들을 한 번에 갱신하는 UPDATE (컬럼 이름은 코드에서만 넘어온다)"""
+    set_clause = ", ".join(f"{name} = %s" for name in columns)
+    return f"UPDATE users SET {set_clause} WHERE user_id = %s"
+
+# ── 참조 데이터 (시작할 때 테이블 전체를 읽는 것이 목적) ──
+SELECT_ALL_HOUSES = f"SELECT {columns(House)} FROM houses"
+SELECT_ALL_PERSONALITIES = f"SELECT {columns(Personality)} FROM personalities ORDER BY id"
+
+# EXPLAIN 점검에서 전체 스캔을 허용하는 쿼리
+FULL_SCAN_ALLOWED = {"SELECT_ALL_HOUSES", "SELECT_ALL_PERSONALITIES", "SELECT_RANKING_SEED"}
@@ -0,0 +1,135 @@
+import threading
+from bisect import bisect_left, insort
+
+# ---------------------------------------
+# 재화/행운/이성 순위표 (메모리)
+# ---------------------------------------
+# 시작할 때 users 테이블을 한 번 읽어 정렬 목록을 만들고, 이후에는 database.py의 쓰기 함수가
+# 커밋한 값을 그대로 반영한다. 순위 조회는 이분 탐색만 하므로 DB를 거치지 않는다.
+
+METRICS = ("money", "luck", "sanity")
+
+
+class Leaderboard:
+    """한 지표의 정렬 목록. (-값, user_id) 오름차순 = 값 내림차순"""
+
+    def __init__(self):
+        self._keys = []
+        self._values = {}
+
+    def __len__(self):
+        return len(self._keys)
+
+    def set(self, user_id, value):
+        old = self._values.get(user_id)
+        if old is not None:
+            if old == value:
+                return
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+        self._values[user_id] = value
+        insort(self._keys, (-value, user_id))
+
+    def remove(self, user_id):
+        old = self._values.pop(user_id, None)
+        if old is not None:
+            del self._keys[bisect_left(self._keys, (-old, user_id))]
+
+    def rank(self, user_id):
+        """1부터 시작하는 순위 (같은 값은 같은 순위), 없으면 None"""
+        value = self._values.get(user_id)
+        if value is None:
+            return None
+        # (-value,)는 같은 값을 가진 어떤 (-value, user_id)보다도 앞에 온다
+        return bisect_left(self._keys, (-value,)) + 1
+
+    def top(self, n):
+        """[(순위, user_id, 값), ...]"""
+        result = []
+        for key in self._keys[:n]:
+            negative, user_id = key
+            result.append((bisect_left(self._keys, (negative,)) + 1, user_id, -negative))
+        return result
+
+
+class RankingBoard:
+    """지표별 전체 순위표와 기숙사별 순위표를 함께 관리"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._boards = {}   # (지표, 기숙사 또는 None) -> Leaderboard
+        self._users = {}    # user_id -> {"name", "house", 지표...}
+        self.loaded = False
+
+    def _board(self, metric, house):
+        board = self._boards.get((metric, house))
+        if board is None:
+            board = self._boards[(metric, house)] = Leaderboard()
+        return board
+
+    def seed(self, rows):
+        """rows: (user_id, name, house, money, luck, sanity) 목록으로 처음부터 다시 만듦"""
+        with self._lock:
+            self._boards = {}
+            self._users = {}
+            for user_id, name, house, money, luck, sanity in rows:
+                self._apply_locked(user_id, {"name": name, "house": house, "money": money, "luck": luck, "sanity": sanity})
+            self.loaded = True
+
+    def update(self, user_id, values):
+        """
+        커밋된 변경 사항 반영. values에서 name, house, METRICS 키만 사용하고 나머지는 무시한다.
+        처음 보는 유저면 새로 추가.
+        """
+        relevant = {key: values[key] for key in ("name", "house", *METRICS) if key in values}
+        if not relevant:
+            return
+        with self._lock:
+            self._apply_locked(str(user_id), relevant)
+
+    def _apply_locked(self, user_id, values):
+        entry = self._users.setdefault(user_id, {"name": None, "house": None})
+        old_house = entry["house"]
+        entry.update(values)
+        new_house = entry["house"]
+
+        for metric in METRICS:
+            value = entry.get(metric)
+            if value is None:
+                continue
+            self._board(metric, None).set(user_id, value)
+            if old_house != new_house and old_house is not None:
+                self._board(metric, old_house).remove(user_id)
+            if new_house is not None:
+                self._board(metric, new_house).set(user_id, value)
+
+    def remove(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._users.pop(user_id, None)
+            if entry is None:
+                return
+            for metric in METRICS:
+                self._board(metric, None).remove(user_id)
+                if entry["house"] is not None:
+                    self._board(metric, entry["house"]).remove(user_id)
+
+    def top(self, metric, house=None, n=10):
+        """[(순위, user_id, 이름, 값), ...]"""
+        with self._lock:
+            board = self._boards.get((metric, house))
+            if board is None:
+                return []
+            return [(rank, user_id, self._users[user_id]["name"], value) for rank, user_id, value in board.top(n)]
+
+    def rank(self, metric, user_id, house=None):
+        """(순위, 전체 인원, 값) — 순위표에 없으면 (None, 전체 인원, None)"""
+        user_id = str(user_id)
+        with self._lock:
+            board = self._boards.get((metric, house))
+            if board is None:
+                return None, 0, None
+            entry = self._users.get(user_id, {})
+            return board.rank(user_id), len(board), entry.get(metric)
+
+
+ranking = RankingBoard()
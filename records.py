@@ -0,0 +1,58 @@
+from typing import NamedTuple
+
+# ---------------------------------------
+# DB row 레코드 타입
+# ---------------------------------------
+# 커서가 돌려주는 튜플을 `Record._make(row)`로 바로 감싼다. (row마다 dict를 만들지 않음)
+# 필드 순서가 곧 SELECT 컬럼 순서이고, queries.py는 _fields로 SELECT 문을 만든다.
+# 그래서 컬럼을 추가할 때는 여기 필드 하나만 추가하면 SELECT와 읽는 쪽이 함께 맞춰진다.
+
+
+class UserProfile(NamedTuple):
+    user_id: str
+    name: str
+    house: str | None
+    personality: str | None     # 쉼표로 구분한 성격 이름들
+    strength: int
+    constitution: int
+    size: int
+    intelligence: int
+    willpower: int
+    dexterity: int
+    appearance: int
+    education: int
+    money: int                  # 크넛
+    luck: int
+    movement: int
+    damage_bonus: str           # "+1d4", "0", "-2d6" ...
+    build: int
+    hp: int
+    mp: int
+    sanity: int
+    status: str                 # N: 정상, D: 빈사, M: 영구적 광기
+    skill_point: int            # 기능 점수 총량 (EDU×4 + INT×2)
+
+
+class House(NamedTuple):
+    name: str
+    role_id: int | None
+    strength: int
+    constitution: int
+    size: int
+    intelligence: int
+    willpower: int
+    dexterity: int
+
+
+class Personality(NamedTuple):
+    name: str
+    strength: int
+    constitution: int
+    intelligence: int
+    willpower: int
+    dexterity: int
+
+
+def columns(record_type):
+    """SELECT에 쓸 컬럼 목록 문자열"""
+    return ", ".join(record_type._fields)
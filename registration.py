@@ -0,0 +1,126 @@
+import asyncio
+import contextvars
+import os
+
+import database
+from database import WriteResult
+from db_async import run
+
+# ---------------------------------------
+# 등록 요청 묶음 처리 (group commit)
+# ---------------------------------------
+# 학기 초처럼 `/프로필 등록`이 한꺼번에 몰릴 때, 요청마다 트랜잭션과 commit을 하지 않고
+# 큐에 모아 database.register_users로 묶어서 넣는다. (multi-row INSERT + commit 1번)
+#
+#   REGISTRATION_BATCH_SIZE     : 한 번에 넣는 최대 인원 (이만큼 모이면 바로 씀)
+#   REGISTRATION_FLUSH_INTERVAL : 첫 요청 후 더 모이기를 기다리는 최대 시간(초)
+#   REGISTRATION_MAX_PENDING    : 큐에 쌓일 수 있는 최대 요청 수. 가득 차면 submit이 자리가 날 때까지 기다린다.
+#
+# 한 번에 한 묶음만 쓰므로, 쓰는 동안 들어온 요청은 다음 묶음으로 모인다. (요청이 많을수록 묶음이 커짐)
+
+REGISTRATION_BATCH_SIZE = int(os.getenv("REGISTRATION_BATCH_SIZE", "50"))
+REGISTRATION_FLUSH_INTERVAL = float(os.getenv("REGISTRATION_FLUSH_INTERVAL", "0.05"))
+REGISTRATION_MAX_PENDING = int(os.getenv("REGISTRATION_MAX_PENDING", "1000"))
+
+
+class RegistrationQueue:
+    def __init__(self, batch_size=REGISTRATION_BATCH_SIZE, flush_interval=REGISTRATION_FLUSH_INTERVAL,
+                 max_pending=REGISTRATION_MAX_PENDING):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._queue = None
+        self._worker = None
+        self._collecting = []   # 모으는 중인 묶음 (close 때 함께 저장)
+        self._writing = None    # 저장 중인 묶음의 태스크
+        self._stats = {"submitted": 0, "batches": 0, "registered": 0, "largest_batch": 0}
+
+    def _ensure_started(self):
+        # 큐와 작업 태스크는 실행 중인 이벤트 루프 안에서 처음 쓸 때 만든다
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        if self._worker is None or self._worker.done():
+            # 태스크는 만드는 쪽의 context를 물려받는다. 첫 등록 상호작용의 트레이스/메트릭(contextvar)에
+            # 이후 모든 묶음의 DB 시간이 붙지 않도록 빈 context에서 시작한다.
+            self._worker = contextvars.Context().run(asyncio.create_task, self._run(), name="registration-writer")
+
+    async def submit(self, user_id, user_name):
+        """
+        등록 요청을 큐에 넣고, 그 요청이 들어간 묶음이 저장될 때까지 기다림.
+        반환: 이 요청의 WriteResult (REGISTERED / ALREADY_REGISTERED / ERROR)
+        """
+        self._ensure_started()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((user_id, user_name, future))  # 가득 차 있으면 여기서 대기 (backpressure)
+        self._stats["submitted"] += 1
+        return await future
+
+    async def _collect(self):
+        """첫 요청을 기다린 뒤, batch_size가 차거나 flush_interval이 지날 때까지 더 모음"""
+        batch = self._collecting = [await self._queue.get()]
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.flush_interval
+        while len(batch) < self.batch_size:
+            # 이미 쌓여 있는 요청은 기다리지 않고 가져옴
+            if not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._collecting = []
+            # 저장 도중 close로 취소돼도 이 묶음은 끝까지 쓰고 결과를 돌려주도록 shield
+            self._writing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._writing)
+
+    async def _flush(self, batch):
+        requests = [(user_id, user_name) for user_id, user_name, _ in batch]
+        try:
+            results = await run(database.register_users, requests)
+        except Exception as e:
+            print(f"❌ 등록 묶음 처리 실패 ({len(batch)}명): {e}")
+            results = [WriteResult.ERROR] * len(batch)
+
+        for (_, _, future), result in zip(batch, results):
+            if not future.done():  # 기다리던 쪽이 취소됐을 수 있음
+                future.set_result(result)
+
+        self._stats["batches"] += 1
+        self._stats["registered"] += sum(1 for result in results if result is WriteResult.REGISTERED)
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(batch))
+
+    async def close(self):
+        """남은 요청을 모두 저장하고 작업 태스크를 멈춤"""
+        if self._worker is None:
+            return
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+        if self._writing is not None:
+            await self._writing
+
+        pending, self._collecting = self._collecting, []
+        while not self._queue.empty():
+            pending.append(self._queue.get_nowait())
+        for start in range(0, len(pending), self.batch_size):
+            await self._flush(pending[start:start + self.batch_size])
+
+    def stats(self):
+        snapshot = dict(self._stats)
+        snapshot["pending"] = self._queue.qsize() if self._queue is not None else 0
+        return snapshot
+
+
+registration_queue = RegistrationQueue()
@@ -0,0 +1,104 @@
+import os
+
+from cache import LRUCache
+
+# ---------------------------------------
+# 화면 표시용 문자열 / embed 만들기
+# ---------------------------------------
+# 재화 표기는 여기 한 곳에서만 계산한다. (프로필, GM 명령어, 순위표 공용)
+# 프로필 embed는 discord.Embed.from_dict에 넘길 dict로 만들어 유저별로 캐시한다.
+# UserProfile은 불변 레코드라서, 캐시해 둔 레코드와 지금 레코드가 같으면 row가 바뀌지 않은 것이고
+# 다르면(쓰기 이후) 다시 만든다. 따라서 쓰기 쪽에서 따로 무효화하지 않아도 오래된 화면이 나가지 않는다.
+
+KNUTS_PER_SICKLE = 29
+SICKLES_PER_GALLEON = 17
+KNUTS_PER_GALLEON = KNUTS_PER_SICKLE * SICKLES_PER_GALLEON  # 493
+
+PROFILE_COLOR = 0x3498db
+
+RENDER_CACHE_SIZE = int(os.getenv("RENDER_CACHE_SIZE", os.getenv("PROFILE_CACHE_SIZE", "1024")))
+# user_id -> (그릴 때 쓴 UserProfile, embed dict)
+profile_render_cache = LRUCache(maxsize=RENDER_CACHE_SIZE, ttl=0)
+
+
+def split_currency(knuts):
+    """크넛 단위 금액을 (갈레온, 시클, 크넛)으로"""
+    galleons, remainder = divmod(knuts, KNUTS_PER_GALLEON)
+    sickles, knuts = divmod(remainder, KNUTS_PER_SICKLE)
+    return galleons, sickles, knuts
+
+
+def format_currency(knuts):
+    """크넛 단위 금액을 `갈레온 시클 크넛` 문자열로 (1 갈레온 = 17 시클 = 493 크넛)"""
+    galleons, sickles, knuts = split_currency(knuts)
+    return f"{galleons} 갈레온 {sickles} 시클 {knuts} 크넛"
+
+
+def _code_block(lines):
+    return "```" + "\n".join(lines) + "```"
+
+
+def _two_columns(left, right, gap):
+    return [
+        f"{label1:<9}: {val1:<6}{gap}{label2:<9}: {val2}"
+        for (label1, val1), (label2, val2) in zip(left, right)
+    ]
+
+
+def _build_profile_embed(profile):
+    # ────────── [1] 기본 정보 ──────────
+    basic_info = _code_block([
+        f"이름   : {profile.name}",
+        f"소속   : {profile.house or '미정'}",
+        f"성격   : {profile.personality or '미정'}",
+    ])
+
+    # ────────── [2] 특성치 (2칼럼) ──────────
+    stats = _code_block(_two_columns(
+        [("STR(근력)", profile.strength), ("DEX(민첩)", profile.dexterity),
+         ("APP(외모)", profile.appearance), ("POW(정신)", profile.willpower)],
+        [("CON(건강)", profile.constitution), ("SIZ(크기)", profile.size),
+         ("INT(지능)", profile.intelligence), ("EDU(교육)", profile.education)],
+        gap="  "
+    ))
+
+    # ────────── [3] 보조 특성치 ──────────
+    combat = _code_block(_two_columns(
+        [("HP(체력)", profile.hp), ("MP(마력)", profile.mp),
+         ("SAN(이성)", profile.sanity), ("STA(상태)", profile.status)],
+        [("LUK(행운)", profile.luck), ("MOV(이동)", profile.movement),
+         ("DB(피해)", profile.damage_bonus), ("BUILD(체구)", profile.build)],
+        gap=" "
+    ))
+
+    # ────────── [4] 보유 재화 ──────────
+    money = f"```\n{format_currency(profile.money)}\n```"
+
+    return {
+        "type": "rich",
+        "title": ":scroll: 내 프로필",
+        "description": "아래는 당신의 탐사자(캐릭터) 정보입니다.",
+        "color": PROFILE_COLOR,
+        "fields": [
+            {"name": ":bust_in_silhouette: 기본 정보", "value": basic_info, "inline": False},
+            {"name": ":star: 특성치", "value": stats, "inline": False},
+            {"name": ":jigsaw: 보조 특성치", "value": combat, "inline": False},
+            {"name": ":moneybag: 보유 재화", "value": money, "inline": False},
+        ],
+    }
+
+
+def profile_embed(profile):
+    """
+    프로필 embed dict (discord.Embed.from_dict용).
+    같은 레코드로 이미 그린 적이 있으면 캐시된 dict를 그대로 돌려준다.
+    """
+    cached = profile_render_cache.get(profile.user_id)
+    if cached is not None:
+        rendered_from, payload = cached
+        if rendered_from is profile or rendered_from == profile:
+            return payload
+
+    payload = _build_profile_embed(profile)
+    profile_render_cache.put(profile.user_id, (profile, payload))
+    return payload
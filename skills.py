@@ -0,0 +1,118 @@
+import re
+from array import array
+
+# ---------------------------------------
+# 탐사자 기능치
+# ---------------------------------------
+# 모든 탐사자는 같은 기본 기능 목록을 가지므로, 유저별 기능치는 이름 dict 대신
+# SKILL_NAMES 순서의 정수 배열(array) 두 개(기본 점수, 추가 점수)로 들고 있는다.
+# 캐시에 수천 명이 올라가도 유저당 수백 바이트 수준이다.
+
+# 기능 점수로 올릴 수 있는 최대치
+MAX_SKILL_VALUE = 99
+# 기능 점수로 올릴 수 없는 기능
+LOCKED_SKILLS = frozenset({"크툴루 신화"})
+
+
+def default_skills(education, dexterity):
+    """신규 탐사자의 기본 기능치 (기능 이름 → 기본 점수)"""
+    return {
+        "감정": 5, "고고학": 1, "관찰력": 25, "근접전(격투)": 25, "기계수리": 10,
+        "도약": 20, "듣기": 20, "말재주": 5, "매혹": 15, "법률": 5,
+        "변장": 5, "사격(권총)": 20, "사격(라/산)": 25, "설득": 10, "손놀림":10,
+        "수영": 20, "승마": 5, "심리학": 10, "언어(모국어)": education, "역사": 5,
+        "열쇠공": 1, "오르기": 20, "오컬트": 5, "위협": 15, "은밀행동": 20,
+        "응급처치": 30, "의료": 1, "인류학": 1, "자동차 운전": 20, "자료조사": 20,
+        "자연": 10, "전기수리": 10, "정신분석": 1, "중장비 조작": 1, "추적": 10,
+        "크툴루 신화": 0, "투척": 20, "항법": 10, "회계": 5, "회피": dexterity // 2
+    }
+
+
+SKILL_NAMES = tuple(default_skills(0, 0))
+SKILL_INDEX = {name: index for index, name in enumerate(SKILL_NAMES)}
+
+
+class SkillSheet:
+    """한 유저의 기능치 (SKILL_NAMES 순서의 기본/추가 점수 배열)"""
+    __slots__ = ("basic", "added")
+
+    def __init__(self, basic, added):
+        self.basic = basic
+        self.added = added
+
+    @classmethod
+    def from_rows(cls, rows):
+        """(기능 이름, 기본 점수, 추가 점수) row들로 만듦. 목록에 없는 기능 이름은 무시"""
+        basic = array("h", bytes(2 * len(SKILL_NAMES)))
+        added = array("h", bytes(2 * len(SKILL_NAMES)))
+        for name, basic_point, add_point in rows:
+            index = SKILL_INDEX.get(name)
+            if index is not None:
+                basic[index] = basic_point
+                added[index] = add_point
+        return cls(basic, added)
+
+    def value(self, name):
+        """기능의 현재 값 (기본 + 추가), 없는 기능이면 None"""
+        index = SKILL_INDEX.get(name)
+        return None if index is None else self.basic[index] + self.added[index]
+
+    def spent(self):
+        """지금까지 쓴 기능 점수"""
+        return sum(self.added)
+
+    def allocate(self, allocation):
+        """allocation({이름: 추가 점수})을 더한 새 SkillSheet"""
+        added = array("h", self.added)
+        for name, points in allocation.items():
+            added[SKILL_INDEX[name]] += points
+        return SkillSheet(self.basic, added)
+
+    def items(self):
+        """(이름, 현재 값) 목록"""
+        return [(name, basic + added) for name, basic, added in zip(SKILL_NAMES, self.basic, self.added)]
+
+
+# "관찰력 20, 심리학 +15" / "자동차 운전: 10" 한 항목
+# (이름은 숫자/부호로 끝날 수 없음: "관찰력 -5"나 "20"이 이상한 이름으로 해석되지 않도록)
+_ALLOCATION_ITEM = re.compile(r"^(.*?[^\s\d+\-:=])\s*[:=]?\s*\+?(\d+)$")
+
+
+def parse_allocation(text):
+    """
+    배분 문자열을 {기능 이름: 점수}로. 항목은 쉼표나 줄바꿈으로 구분하고, 같은 기능은 합친다.
+    해석할 수 없는 항목이 있으면 ValueError
+    """
+    allocation = {}
+    for item in re.split(r"[,\n]", text):
+        item = item.strip()
+        if not item:
+            continue
+        match = _ALLOCATION_ITEM.match(item)
+        if not match:
+            raise ValueError(f"`{item}` 을(를) 해석할 수 없습니다. (예: 관찰력 20, 심리학 15)")
+        name, points = match.group(1).strip(), int(match.group(2))
+        allocation[name] = allocation.get(name, 0) + points
+    return allocation
+
+
+def validate_allocation(sheet, budget, allocation):
+    """배분 전체를 한 번에 검사. 문제가 있으면 유저에게 보여줄 메시지, 없으면 None"""
+    if not allocation:
+        return "배분할 기능을 입력해주세요. (예: 관찰력 20, 심리학 15)"
+
+    for name, points in allocation.items():
+        if name not in SKILL_INDEX:
+            return f"`{name}` 은(는) 없는 기능입니다."
+        if name in LOCKED_SKILLS:
+            return f"`{name}` 은(는) 기능 점수로 올릴 수 없습니다."
+        if points <= 0:
+            return f"`{name}`: 1점 이상 배분해야 합니다."
+        if sheet.value(name) + points > MAX_SKILL_VALUE:
+            return f"`{name}`: {sheet.value(name)} + {points} 은(는) 최대치 {MAX_SKILL_VALUE}을 넘습니다."
+
+    remaining = budget - sheet.spent()
+    requested = sum(allocation.values())
+    if requested > remaining:
+        return f"남은 기능 점수는 {remaining}점인데 {requested}점을 배분하려고 합니다."
+    return None
@@ -0,0 +1,245 @@
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from contextlib import closing
+
+import metrics
+import queries
+import tracing
+
+# ---------------------------------------
+# 연결별 prepared statement 캐시
+# ---------------------------------------
+# database.py의 쿼리는 대부분 고정된 SQL 문자열이므로, 연결마다 한 번만 서버에 prepare해 두고
+# 이후에는 statement 핸들로 실행만 한다. (매번 SQL 텍스트를 보내고 파싱/계획하지 않도록)
+#
+#   with connection() as conn, closing(StatementCursor(conn)) as cursor:
+#       cursor.execute(queries.SELECT_USER, (user_id,))
+#       row = cursor.fetchone()
+#
+# StatementCursor는 conn.cursor()와 같은 방식(execute / fetchone / fetchall / rowcount)으로 쓴다.
+# 결과는 execute에서 모두 읽어 두므로, 같은 연결에서 다음 쿼리를 바로 실행해도 된다.
+#
+# 기본은 꺼져 있다. mysql.connector(26.7, 순수 파이썬 커서 기준)는 재사용하는 prepared 커서로 실행할 때마다
+# COM_STMT_RESET을 먼저 보내고 응답을 기다리므로, 재사용해도 실행 한 번에 명령이 두 개
+# (COM_STMT_RESET + COM_STMT_EXECUTE, 첫 실행은 COM_STMT_PREPARE까지 세 개)이고 일반 텍스트 쿼리는 COM_QUERY 하나다.
+# 쿼리 하나당 왕복이 한 번 더 생기므로 DB가 멀리 있으면 오히려 느릴 수 있어서,
+# 실제 DB에서 `python statements.py`로 텍스트 프로토콜과 비교해 이득이 확인될 때만 켠다.
+# 운영 중에도 statement_stats()에 실행 방식별(prepare / reuse / text) 평균 시간이 함께 쌓인다.
+#
+#   PREPARED_STATEMENTS  : 1이면 prepared statement 사용 (기본 0 = 일반 커서)
+#   STATEMENT_CACHE_SIZE : 연결 하나가 들고 있는 statement 수 상한 (넘으면 가장 오래 안 쓴 것부터 닫음)
+
+PREPARED_STATEMENTS = os.getenv("PREPARED_STATEMENTS", "0") not in ("0", "false", "False")
+STATEMENT_CACHE_SIZE = int(os.getenv("STATEMENT_CACHE_SIZE", "64"))
+
+# 쿼리 이름 (통계용). queries.py의 상수는 이름으로, 나머지는 SQL 앞부분으로 표시
+_QUERY_NAMES = {sql: name for name, sql in vars(queries).items() if name.isupper() and isinstance(sql, str)}
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def _statement_name(sql):
+    name = _QUERY_NAMES.get(sql)
+    if name is None:
+        # queries.py의 빌더 함수로 만든 SQL: 앞부분 + 자리표시자 수 (IN 목록 길이별로 구분되도록)
+        name = f"{' '.join(sql.split())[:60]} [{sql.count('%s')}]"
+    return name
+
+
+# 실행 방식: prepare가 일어난 첫 실행 / prepared statement 재사용 / 일반 커서(텍스트 프로토콜)
+MODES = ("prepare", "reuse", "text")
+
+
+def _record(name, elapsed, mode):
+    with _stats_lock:
+        entry = _stats.get(name)
+        if entry is None:
+            entry = _stats[name] = {key: 0 for mode_name in MODES for key in (mode_name, f"{mode_name}_seconds")}
+        entry[mode] += 1
+        entry[f"{mode}_seconds"] += elapsed
+
+
+def statement_stats():
+    """
+    쿼리별 실행 통계. 방식마다 실행 수(prepare / reuse / text)와 평균 시간(prepare_ms / reuse_ms / text_ms).
+    reuse_ms와 text_ms를 비교하면 prepared statement가 실제로 이득인지 알 수 있다.
+    """
+    with _stats_lock:
+        snapshot = {name: dict(entry) for name, entry in _stats.items()}
+    for entry in snapshot.values():
+        for mode in MODES:
+            entry[f"{mode}_ms"] = entry[f"{mode}_seconds"] * 1000 / entry[mode] if entry[mode] else None
+    return snapshot
+
+
+class _ConnectionStatements:
+    """연결 하나의 SQL → prepared 커서 캐시"""
+
+    def __init__(self, conn):
+        self.conn = conn
+        self._cursors = OrderedDict()  # sql -> (처음 넘어온 SQL 문자열, 커서)
+
+    def get(self, sql):
+        """
+        반환: (실행에 쓸 SQL, 커서, 이번에 새로 prepare하는지)
+        mysql.connector의 prepared 커서는 직전에 실행한 SQL과 같은 객체일 때만 prepare를 건너뛰므로
+        처음 받은 문자열 객체를 그대로 다시 넘긴다.
+        """
+        entry = self._cursors.get(sql)
+        if entry is not None:
+            self._cursors.move_to_end(sql)
+            return entry[0], entry[1], False
+
+        cursor = self.conn.cursor(prepared=True)
+        self._cursors[sql] = (sql, cursor)
+        while len(self._cursors) > STATEMENT_CACHE_SIZE:
+            _, (_, oldest) = self._cursors.popitem(last=False)
+            try:
+                oldest.close()  # 서버 쪽 statement도 해제
+            except Exception:
+                pass
+        return sql, cursor, True
+
+    def discard(self, sql):
+        entry = self._cursors.pop(sql, None)
+        if entry is not None:
+            try:
+                entry[1].close()
+            except Exception:
+                pass
+
+
+def _connection_statements(conn):
+    cache = getattr(conn, "_statement_cache", None)
+    if cache is None:
+        cache = conn._statement_cache = _ConnectionStatements(conn)
+    return cache
+
+
+def reset_statements(conn):
+    """재접속/폐기된 연결의 캐시를 버림 (서버 쪽 statement는 세션과 함께 사라진다)"""
+    conn._statement_cache = None
+
+
+class StatementCursor:
+    """
+    conn.cursor() 대신 쓰는 커서. PREPARED_STATEMENTS(또는 prepared=True)면 prepared statement를 연결별로 재사용하고,
+    아니면 일반 커서로 실행한다. 어느 쪽이든 실행 시간은 statement_stats에 방식별로 기록된다.
+    """
+
+    def __init__(self, conn, prepared=None):
+        self._conn = conn
+        self._prepared = PREPARED_STATEMENTS if prepared is None else prepared
+        self._rows = []
+        self._position = 0
+        self.rowcount = -1
+
+    def execute(self, sql, params=()):
+        name = _statement_name(sql)
+        with tracing.span("query", name):
+            self._execute(sql, name, params)
+
+    def _execute(self, sql, name, params):
+        started = time.perf_counter()
+        try:
+            if self._prepared:
+                statements = _connection_statements(self._conn)
+                sql, cursor, prepared = statements.get(sql)
+                mode = "prepare" if prepared else "reuse"
+                try:
+                    self._run(cursor, sql, params)
+                except Exception:
+                    statements.discard(sql)  # 상태를 알 수 없는 커서는 버리고 다음에 다시 prepare
+                    raise
+            else:
+                mode = "text"
+                with closing(self._conn.cursor()) as cursor:
+                    self._run(cursor, sql, params)
+        except Exception:
+            metrics.record_query(name, time.perf_counter() - started, failed=True)
+            raise
+
+        elapsed = time.perf_counter() - started
+        _record(name, elapsed, mode)
+        metrics.record_query(name, elapsed)
+
+    def _run(self, cursor, sql, params):
+        cursor.execute(sql, params)
+        self._rows = cursor.fetchall() if cursor.with_rows else []
+        self._position = 0
+        self.rowcount = cursor.rowcount
+
+    def fetchone(self):
+        if self._position >= len(self._rows):
+            return None
+        row = self._rows[self._position]
+        self._position += 1
+        return row
+
+    def fetchall(self):
+        rows = self._rows[self._position:]
+        self._position = len(self._rows)
+        return rows
+
+    def close(self):
+        # 캐시된 prepared 커서는 연결과 함께 유지하고, 읽어 둔 결과만 버린다
+        self._rows = []
+        self._position = 0
+
+
+# ---------------------------------------
+# CLI: 텍스트 프로토콜과 prepared statement 비교
+# ---------------------------------------
+#   python statements.py                 # 고정 조회 쿼리를 두 방식으로 200번씩 실행해 평균 시간 비교
+#   python statements.py --repeat 1000 --user-id 123456789
+
+# user_id 하나로 실행하는 읽기 전용 쿼리
+_BENCHMARK_QUERIES = ("SELECT_USER", "SELECT_MONEY", "SELECT_USER_SKILLS")
+
+
+def benchmark(conn, repeat=200, user_id="0"):
+    """
+    같은 연결에서 쿼리마다 텍스트 프로토콜 / prepared statement로 repeat번씩 실행.
+    반환: {쿼리 이름: (text 평균 ms, prepared 재사용 평균 ms)}
+    """
+    results = {}
+    for name in _BENCHMARK_QUERIES:
+        sql = getattr(queries, name)
+        params = (user_id,)
+        timings = []
+        for prepared in (False, True):
+            cursor = StatementCursor(conn, prepared=prepared)
+            cursor.execute(sql, params)  # prepare / 연결 준비는 측정에서 뺀다
+            started = time.perf_counter()
+            for _ in range(repeat):
+                cursor.execute(sql, params)
+            timings.append((time.perf_counter() - started) * 1000 / repeat)
+            conn.commit()
+        results[name] = tuple(timings)
+        _connection_statements(conn).discard(sql)  # 측정에 쓴 statement는 서버에서도 해제
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="텍스트 프로토콜과 prepared statement 실행 시간 비교")
+    parser.add_argument("--repeat", type=int, default=200, help="쿼리마다 실행할 횟수")
+    parser.add_argument("--user-id", default="0", help="조회에 쓸 user_id (없는 유저여도 됨)")
+    args = parser.parse_args(argv)
+
+    from db_pool import connection  # CLI에서만 DB 접속
+    with connection() as conn:
+        results = benchmark(conn, args.repeat, args.user_id)
+
+    print(f"{'쿼리':<20} {'text(ms)':>10} {'prepared(ms)':>13} {'차이':>8}")
+    for name, (text_ms, prepared_ms) in results.items():
+        print(f"{name:<20} {text_ms:>10.3f} {prepared_ms:>13.3f} {(prepared_ms - text_ms) / text_ms * 100:>+7.1f}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+from bisect import bisect_left
+
+# ---------------------------------------
+# CoC 보조 스탯 계산 규칙
+# ---------------------------------------
+# DB나 디스코드에 의존하지 않는 순수 계산 모듈.
+# database.py의 모든 스탯 변경 함수가 여기서 계산한 값을 같은 UPDATE로 함께 저장한다.
+
+# users 테이블의 기본 특성치 컬럼
+BASE_STATS = ("strength", "constitution", "size", "intelligence", "willpower", "dexterity", "appearance", "education")
+
+# 기본 특성치로부터 계산되는 보조 스탯 컬럼
+DERIVED_STATS = ("hp", "mp", "sanity", "movement", "damage_bonus", "build", "status", "skill_point")
+
+# STR+SIZ 합계 구간별 피해 보너스/체구 (구간 상한, 피해 보너스, 체구)
+DAMAGE_BONUS_TABLE = (
+    (64, "-2d6", -2),
+    (84, "-1d6", -1),
+    (124, "0", 0),
+    (164, "+1d4", 1),
+    (204, "+1d6", 2),
+)
+DAMAGE_BONUS_MAX = ("+2d6", 3)
+
+_DAMAGE_BONUS_LIMITS = [limit for limit, _, _ in DAMAGE_BONUS_TABLE]
+
+
+def damage_bonus_and_build(strength, size):
+    """STR+SIZ 합계로 (피해 보너스, 체구)를 구함"""
+    index = bisect_left(_DAMAGE_BONUS_LIMITS, strength + size)
+    if index == len(DAMAGE_BONUS_TABLE):
+        return DAMAGE_BONUS_MAX
+    _, damage_bonus, build = DAMAGE_BONUS_TABLE[index]
+    return damage_bonus, build
+
+
+def movement_rate(strength, dexterity, size):
+    """STR, DEX와 SIZ를 비교해 이동력(MOV)을 구함"""
+    if strength < size and dexterity < size:
+        return 7
+    if strength > size or dexterity > size:
+        return 9
+    return 8
+
+
+def calculate_derived_stats(strength, constitution, size, dexterity, willpower, intelligence, education):
+    """
+    기본 특성치로부터 보조 스탯(HP, MP, SAN, MOV, DB, BUILD, 상태, 기능 점수)을 계산.
+    반환: DERIVED_STATS 컬럼 이름을 키로 하는 dict
+    """
+    hp = (constitution + size) // 10
+    mp = willpower // 5
+    san = min(willpower, 99)
+
+    mov = movement_rate(strength, dexterity, size)
+    damage_bonus, build = damage_bonus_and_build(strength, size)
+
+    # 상태(status) 계산
+    # HP<1 => 빈사, SAN<=0 => 영구적 광기, 아니면 정상
+    # (여기서는 새로 계산된 hp, san을 기준으로 판단)
+    if hp < 1:
+        status = "D"
+    elif san <= 0:
+        status = "M"
+    else:
+        status = "N"
+
+    job_skill_point = education * 4  # 직업 기능 점수 = EDU * 4
+    interest_skill_point = intelligence * 2  # 관심 기능 점수 = INT * 2
+    skill_point = job_skill_point + interest_skill_point
+
+    return {
+        "hp": hp,
+        "mp": mp,
+        "sanity": san,
+        "movement": mov,
+        "damage_bonus": damage_bonus,
+        "build": build,
+        "status": status,
+        "skill_point": skill_point,
+    }
+
+
+def derive_from(base):
+    """기본 특성치 dict(BASE_STATS 키)로 보조 스탯 계산 (비어 있는 값은 0으로 취급)"""
+    values = {name: base.get(name) or 0 for name in BASE_STATS}
+    return calculate_derived_stats(
+        values["strength"], values["constitution"], values["size"], values["dexterity"],
+        values["willpower"], values["intelligence"], values["education"]
+    )
+
+
+def apply_stat_changes(base, assign=None, bonus=None):
+    """
+    기본 특성치 dict에 변경 사항을 적용한 새 dict를 반환.
+    assign: 그대로 덮어쓸 값, bonus: 기존 값에 더할 값 (기존 값이 없으면 0에서 시작)
+    """
+    result = dict(base)
+    if assign:
+        result.update(assign)
+    if bonus:
+        for name, amount in bonus.items():
+            result[name] = (result.get(name) or 0) + amount
+    return result
@@ -0,0 +1,81 @@
+import hashlib
+import json
+import os
+import time
+
+import discord
+
+# ---------------------------------------
+# 슬래시 명령어 동기화 관리
+# ---------------------------------------
+# 명령어 트리를 직렬화한 해시를 파일에 저장해 두고, 해시가 바뀌었을 때만 디스코드에 업로드한다.
+# (전역 sync는 rate limit이 빡빡하고 시작 시간을 늘리므로 재접속마다 부르지 않는다)
+#
+#   COMMAND_SYNC_FILE : 해시 저장 파일 (기본 .command_sync.json)
+#   DEV_GUILD_ID      : 지정하면 전역 대신 이 서버에만 동기화 (개발용, 즉시 반영됨)
+
+COMMAND_SYNC_FILE = os.getenv("COMMAND_SYNC_FILE", ".command_sync.json")
+DEV_GUILD_ID = os.getenv("DEV_GUILD_ID")
+
+
+def dev_guild():
+    """개발용 서버 (DEV_GUILD_ID가 없으면 None → 전역 동기화)"""
+    return discord.Object(id=int(DEV_GUILD_ID)) if DEV_GUILD_ID else None
+
+
+def _command_payload(command, tree):
+    try:
+        return command.to_dict(tree)
+    except TypeError:  # 예전 discord.py는 인자를 받지 않음
+        return command.to_dict()
+
+
+def tree_hash(tree, guild=None):
+    """디스코드에 올라갈 명령어 정의 전체의 SHA-256"""
+    payload = sorted(
+        (_command_payload(command, tree) for command in tree.get_commands(guild=guild)),
+        key=lambda command: (command.get("type", 1), command["name"])
+    )
+    serialized = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(serialized.encode("utf-8")).hexdigest()
+
+
+def _scope_key(guild):
+    return f"guild:{guild.id}" if guild else "global"
+
+
+def _load_state():
+    try:
+        with open(COMMAND_SYNC_FILE, encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _save_state(state):
+    with open(COMMAND_SYNC_FILE, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+
+
+async def sync_commands(tree, guild=None, force=False):
+    """
+    명령어 정의가 마지막 동기화 이후 바뀌었을 때만 sync.
+    guild를 주면 전역 명령어를 그 서버로 복사해서 서버 단위로 동기화한다.
+    반환: (실제로 sync 했는지, 걸린 시간(초))
+    """
+    started = time.perf_counter()
+
+    if guild is not None:
+        tree.copy_global_to(guild=guild)
+
+    scope = _scope_key(guild)
+    current = tree_hash(tree, guild=guild)
+    state = _load_state()
+
+    if not force and state.get(scope) == current:
+        return False, time.perf_counter() - started
+
+    await tree.sync(guild=guild)
+    state[scope] = current
+    _save_state(state)
+    return True, time.perf_counter() - started
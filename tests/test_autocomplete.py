@@ -0,0 +1,36 @@
+from autocomplete import PrefixIndex, choseong_key
+
+NAMES = ["용기", "용감함", "야망", "지혜", "근면", "Loyal"]
+
+
+def test_choseong_key():
+    assert choseong_key("용 기") == "ㅇㄱ"
+
+
+def test_search_by_syllables_and_choseong():
+    index = PrefixIndex(NAMES)
+    assert index.search("용") == ["용기", "용감함"]
+    # 초성 "ㅇㄱ"은 "용기"와 "용감함"(ㅇㄱㅎ) 모두의 접두어
+    assert index.search("ㅇㄱ") == ["용기", "용감함"]
+    assert index.search("용ㄱ") == ["용기", "용감함"]
+    assert index.search("용기") == ["용기"]
+    # 초성 키 순서 (ㅇㄱ < ㅇㄱㅎ < ㅇㅁ)
+    assert index.search("ㅇ") == ["용기", "용감함", "야망"]
+
+
+def test_search_mismatched_syllable_with_same_choseong():
+    # "야"는 "용"과 초성이 같지만 완성된 음절이므로 일치하지 않음
+    assert PrefixIndex(NAMES).search("야기") == []
+
+
+def test_search_ignores_case_and_spaces():
+    index = PrefixIndex(NAMES)
+    assert index.search("loy") == ["Loyal"]
+    assert index.search(" ㅈ ㅎ ") == ["지혜"]
+
+
+def test_empty_query_and_limit():
+    index = PrefixIndex(NAMES)
+    assert index.search("") == NAMES
+    assert index.search("", limit=2) == NAMES[:2]
+    assert len(index.search("ㅇ", limit=1)) == 1
@@ -0,0 +1,34 @@
+from collections import Counter
+from itertools import combinations
+
+import balance
+from records import Personality
+
+PERSONALITIES = [
+    Personality("용기", 5, 0, 0, 5, 0),
+    Personality("지혜", 0, 0, 10, 0, 0),
+    Personality("근면", 0, 5, 0, 0, 5),
+    Personality("야망", 5, 0, 5, 0, 0),
+    Personality("신중", 0, 0, 5, 5, 0),
+]
+
+
+def _brute_force(max_count, exact):
+    sizes = [max_count] if exact else range(1, max_count + 1)
+    counts = Counter()
+    for size in sizes:
+        for combo in combinations(PERSONALITIES, size):
+            counts[tuple(sum(getattr(p, name) for p in combo) for name in balance.PERSONALITY_STATS)] += 1
+    return counts
+
+
+def test_personality_sums_matches_brute_force():
+    for max_count, exact in ((1, False), (3, False), (3, True), (4, False)):
+        sums = balance.personality_sums(PERSONALITIES, max_count, exact)
+        assert {key: count for key, (count, _) in sums.items()} == _brute_force(max_count, exact)
+
+
+def test_personality_sums_example_adds_up():
+    by_name = {p.name: p for p in PERSONALITIES}
+    for key, (_, example) in balance.personality_sums(PERSONALITIES, 3).items():
+        assert tuple(sum(getattr(by_name[name], stat) for name in example) for stat in balance.PERSONALITY_STATS) == key
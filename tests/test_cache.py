@@ -0,0 +1,50 @@
+import cache
+from cache import LRUCache
+
+
+def test_token_taken_before_invalidate_does_not_populate():
+    lru = LRUCache(maxsize=4, ttl=0)
+    token = lru.token()          # DB 조회 시작
+    lru.invalidate("a")          # 그 사이 다른 스레드가 갱신
+    assert lru.put("a", "stale", token) is False
+    assert lru.get("a") is None
+
+    token = lru.token()
+    assert lru.put("a", "fresh", token) is True
+    assert lru.get("a") == "fresh"
+
+
+def test_clear_also_invalidates_tokens():
+    lru = LRUCache(maxsize=4, ttl=0)
+    token = lru.token()
+    lru.clear()
+    assert lru.put("a", 1, token) is False
+
+
+def test_ttl_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "monotonic", lambda: now[0])
+    lru = LRUCache(maxsize=4, ttl=10)
+    lru.put("a", 1)
+
+    now[0] += 10
+    assert lru.get("a") == 1
+    now[0] += 0.5
+    assert lru.get("a") is None
+    assert len(lru) == 0
+    assert lru.stats()["expirations"] == 1
+
+
+def test_lru_eviction_order():
+    lru = LRUCache(maxsize=2, ttl=0)
+    lru.put("a", 1)
+    lru.put("b", 2)
+    assert lru.get("a") == 1     # a를 최근에 씀 → b가 가장 오래됨
+    lru.put("c", 3)
+
+    assert lru.get("b") is None
+    assert lru.get("a") == 1
+    assert lru.get("c") == 3
+    stats = lru.stats()
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
@@ -0,0 +1,116 @@
+import random
+
+import pytest
+
+import dice
+
+
+@pytest.mark.parametrize("damage_bonus, plus, minus", [
+    ("+1d4", "1d3+1d4", "1d3-1d4"),
+    ("0", "1d3", "1d3"),
+    ("-2d6", "1d3-2d6", "1d3+2d6"),
+    ("+2d6", "1d3+2d6", "1d3-2d6"),
+    ("-1", "1d3-1", "1d3+1"),
+])
+def test_substitute_damage_bonus(damage_bonus, plus, minus):
+    assert dice.substitute_damage_bonus("1d3+db", damage_bonus) == plus
+    assert dice.substitute_damage_bonus("1d3-db", damage_bonus) == minus
+    # 바꾼 식은 그대로 굴릴 수 있어야 함
+    dice.compile_expression(plus)
+    dice.compile_expression(minus)
+
+
+def test_substitute_damage_bonus_spacing_and_alias():
+    assert dice.substitute_damage_bonus("1d3 + DB", "+1d4") == "1d3+1d4"
+    assert dice.substitute_damage_bonus("1d6+피해보너스", "-1d4") == "1d6-1d4"
+    assert dice.substitute_damage_bonus("db", "0") == "0"
+    assert dice.substitute_damage_bonus("db", "-1d4") == "-1d4"
+
+
+@pytest.mark.parametrize("text, groups, constant, multiplier", [
+    ("3d6", ((3, 6, 1),), 0, 1),
+    ("d100", ((1, 100, 1),), 0, 1),
+    ("2d6+6", ((2, 6, 1),), 6, 1),
+    ("3d6×5", ((3, 6, 1),), 0, 5),
+    ("(2d6+6)x5", ((2, 6, 1),), 6, 5),
+    ("1d3 - 1d4 + 2", ((1, 3, 1), (1, 4, -1)), 2, 1),
+    ("-2d6", ((2, 6, -1),), 0, 1),
+])
+def test_compile_expression(text, groups, constant, multiplier):
+    expression = dice.compile_expression(text)
+    assert [tuple(group) for group in expression.groups] == list(groups)
+    assert expression.constant == constant
+    assert expression.multiplier == multiplier
+
+
+@pytest.mark.parametrize("text", ["", "abc", "2d6d4", "1d1", "101d6", "1d6++1"])
+def test_compile_expression_rejects(text):
+    with pytest.raises(dice.DiceError):
+        dice.compile_expression(text)
+
+
+def test_roll_totals_match_faces():
+    rng = random.Random(1)
+    results = dice.roll("3d6-1d4+2", times=50, rng=rng)
+    assert len(results) == 50
+    for result in results:
+        plus, minus = result.rolls
+        assert len(plus) == 3 and all(1 <= face <= 6 for face in plus)
+        assert len(minus) == 1 and 1 <= minus[0] <= 4
+        assert result.total == sum(plus) - sum(minus) + 2
+
+
+def test_roll_multiplier():
+    result = dice.roll("3d6×5", rng=random.Random(2))[0]
+    assert result.total == sum(result.rolls[0]) * 5
+
+
+def test_roll_rejects_too_many_times():
+    with pytest.raises(dice.DiceError):
+        dice.roll("1d6", times=dice.MAX_BATCH + 1)
+
+
+@pytest.mark.parametrize("result, target, level", [
+    (1, 10, dice.CRITICAL),
+    (10, 50, dice.EXTREME),
+    (11, 50, dice.HARD),
+    (25, 50, dice.HARD),
+    (26, 50, dice.REGULAR),
+    (50, 50, dice.REGULAR),
+    (51, 50, dice.FAILURE),
+    (95, 40, dice.FAILURE),
+    (96, 40, dice.FUMBLE),
+    (99, 60, dice.FAILURE),
+    (100, 99, dice.FUMBLE),
+])
+def test_success_level(result, target, level):
+    assert dice.success_level(result, target) == level
+
+
+class FixedDice:
+    """roll_percentile용 고정 주사위: 일의 자리 units, 십의 자리는 tens 순서대로"""
+
+    def __init__(self, units, tens):
+        self.units = units
+        self.tens = tens
+
+    def randrange(self, stop):
+        return self.units
+
+    def choices(self, population, k):
+        return list(self.tens[:k])
+
+
+def test_skill_check_bonus_takes_lowest_and_penalty_highest():
+    rng = FixedDice(5, [70, 20, 40])
+    assert dice.skill_check(50, bonus=1, rng=rng).roll == 25
+    assert dice.skill_check(50, penalty=2, rng=rng).roll == 75
+    # 보너스와 패널티는 상쇄되어 십의 자리를 하나만 굴림
+    assert dice.skill_check(50, bonus=1, penalty=1, rng=rng).tens == (70,)
+
+
+def test_skill_check_double_zero_is_hundred():
+    result = dice.skill_check(99, rng=FixedDice(0, [0]))
+    assert result.roll == 100
+    assert result.level == dice.FUMBLE
+    assert not result.success
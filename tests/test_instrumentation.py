@@ -0,0 +1,8 @@
+import db_pool
+import instrumentation
+
+
+def test_pool_metrics_do_not_create_the_pool(monkeypatch):
+    monkeypatch.setattr(db_pool, "_pool", None)
+    assert instrumentation._pool_families() == []
+    assert db_pool._pool is None
@@ -0,0 +1,130 @@
+from contextlib import contextmanager
+
+import mysql.connector
+import pytest
+
+import ledger
+from ledger import LedgerWriter
+
+
+class FakeCursor:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def execute(self, sql, params):
+        if self.conn.down:
+            raise mysql.connector.OperationalError("Lost connection to MySQL server")
+        rows = [params[i:i + 6] for i in range(0, len(params), 6)]
+        if any(row[0] in self.conn.bad_users for row in rows):
+            raise mysql.connector.DataError("Data too long for column 'user_id'")
+        self.conn.executed.append(rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.down = False
+        self.bad_users = set()
+        self.executed = []   # 실행한 INSERT마다 row 목록
+        self.commits = 0
+        self.rollbacks = 0
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+
+@pytest.fixture
+def conn(monkeypatch):
+    fake = FakeConnection()
+
+    @contextmanager
+    def connection():
+        yield fake
+
+    monkeypatch.setattr(ledger, "connection", connection)
+    return fake
+
+
+@pytest.fixture
+def writer(monkeypatch):
+    writer = LedgerWriter(batch_size=100, flush_interval=60, max_pending=50)
+    monkeypatch.setattr(writer, "_ensure_started", lambda: None)  # 쓰기 스레드 없이 flush를 직접 부름
+    return writer
+
+
+def _written_users(conn):
+    return [row[0] for rows in conn.executed for row in rows]
+
+
+def test_flush_writes_buffer_in_one_transaction(conn, writer):
+    for i in range(5):
+        writer.record(f"u{i}", 10, 100 + i, actor_id="gm", reason="보상")
+
+    assert writer.flush() == 5
+    assert [len(rows) for rows in conn.executed] == [4, 1]   # row_chunks: 5 → 4 + 1
+    assert _written_users(conn) == ["u0", "u1", "u2", "u3", "u4"]
+    assert conn.commits == 1
+    assert writer.flush() == 0   # 버퍼가 비었으면 아무것도 안 함
+
+    stats = writer.stats()
+    assert stats["written"] == 5
+    assert stats["flushes"] == 1
+    assert stats["pending"] == 0
+
+
+def test_record_wakes_writer_when_batch_is_full(writer):
+    writer.batch_size = 3
+    writer.record("u0", 1, 1)
+    writer.record("u1", 1, 1)
+    assert not writer._wakeup.is_set()
+    writer.record("u2", 1, 1)
+    assert writer._wakeup.is_set()
+
+
+def test_record_truncates_reason(writer):
+    writer.record("u0", 1, 1, reason="가" * 300)
+    assert len(writer._buffer[0].reason) == ledger.MAX_REASON_LENGTH
+
+
+def test_data_error_falls_back_to_one_row_at_a_time(conn, writer):
+    conn.bad_users = {"bad"}
+    for user_id in ("u0", "bad", "u1"):
+        writer.record(user_id, 10, 100)
+
+    assert writer.flush() == 2
+    assert _written_users(conn) == ["u0", "u1"]
+    assert conn.rollbacks == 2       # 묶음 한 번 + 잘못된 기록 한 번
+    stats = writer.stats()
+    assert stats["rejected"] == 1
+    assert stats["pending"] == 0     # 잘못된 기록이 다음 flush를 막지 않음
+
+
+def test_connection_error_keeps_entries_for_next_flush(conn, writer):
+    conn.down = True
+    writer.record("u0", 10, 100)
+    writer.record("u1", 10, 110)
+    assert writer.flush() == 0
+    assert writer.stats()["failures"] == 1
+
+    writer.record("u2", 10, 120)
+    conn.down = False
+    assert writer.flush() == 3
+    assert _written_users(conn) == ["u0", "u1", "u2"]   # 순서 유지
+
+
+def test_buffer_is_capped_at_max_pending(writer):
+    for i in range(60):
+        writer.record(f"u{i}", 1, i)
+
+    stats = writer.stats()
+    assert stats["pending"] == 50
+    assert stats["dropped"] == 10
+    assert writer._buffer[0].user_id == "u10"   # 가장 오래된 기록부터 버림
@@ -0,0 +1,73 @@
+import pytest
+
+import metrics
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    """전역 메트릭 대신 테스트용 목록에 등록"""
+    monkeypatch.setattr(metrics, "_metrics", [])
+    monkeypatch.setattr(metrics, "_collectors", [])
+
+
+def _samples(text):
+    return dict(line.rsplit(" ", 1) for line in text.splitlines() if not line.startswith("#"))
+
+
+def test_histogram_buckets_are_cumulative(registry):
+    histogram = metrics.histogram("test_seconds", "테스트", ("name",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 0.5, 3.0):
+        histogram.observe(value, "a")
+
+    samples = _samples(metrics.render())
+    assert samples['test_seconds_bucket{name="a",le="0.1"}'] == "1"
+    assert samples['test_seconds_bucket{name="a",le="1.0"}'] == "3"
+    assert samples['test_seconds_bucket{name="a",le="+Inf"}'] == "4"
+    assert samples['test_seconds_count{name="a"}'] == "4"
+    assert float(samples['test_seconds_sum{name="a"}']) == pytest.approx(4.05)
+
+
+def test_render_help_type_and_counter(registry):
+    counter = metrics.counter("test_total", "테스트 카운터", ("kind",))
+    counter.inc("command")
+    counter.inc("command", amount=2)
+
+    lines = metrics.render().splitlines()
+    assert lines == ["# HELP test_total 테스트 카운터", "# TYPE test_total counter", 'test_total{kind="command"} 3']
+
+
+def test_label_values_are_escaped(registry):
+    counter = metrics.counter("test_total", "테스트", ("name",))
+    counter.inc('a"b\\c\nd')
+    assert 'test_total{name="a\\"b\\\\c\\nd"} 1' in metrics.render()
+
+
+def test_collectors_are_rendered_and_failures_skipped(registry):
+    def broken():
+        raise RuntimeError("boom")
+
+    def cache_families():
+        return [("test_cache_size", "gauge", "캐시 크기",
+                 {(("cache", "profile"),): 3, (("cache", "skills"),): None})]
+
+    metrics.register_collector(broken)
+    metrics.register_collector(cache_families)
+
+    text = metrics.render()
+    assert "# TYPE test_cache_size gauge" in text
+    assert 'test_cache_size{cache="profile"} 3' in text
+    assert "skills" not in text   # 값이 None이면 내보내지 않음
+
+
+def test_track_interaction_collects_queries_and_errors(registry):
+    with metrics.track_interaction("command", "굴림") as stats:
+        metrics.record_query("SELECT_USER", 0.01)
+        metrics.record_query("SELECT_MONEY", 0.02)
+    assert stats.queries == 2
+    assert stats.db_seconds == pytest.approx(0.03)
+    assert metrics.current_interaction() is None
+
+    with pytest.raises(ValueError):
+        with metrics.track_interaction("command", "판정") as failed:
+            raise ValueError
+    assert failed.failed
@@ -0,0 +1,12 @@
+from migrations.__main__ import explain_targets
+
+
+def test_explain_targets_build_without_a_database():
+    targets = explain_targets()
+
+    assert targets["update_user_columns"] == "UPDATE users SET hp = %s, mp = %s WHERE user_id = %s"
+    for name in ("select_money_for_update", "add_money_bulk", "remove_money_bulk"):
+        assert targets[name].count("%s") >= 3
+    assert "SELECT_USER" in targets
+    for name, sql in targets.items():
+        assert sql.lstrip().split(None, 1)[0].upper() in ("SELECT", "UPDATE", "DELETE"), name
@@ -0,0 +1,50 @@
+import pytest
+
+import queries
+from queries import BATCH_ARITIES, MAX_BATCH_ARITY, in_chunks, row_chunks
+
+
+@pytest.mark.parametrize("count, arity", [(1, 1), (2, 2), (3, 4), (5, 8), (17, 32), (100, 128), (128, 128)])
+def test_in_chunks_pads_with_last_value_to_next_arity(count, arity):
+    values = [f"u{i}" for i in range(count)]
+    (chunk,) = in_chunks(values)
+    assert len(chunk) == arity
+    assert chunk[:count] == tuple(values)
+    assert set(chunk[count:]) <= {values[-1]}
+
+
+def test_in_chunks_splits_past_max_arity():
+    values = list(range(MAX_BATCH_ARITY * 2 + 3))
+    chunks = list(in_chunks(values))
+    assert [len(chunk) for chunk in chunks] == [MAX_BATCH_ARITY, MAX_BATCH_ARITY, 4]
+    assert chunks[-1] == (256, 257, 258, 258)
+    # 채운 값을 빼면 원래 목록 그대로
+    assert [value for chunk in chunks for value in dict.fromkeys(chunk)] == values
+
+
+def test_in_chunks_empty():
+    assert list(in_chunks([])) == []
+
+
+@pytest.mark.parametrize("count, sizes", [
+    (1, [1]),
+    (3, [2, 1]),
+    (37, [32, 4, 1]),
+    (128, [128]),
+    (300, [128, 128, 32, 8, 4]),
+])
+def test_row_chunks_uses_exact_row_counts(count, sizes):
+    rows = list(range(count))
+    chunks = list(row_chunks(rows))
+    assert [len(chunk) for chunk in chunks] == sizes
+    assert all(len(chunk) in BATCH_ARITIES for chunk in chunks)
+    assert [row for chunk in chunks for row in chunk] == rows   # 순서 유지, 중복/누락 없음
+
+
+def test_row_chunks_empty():
+    assert list(row_chunks([])) == []
+
+
+def test_builders_are_cached_per_arity():
+    assert queries.select_money_for_update(4) is queries.select_money_for_update(4)
+    assert queries.insert_ledger(2).count("%s") == 12
@@ -0,0 +1,55 @@
+from ranking import Leaderboard, RankingBoard
+
+
+def test_leaderboard_ties_share_rank():
+    board = Leaderboard()
+    for user_id, value in (("a", 10), ("b", 30), ("c", 10), ("d", 5)):
+        board.set(user_id, value)
+    assert board.rank("b") == 1
+    assert board.rank("a") == board.rank("c") == 2
+    assert board.rank("d") == 4
+    assert board.rank("nobody") is None
+    assert board.top(3) == [(1, "b", 30), (2, "a", 10), (2, "c", 10)]
+
+
+def test_leaderboard_update_and_remove():
+    board = Leaderboard()
+    board.set("a", 10)
+    board.set("b", 20)
+    board.set("a", 30)
+    assert board.rank("a") == 1
+    board.remove("a")
+    assert board.rank("b") == 1
+    assert len(board) == 1
+
+
+def _board():
+    ranking = RankingBoard()
+    ranking.seed([
+        ("1", "해리", "그리핀도르", 100, 50, 60),
+        ("2", "드레이코", "슬리데린", 300, 40, 55),
+        ("3", "헤르미온느", "그리핀도르", 200, 70, 65),
+    ])
+    return ranking
+
+
+def test_ranking_overall_and_by_house():
+    ranking = _board()
+    assert ranking.rank("money", "1") == (3, 3, 100)
+    assert ranking.rank("money", "1", house="그리핀도르") == (2, 2, 100)
+    assert [name for _, _, name, _ in ranking.top("luck")] == ["헤르미온느", "해리", "드레이코"]
+
+
+def test_ranking_update_moves_house_and_ignores_other_keys():
+    ranking = _board()
+    ranking.update("1", {"house": "슬리데린", "money": 400, "hp": 12})
+    assert ranking.rank("money", "1") == (1, 3, 400)
+    assert ranking.rank("money", "1", house="슬리데린") == (1, 2, 400)
+    assert ranking.rank("money", "1", house="그리핀도르") == (None, 1, 400)
+
+
+def test_ranking_remove():
+    ranking = _board()
+    ranking.remove("2")
+    assert ranking.rank("money", "2") == (None, 2, None)
+    assert ranking.top("money", house="슬리데린") == []
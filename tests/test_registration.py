@@ -0,0 +1,152 @@
+import asyncio
+import threading
+
+import pytest
+
+import database
+import metrics
+import tracing
+from database import WriteResult
+from registration import RegistrationQueue
+
+
+class FakeRegisterUsers:
+    """database.register_users 대신 호출을 기록. DB 스레드 풀에서 불린다"""
+
+    def __init__(self, existing=(), fail=False):
+        self.batches = []
+        self.existing = set(existing)
+        self.fail = fail
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, requests):
+        self.release.wait(5)
+        self.batches.append([user_id for user_id, _ in requests])
+        if self.fail:
+            raise RuntimeError("DB down")
+        return [WriteResult.ALREADY_REGISTERED if user_id in self.existing else WriteResult.REGISTERED
+                for user_id, _ in requests]
+
+
+@pytest.fixture
+def register_users(monkeypatch):
+    fake = FakeRegisterUsers()
+    monkeypatch.setattr(database, "register_users", fake)
+    return fake
+
+
+def _submit_all(queue, user_ids):
+    return [asyncio.create_task(queue.submit(user_id, f"name-{user_id}")) for user_id in user_ids]
+
+
+def test_batch_size_cuts_a_batch(register_users):
+    async def scenario():
+        queue = RegistrationQueue(batch_size=3, flush_interval=0.05, max_pending=100)
+        results = await asyncio.gather(*_submit_all(queue, ["1", "2", "3", "4", "5"]))
+        await queue.close()
+        return queue, results
+
+    queue, results = asyncio.run(scenario())
+    assert register_users.batches == [["1", "2", "3"], ["4", "5"]]
+    assert results == [WriteResult.REGISTERED] * 5
+    assert queue.stats()["batches"] == 2
+    assert queue.stats()["largest_batch"] == 3
+
+
+def test_flush_interval_cuts_a_batch(register_users):
+    async def scenario():
+        queue = RegistrationQueue(batch_size=50, flush_interval=0.05, max_pending=100)
+        first = _submit_all(queue, ["1", "2"])
+        await asyncio.sleep(0.2)   # 첫 묶음은 flush_interval이 지나 이미 저장됨
+        second = _submit_all(queue, ["3"])
+        await asyncio.gather(*first, *second)
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert register_users.batches == [["1", "2"], ["3"]]
+
+
+def test_each_request_gets_its_own_result(register_users):
+    register_users.existing = {"2"}
+
+    async def scenario():
+        queue = RegistrationQueue(batch_size=10, flush_interval=0.01, max_pending=100)
+        results = await asyncio.gather(*_submit_all(queue, ["1", "2", "3"]))
+        await queue.close()
+        return results
+
+    assert asyncio.run(scenario()) == [
+        WriteResult.REGISTERED, WriteResult.ALREADY_REGISTERED, WriteResult.REGISTERED]
+
+
+def test_failed_batch_reports_error_to_every_request(register_users):
+    register_users.fail = True
+
+    async def scenario():
+        queue = RegistrationQueue(batch_size=10, flush_interval=0.01, max_pending=100)
+        results = await asyncio.gather(*_submit_all(queue, ["1", "2"]))
+        await queue.close()
+        return results
+
+    assert asyncio.run(scenario()) == [WriteResult.ERROR, WriteResult.ERROR]
+
+
+def test_submit_waits_when_queue_is_full(register_users):
+    register_users.release.clear()   # 첫 묶음 저장을 멈춰 둠
+
+    async def scenario():
+        queue = RegistrationQueue(batch_size=1, flush_interval=0.01, max_pending=1)
+        tasks = _submit_all(queue, ["1"])
+        await asyncio.sleep(0.05)        # "1"은 작업 태스크가 꺼내서 저장 중
+        tasks += _submit_all(queue, ["2", "3"])
+        await asyncio.sleep(0.05)        # "2"는 큐에, "3"은 자리가 날 때까지 대기
+
+        stats = queue.stats()
+        assert stats["submitted"] == 2
+        assert stats["pending"] == 1
+        assert not any(task.done() for task in tasks)
+
+        register_users.release.set()
+        results = await asyncio.gather(*tasks)
+        await queue.close()
+        return results
+
+    assert asyncio.run(scenario()) == [WriteResult.REGISTERED] * 3
+    assert register_users.batches == [["1"], ["2"], ["3"]]
+
+
+def test_close_writes_the_batch_being_collected(register_users):
+    async def scenario():
+        queue = RegistrationQueue(batch_size=10, flush_interval=60, max_pending=100)
+        tasks = _submit_all(queue, ["1", "2"])
+        await asyncio.sleep(0.05)        # 작업 태스크가 두 요청을 모은 채 더 기다리는 중
+        assert register_users.batches == []
+
+        await queue.close()
+        return await asyncio.gather(*tasks)
+
+    assert asyncio.run(scenario()) == [WriteResult.REGISTERED] * 2
+    assert register_users.batches == [["1", "2"]]
+
+
+def test_worker_does_not_inherit_the_first_interaction_context(register_users, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+    seen = []
+
+    def register(requests):
+        seen.append((tracing.current_span(), metrics.current_interaction()))
+        return register_users(requests)
+
+    monkeypatch.setattr(database, "register_users", register)
+
+    async def scenario():
+        queue = RegistrationQueue(batch_size=10, flush_interval=0.01, max_pending=100)
+        # 작업 태스크는 첫 등록 상호작용 안에서 만들어진다
+        with metrics.track_interaction("command", "프로필 등록"), tracing.trace("command", "프로필 등록"):
+            await queue.submit("1", "해리")
+        await queue.submit("2", "론")
+        await queue.close()
+
+    asyncio.run(scenario())
+    assert seen == [(None, None), (None, None)]
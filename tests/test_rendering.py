@@ -0,0 +1,58 @@
+import pytest
+
+import rendering
+from records import UserProfile
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    rendering.profile_render_cache.clear()
+    yield
+    rendering.profile_render_cache.clear()
+
+
+def _profile(**changes):
+    profile = UserProfile(
+        user_id="1", name="해리", house="그리핀도르", personality="용감함",
+        strength=50, constitution=60, size=55, intelligence=70, willpower=65,
+        dexterity=60, appearance=50, education=70, money=1000, luck=45,
+        movement=8, damage_bonus="0", build=0, hp=11, mp=13, sanity=65,
+        status="N", skill_point=420,
+    )
+    return profile._replace(**changes)
+
+
+@pytest.mark.parametrize("knuts, expected", [
+    (0, "0 갈레온 0 시클 0 크넛"),
+    (28, "0 갈레온 0 시클 28 크넛"),
+    (29, "0 갈레온 1 시클 0 크넛"),
+    (493, "1 갈레온 0 시클 0 크넛"),
+    (1000, "2 갈레온 0 시클 14 크넛"),
+])
+def test_format_currency(knuts, expected):
+    assert rendering.format_currency(knuts) == expected
+
+
+def test_profile_embed_reuses_payload_for_equal_record():
+    first = rendering.profile_embed(_profile())
+    # DB에서 다시 읽은 같은 값의 (다른 객체) 레코드
+    second = rendering.profile_embed(_profile())
+    assert second is first
+
+
+def test_profile_embed_rerenders_changed_record():
+    before = rendering.profile_embed(_profile())
+    after = rendering.profile_embed(_profile(money=1493))
+
+    assert after is not before
+    money_field = after["fields"][3]["value"]
+    assert "3 갈레온 0 시클 14 크넛" in money_field
+    # 캐시는 새 레코드로 바뀌어 있어야 함
+    assert rendering.profile_embed(_profile(money=1493)) is after
+
+
+def test_profile_embed_is_cached_per_user():
+    harry = rendering.profile_embed(_profile())
+    draco = rendering.profile_embed(_profile(user_id="2", name="드레이코"))
+    assert draco is not harry
+    assert rendering.profile_embed(_profile()) is harry
@@ -0,0 +1,51 @@
+import pytest
+
+from skills import LOCKED_SKILLS, MAX_SKILL_VALUE, SkillSheet, parse_allocation, validate_allocation
+
+
+def test_parse_allocation_formats():
+    assert parse_allocation("관찰력 20, 심리학 +15\n자동차 운전: 10") == {"관찰력": 20, "심리학": 15, "자동차 운전": 10}
+
+
+def test_parse_allocation_merges_same_skill():
+    assert parse_allocation("관찰력 10, 관찰력=5") == {"관찰력": 15}
+
+
+def test_parse_allocation_ignores_empty_items():
+    assert parse_allocation(" , 듣기 5 ,, ") == {"듣기": 5}
+
+
+@pytest.mark.parametrize("text", ["관찰력", "관찰력 -5", "20"])
+def test_parse_allocation_rejects(text):
+    with pytest.raises(ValueError):
+        parse_allocation(text)
+
+
+def _sheet():
+    return SkillSheet.from_rows([("관찰력", 25, 0), ("심리학", 10, 5), ("없는 기능", 1, 1)])
+
+
+def test_sheet_from_rows_ignores_unknown_skills():
+    sheet = _sheet()
+    assert sheet.value("관찰력") == 25
+    assert sheet.value("심리학") == 15
+    assert sheet.value("없는 기능") is None
+    assert sheet.spent() == 5
+
+
+def test_validate_allocation():
+    sheet = _sheet()
+    assert validate_allocation(sheet, 100, {"관찰력": 20}) is None
+    assert "없는 기능" in validate_allocation(sheet, 100, {"없는 기능": 1})
+    assert validate_allocation(sheet, 100, {next(iter(LOCKED_SKILLS)): 1})
+    assert str(MAX_SKILL_VALUE) in validate_allocation(sheet, 200, {"관찰력": 75})
+    # 이미 5점을 썼으므로 남은 점수는 20
+    assert "20점" in validate_allocation(sheet, 25, {"관찰력": 21})
+    assert validate_allocation(sheet, 100, {})
+
+
+def test_allocate_returns_new_sheet():
+    sheet = _sheet()
+    updated = sheet.allocate({"관찰력": 10})
+    assert updated.value("관찰력") == 35
+    assert sheet.value("관찰력") == 25
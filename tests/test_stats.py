@@ -0,0 +1,54 @@
+import pytest
+
+import stats
+
+
+def test_derive_from_all_fifty():
+    derived = stats.derive_from({name: 50 for name in stats.BASE_STATS})
+    assert derived == {
+        "hp": 10, "mp": 10, "sanity": 50, "movement": 8,
+        "damage_bonus": "0", "build": 0, "status": "N", "skill_point": 300,
+    }
+    assert set(derived) == set(stats.DERIVED_STATS)
+
+
+def test_derive_from_treats_missing_values_as_zero():
+    derived = stats.derive_from({"strength": 50, "size": None})
+    assert derived["hp"] == 0
+    assert derived["status"] == "D"
+    assert derived["skill_point"] == 0
+
+
+@pytest.mark.parametrize("strength, size, expected", [
+    (30, 34, ("-2d6", -2)),
+    (30, 35, ("-1d6", -1)),
+    (60, 64, ("0", 0)),
+    (60, 65, ("+1d4", 1)),
+    (100, 104, ("+1d6", 2)),
+    (100, 105, ("+2d6", 3)),
+])
+def test_damage_bonus_boundaries(strength, size, expected):
+    assert stats.damage_bonus_and_build(strength, size) == expected
+
+
+@pytest.mark.parametrize("strength, dexterity, size, expected", [
+    (40, 40, 50, 7),
+    (60, 40, 50, 9),
+    (50, 50, 50, 8),
+])
+def test_movement_rate(strength, dexterity, size, expected):
+    assert stats.movement_rate(strength, dexterity, size) == expected
+
+
+def test_status_and_sanity_cap():
+    derived = stats.derive_from({name: 50 for name in stats.BASE_STATS} | {"willpower": 120})
+    assert derived["sanity"] == 99
+    derived = stats.derive_from({name: 50 for name in stats.BASE_STATS} | {"willpower": 0})
+    assert derived["status"] == "M"
+
+
+def test_apply_stat_changes_does_not_modify_input():
+    base = {"strength": 50, "size": 50}
+    result = stats.apply_stat_changes(base, assign={"size": 60}, bonus={"strength": 5, "dexterity": 3})
+    assert result == {"strength": 55, "size": 60, "dexterity": 3}
+    assert base == {"strength": 50, "size": 50}
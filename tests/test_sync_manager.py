@@ -0,0 +1,45 @@
+import discord
+from discord import app_commands
+
+import sync_manager
+
+
+def _tree(description="주사위를 굴립니다.", extra=False):
+    tree = app_commands.CommandTree(discord.Client(intents=discord.Intents.none()))
+
+    @tree.command(name="굴림", description=description)
+    async def roll(interaction: discord.Interaction, text: str):
+        pass
+
+    @tree.command(name="판정", description="기능 판정")
+    async def check(interaction: discord.Interaction, skill: str):
+        pass
+
+    if extra:
+        @tree.command(name="순위", description="순위표")
+        async def ranking(interaction: discord.Interaction):
+            pass
+
+    return tree
+
+
+def test_tree_hash_is_stable_for_identical_trees():
+    assert sync_manager.tree_hash(_tree()) == sync_manager.tree_hash(_tree())
+
+
+def test_tree_hash_changes_when_a_command_changes():
+    base = sync_manager.tree_hash(_tree())
+    assert sync_manager.tree_hash(_tree(description="바뀐 설명")) != base
+    assert sync_manager.tree_hash(_tree(extra=True)) != base
+
+
+def test_tree_hash_changes_when_an_option_changes():
+    first = _tree()
+    second = _tree()
+    second.remove_command("판정")
+
+    @second.command(name="판정", description="기능 판정")
+    async def check(interaction: discord.Interaction, skill: str, bonus: int = 0):
+        pass
+
+    assert sync_manager.tree_hash(first) != sync_manager.tree_hash(second)
@@ -0,0 +1,139 @@
+import json
+
+import pytest
+
+import tracing
+
+
+class FakeLogger:
+    def __init__(self):
+        self.records = []
+
+    def info(self, message):
+        self.records.append(json.loads(message))
+
+
+@pytest.fixture
+def written(monkeypatch):
+    """파일 대신 기록된 트레이스를 모음 (기본은 표본 없음)"""
+    logger = FakeLogger()
+    monkeypatch.setattr(tracing, "_trace_logger", lambda: logger)
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 0)
+    monkeypatch.setattr(tracing, "TRACE_SLOW_MS", 1000)
+    return logger.records
+
+
+def test_spans_nest_under_the_current_trace(written):
+    trace_ids = []
+    with tracing.trace("command", "프로필 조회") as root:
+        with tracing.span("db", "get_user") as db:
+            with tracing.span("query", "SELECT_USER") as query:
+                assert tracing.current_span() is query
+        root.error = "command_failed"   # 항상 기록되도록
+        trace_ids.append(root.trace.trace_id)
+    assert tracing.current_span() is None
+
+    (record,) = written
+    assert record["trace_id"] == trace_ids[0]
+    assert record["reason"] == "error"
+    spans = {span["name"]: span for span in record["spans"]}
+    assert spans["프로필 조회"]["parent"] is None
+    assert spans["get_user"]["parent"] == spans["프로필 조회"]["id"]
+    assert spans["SELECT_USER"]["parent"] == db.span_id
+    assert query.duration is not None
+
+
+def test_span_outside_a_trace_records_nothing(written):
+    with tracing.span("db", "get_user") as span:
+        assert span is None
+    assert written == []
+
+
+def test_fast_successful_traces_are_not_sampled(written):
+    with tracing.trace("command", "굴림"):
+        pass
+    assert written == []
+
+
+def test_errors_are_always_written(written):
+    with pytest.raises(ValueError):
+        with tracing.trace("command", "판정"):
+            with tracing.span("db", "get_user"):
+                raise ValueError("boom")
+    (record,) = written
+    assert record["reason"] == "error"
+    assert record["error"] == "ValueError"
+    assert [span.get("error") for span in record["spans"]] == ["ValueError", "ValueError"]
+
+
+def test_slow_and_sampled_traces(written, monkeypatch):
+    monkeypatch.setattr(tracing, "TRACE_SLOW_MS", 0)
+    with tracing.trace("command", "느림"):
+        pass
+    monkeypatch.setattr(tracing, "TRACE_SLOW_MS", 1000)
+    monkeypatch.setattr(tracing, "TRACE_SAMPLE_RATE", 1)
+    with tracing.trace("command", "표본"):
+        pass
+    assert [(record["name"], record["reason"]) for record in written] == [("느림", "slow"), ("표본", "sampled")]
+
+
+def test_spans_past_the_limit_are_counted(written, monkeypatch):
+    monkeypatch.setattr(tracing, "MAX_SPANS", 3)
+    with tracing.trace("command", "대량") as root:
+        for _ in range(5):
+            with tracing.span("query", "SELECT_USER"):
+                pass
+        root.error = "command_failed"
+    (record,) = written
+    assert len(record["spans"]) == 3
+    assert record["dropped_spans"] == 3
+
+
+def _record():
+    return {
+        "trace_id": "abc", "time": 0, "kind": "component", "name": "HouseSelectionView.gryffindor_button",
+        "duration_ms": 100.0, "reason": "slow", "dropped_spans": 2,
+        "spans": [
+            {"id": "r", "parent": None, "kind": "component", "name": "HouseSelectionView.gryffindor_button",
+             "start_ms": 0, "duration_ms": 100.0},
+            {"id": "d", "parent": "r", "kind": "discord", "name": "PATCH /guilds/{guild_id}/members/{user_id}",
+             "start_ms": 40.0, "duration_ms": 50.0, "error": "HTTPException"},
+            {"id": "b", "parent": "r", "kind": "db", "name": "update_user_house", "start_ms": 10.0, "duration_ms": 20.0},
+            {"id": "q", "parent": "b", "kind": "query", "name": "SELECT_BASE_STATS_FOR_UPDATE",
+             "start_ms": 12.0, "duration_ms": 5.0},
+        ],
+    }
+
+
+def test_format_trace_draws_tree_in_start_order():
+    lines = tracing.format_trace(_record()).splitlines()
+
+    assert "component HouseSelectionView.gryffindor_button" in lines[0]
+    assert "trace=abc" in lines[0] and "(slow)" in lines[0]
+    names = [line.split("%  ", 1)[1] for line in lines[1:5]]
+    assert names == [
+        "component HouseSelectionView.gryffindor_button",
+        "  db update_user_house",
+        "    query SELECT_BASE_STATS_FOR_UPDATE",
+        "  discord PATCH /guilds/{guild_id}/members/{user_id}  ❌ HTTPException",
+    ]
+    assert " 50.0%" in lines[4]
+    # 직접 자식이 덮지 않은 시간: 100 - (20 + 50)
+    assert "30.0ms" in lines[5] and "span 밖" in lines[5]
+    assert lines[6] == "  … span 2개 생략"
+
+
+def test_bar_marks_the_span_interval():
+    bar = tracing._bar(50, 25, 100)
+    assert len(bar) == tracing.BAR_WIDTH
+    assert bar.index("█") == tracing.BAR_WIDTH // 2
+    assert bar.count("█") == tracing.BAR_WIDTH // 4
+
+
+def test_read_traces_includes_rotated_files_and_skips_broken_lines(tmp_path):
+    path = tmp_path / "traces.jsonl"
+    path.write_text(json.dumps({"name": "current"}) + "\n{\"name\": \"잘린\n", encoding="utf-8")
+    (tmp_path / "traces.jsonl.1").write_text(json.dumps({"name": "rotated"}) + "\n\n", encoding="utf-8")
+
+    assert [record["name"] for record in tracing.read_traces(str(path))] == ["current", "rotated"]
+    assert tracing.read_traces(str(tmp_path / "missing.jsonl")) == []
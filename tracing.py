@@ -0,0 +1,324 @@
+import argparse
+import atexit
+import contextvars
+import glob
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+# ---------------------------------------
+# 상호작용 단위 트레이스
+# ---------------------------------------
+# 명령어/버튼 하나를 트레이스 하나(trace_id)로 보고, 그 안의 DB 함수 호출, 쿼리, Discord API 요청을
+# 자식 span으로 기록한다. 메트릭(metrics.py)은 전체 분포를 보여주고, 트레이스는 느린 요청 하나가
+# 어디서 시간을 썼는지 순서대로 보여준다.
+#
+#   component  HouseSelectionView.gryffindor_button
+#     db       update_user_house
+#       query  SELECT_BASE_STATS_FOR_UPDATE
+#     discord  PUT /guilds/{guild_id}/members/{user_id}/roles/{role_id}
+#
+# 부모 span은 contextvar로 따라가므로 asyncio 태스크와 DB 스레드(db_async.run이 context를 넘김)에서도 이어진다.
+# 끝난 트레이스는 표본으로 고른 것과 느리거나 실패한 것만 JSONL 파일(크기 기준 순환)에 쓴다.
+# 파일 쓰기는 별도 스레드에서 하므로 이벤트 루프를 막지 않는다.
+#
+#   python tracing.py                  # 가장 느린 트레이스 10개
+#   python tracing.py -n 3 --name 기숙사  # 이름에 "기숙사"가 들어간 것 중 3개
+#
+#   TRACE_FILE        : 기록 파일 (기본 traces.jsonl, 비우면 끔)
+#   TRACE_SAMPLE_RATE : 보통 트레이스를 남길 비율 (기본 0.01)
+#   TRACE_SLOW_MS     : 이 시간(ms) 이상 걸린 트레이스는 항상 남김 (기본 1000)
+#   TRACE_FILE_MAX_BYTES / TRACE_FILE_BACKUPS : 파일 순환 크기와 보관 개수 (기본 5MB, 3개)
+
+TRACE_FILE = os.getenv("TRACE_FILE", "traces.jsonl")
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0.01"))
+TRACE_SLOW_MS = float(os.getenv("TRACE_SLOW_MS", "1000"))
+TRACE_FILE_MAX_BYTES = int(os.getenv("TRACE_FILE_MAX_BYTES", str(5 * 1024 * 1024)))
+TRACE_FILE_BACKUPS = int(os.getenv("TRACE_FILE_BACKUPS", "3"))
+# 트레이스 하나에 담는 최대 span 수 (대량 작업이 파일을 채우지 않도록, 넘으면 세기만 함)
+MAX_SPANS = 256
+
+
+class Span:
+    __slots__ = ("trace", "span_id", "parent_id", "kind", "name", "started", "duration", "error", "attrs")
+
+    def __init__(self, trace, parent_id, kind, name):
+        self.trace = trace
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent_id
+        self.kind = kind
+        self.name = name
+        self.started = time.perf_counter()
+        self.duration = None
+        self.error = None
+        self.attrs = None
+
+    def set(self, **attrs):
+        """span에 붙일 값 추가 (파일에 함께 기록됨)"""
+        if self.attrs is None:
+            self.attrs = {}
+        self.attrs.update(attrs)
+
+    def to_dict(self):
+        entry = {
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "kind": self.kind,
+            "name": self.name,
+            "start_ms": round((self.started - self.trace.started) * 1000, 3),
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+        }
+        if self.error:
+            entry["error"] = self.error
+        if self.attrs:
+            entry["attrs"] = self.attrs
+        return entry
+
+
+class Trace:
+    """상호작용 하나의 span 모음 (DB 스레드에서도 추가하므로 잠금 사용)"""
+
+    def __init__(self):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.started = time.perf_counter()
+        self.wall_started = time.time()
+        self.spans = []
+        self.dropped = 0
+        self._lock = threading.Lock()
+
+    def add(self, span):
+        with self._lock:
+            if len(self.spans) < MAX_SPANS:
+                self.spans.append(span)
+                return True
+            self.dropped += 1
+            return False
+
+
+_current = contextvars.ContextVar("trace_span", default=None)
+
+
+def current_span():
+    return _current.get()
+
+
+def current_trace_id():
+    """지금 처리 중인 트레이스 ID (로그 메시지에 붙일 때), 없으면 None"""
+    span = _current.get()
+    return span.trace.trace_id if span is not None else None
+
+
+@contextmanager
+def trace(kind, name="unknown"):
+    """
+    새 트레이스를 시작하고 루트 span을 돌려줌. 끝나면 표본 규칙에 따라 파일에 씀.
+    (루트 span의 name은 블록 안에서 바꿀 수 있다)
+    """
+    root = Span(Trace(), None, kind, name)
+    root.started = root.trace.started  # 루트 span은 트레이스 시작 시각(0ms)에서 시작
+    root.trace.add(root)
+    reset = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.error = root.error or type(e).__name__
+        raise
+    finally:
+        _current.reset(reset)
+        root.duration = time.perf_counter() - root.started
+        _finish(root)
+
+
+@contextmanager
+def span(kind, name):
+    """
+    진행 중인 트레이스에 자식 span 추가. 트레이스 밖이면 아무것도 기록하지 않는다.
+    반환값은 Span 또는 None
+    """
+    parent = _current.get()
+    if parent is None:
+        yield None
+        return
+
+    child = Span(parent.trace, parent.span_id, kind, name)
+    if not parent.trace.add(child):
+        yield None
+        return
+
+    reset = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.error = type(e).__name__
+        raise
+    finally:
+        _current.reset(reset)
+        child.duration = time.perf_counter() - child.started
+
+
+# ---------------------------------------
+# 표본 추출 / 파일 기록
+# ---------------------------------------
+_logger = None
+_logger_lock = threading.Lock()
+
+
+def _trace_logger():
+    """JSONL 파일에 쓰는 로거 (처음 쓸 때 만듦). 실제 쓰기는 QueueListener 스레드가 한다"""
+    global _logger
+    if _logger is not None or not TRACE_FILE:
+        return _logger
+    with _logger_lock:
+        if _logger is None:
+            handler = logging.handlers.RotatingFileHandler(
+                TRACE_FILE, maxBytes=TRACE_FILE_MAX_BYTES, backupCount=TRACE_FILE_BACKUPS, encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            records = queue.SimpleQueue()
+            listener = logging.handlers.QueueListener(records, handler)
+            listener.start()
+            atexit.register(listener.stop)  # 종료할 때 남은 트레이스를 마저 씀
+
+            logger = logging.getLogger("bot.traces")
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+            logger.addHandler(logging.handlers.QueueHandler(records))
+            _logger = logger
+    return _logger
+
+
+def _sample_reason(root):
+    if root.error:
+        return "error"
+    if root.duration * 1000 >= TRACE_SLOW_MS:
+        return "slow"
+    if random.random() < TRACE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def _finish(root):
+    reason = _sample_reason(root)
+    if reason is None:
+        return
+    logger = _trace_logger()
+    if logger is None:
+        return
+
+    trace = root.trace
+    with trace._lock:
+        spans = [span.to_dict() for span in trace.spans]
+        dropped = trace.dropped
+    record = {
+        "trace_id": trace.trace_id,
+        "time": round(trace.wall_started, 3),
+        "kind": root.kind,
+        "name": root.name,
+        "duration_ms": round(root.duration * 1000, 3),
+        "reason": reason,
+        "spans": spans,
+    }
+    if root.error:
+        record["error"] = root.error
+    if dropped:
+        record["dropped_spans"] = dropped
+    logger.info(json.dumps(record, ensure_ascii=False))
+
+
+# ---------------------------------------
+# CLI: 가장 느린 트레이스 보기
+# ---------------------------------------
+BAR_WIDTH = 40
+
+
+def read_traces(path=TRACE_FILE):
+    """기록 파일과 순환된 백업 파일(.1, .2 ...)의 트레이스를 모두 읽음"""
+    traces = []
+    for filename in [path] + sorted(glob.glob(glob.escape(path) + ".*")):
+        try:
+            with open(filename, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        traces.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        continue  # 쓰는 도중 잘린 줄
+        except FileNotFoundError:
+            continue
+    return traces
+
+
+def _bar(start_ms, duration_ms, total_ms):
+    """트레이스 전체 시간 위에서 span이 차지한 구간"""
+    if total_ms <= 0:
+        return " " * BAR_WIDTH
+    begin = min(BAR_WIDTH - 1, int(start_ms / total_ms * BAR_WIDTH))
+    length = max(1, round((duration_ms or 0) / total_ms * BAR_WIDTH))
+    length = min(length, BAR_WIDTH - begin)
+    return " " * begin + "█" * length + " " * (BAR_WIDTH - begin - length)
+
+
+def format_trace(record):
+    """트레이스 하나를 span 트리 + 시간 막대로 (flame 형태)"""
+    total = record["duration_ms"]
+    started = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(record["time"]))
+    lines = [f"{total:9.1f}ms  {record['kind']} {record['name']}  "
+             f"trace={record['trace_id']}  {started}  ({record['reason']})"]
+
+    children = {}
+    for span in record["spans"]:
+        children.setdefault(span["parent"], []).append(span)
+    for siblings in children.values():
+        siblings.sort(key=lambda span: span["start_ms"])
+
+    def walk(span, depth):
+        duration = span["duration_ms"] or 0
+        share = duration / total * 100 if total else 0
+        error = f"  ❌ {span['error']}" if span.get("error") else ""
+        lines.append(f"  {_bar(span['start_ms'], duration, total)} {duration:9.1f}ms {share:5.1f}%  "
+                     f"{'  ' * depth}{span['kind']} {span['name']}{error}")
+        for child in children.get(span["id"], []):
+            walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        walk(root, 0)
+        # 직접 자식 span에 포함되지 않은 시간 = 봇 코드(및 대기) 시간
+        covered = sum(child["duration_ms"] or 0 for child in children.get(root["id"], []))
+        lines.append(f"  {'':{BAR_WIDTH}} {max(0.0, total - covered):9.1f}ms         (span 밖: 봇 코드/대기)")
+    if record.get("dropped_spans"):
+        lines.append(f"  … span {record['dropped_spans']}개 생략")
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="기록된 트레이스 중 가장 느린 것 보기")
+    parser.add_argument("--file", default=TRACE_FILE or "traces.jsonl", help="트레이스 파일 (기본 TRACE_FILE)")
+    parser.add_argument("-n", "--limit", type=int, default=10, help="보여줄 트레이스 수")
+    parser.add_argument("--name", help="이름에 이 문자열이 들어간 트레이스만")
+    args = parser.parse_args(argv)
+
+    traces = read_traces(args.file)
+    if args.name:
+        traces = [record for record in traces if args.name in record["name"]]
+    if not traces:
+        print(f"트레이스가 없습니다. ({args.file})")
+        return 1
+
+    traces.sort(key=lambda record: record["duration_ms"], reverse=True)
+    for record in traces[:args.limit]:
+        print(format_trace(record))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())